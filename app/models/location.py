@@ -1,7 +1,34 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 
+DIRECTIONS = [
+    (1, 0),  # East
+    (1, -1),  # Northeast
+    (0, -1),  # Northwest
+    (-1, 0),  # West
+    (-1, 1),  # Southwest
+    (0, 1),  # Southeast
+]
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Location:
     q: int
     r: int
+
+    def distance_to(self, other: Location) -> int:
+        dq = self.q - other.q
+        dr = self.r - other.r
+
+        return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+    def neighbors(self) -> list[Location]:
+        return [Location(q=self.q + dq, r=self.r + dr) for dq, dr in DIRECTIONS]
+
+    def neighborhood(self, radius: int) -> list[Location]:
+        return [
+            Location(q=self.q + dq, r=self.r + dr)
+            for dq in range(-radius, radius + 1)
+            for dr in range(max(-radius, -dq - radius), min(radius, -dq + radius) + 1)
+        ]
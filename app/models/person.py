@@ -11,11 +11,12 @@ class PersonRole(str, Enum):
     police = "police"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Person:
     location: Location
     role: PersonRole
     is_dead: bool
-    lifespan: int
+    # NOTE: Absolute tick of natural death, the remaining lifespan is derived
+    death_tick: int
 
     id: str = field(default_factory=lambda: str(uuid4()))
@@ -1,9 +1,14 @@
 from dataclasses import dataclass, field
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+from numpy.typing import NDArray
 
 from app.models.building import Building
 from app.models.errors import DoesNotExistError, ExistsError
+from app.models.location import Location
 from app.repositories.in_memory.indexes import IndexManager
+from app.repositories.occupancy import Occupancy
 
 
 @dataclass
@@ -15,9 +20,12 @@ class BuildingsInMemoryRepository:
             extractors={
                 "q": lambda building: building.location.q,
                 "r": lambda building: building.location.r,
-            }
+            },
+            composites=[("q", "r")],
+            ordered=["q", "r"],
         )
     )
+    occupancy: Occupancy = field(default_factory=Occupancy)
 
     def __len__(self) -> int:  # pragma: no cover
         return len(self._buildings)
@@ -37,6 +45,7 @@ class BuildingsInMemoryRepository:
         if existing:
             raise ExistsError(existing.id)
 
+        self.occupancy.add_one(building.location)
         self._buildings[building.id] = building
         self.indexes.create_one(building.id, building)
 
@@ -47,6 +56,7 @@ class BuildingsInMemoryRepository:
         if not building:
             raise DoesNotExistError(building_id)
 
+        self.occupancy.remove_one(building.location)
         self.indexes.delete_one(building_id, building)
         self._buildings.pop(building_id, None)
 
@@ -55,15 +65,95 @@ class BuildingsInMemoryRepository:
         if not existing:
             raise DoesNotExistError(building.id)
 
+        self.occupancy.move_one(existing.location, building.location)
         self.indexes.update_one(building.id, existing, building)
         self._buildings[building.id] = building
 
+    def create_many(self, buildings: Iterable[Building]) -> list[Building]:
+        created: dict[str, Building] = {}
+        for building in buildings:
+            if building.id in self._buildings or building.id in created:
+                raise ExistsError(building.id)
+            created[building.id] = building
+
+        self.occupancy.add_many([building.location for building in created.values()])
+        self._buildings.update(created)
+        self.indexes.create_many(created)
+
+        return list(created.values())
+
+    def delete_many(self, building_ids: Iterable[str]) -> None:
+        deleted = {
+            building_id: self.read_one(building_id) for building_id in building_ids
+        }
+
+        self.occupancy.remove_many([building.location for building in deleted.values()])
+        self.indexes.delete_many(deleted)
+        for building_id in deleted:
+            del self._buildings[building_id]
+
+    def update_many(self, buildings: Iterable[Building]) -> None:
+        updated = {building.id: building for building in buildings}
+        changes = [
+            (building_id, self.read_one(building_id), building)
+            for building_id, building in updated.items()
+        ]
+
+        self.occupancy.move_many(
+            [existing.location for _, existing, _ in changes],
+            [building.location for _, _, building in changes],
+        )
+        self.indexes.update_many(changes)
+        for building_id, _, building in changes:
+            self._buildings[building_id] = building
+
     def read_many(self, **filters: Any) -> Iterator[Building]:
         if not filters:
             return iter(self._buildings.values())
 
         building_ids = self.indexes.read_many(**filters)
 
+        return self._read_all(building_ids)
+
+    def read_range(
+        self, _field: str, lower: Any = None, upper: Any = None, **filters: Any
+    ) -> Iterator[Building]:
+        building_ids = self.indexes.read_range({_field: (lower, upper)}, **filters)
+
+        return self._read_all(building_ids)
+
+    def read_bbox(
+        self,
+        q_min: int | None = None,
+        q_max: int | None = None,
+        r_min: int | None = None,
+        r_max: int | None = None,
+        **filters: Any,
+    ) -> Iterator[Building]:
+        building_ids = self.indexes.read_range(
+            {"q": (q_min, q_max), "r": (r_min, r_max)}, self._buildings, **filters
+        )
+
+        return self._read_all(building_ids)
+
+    def read_within_radius(
+        self, center: Location, radius: int, **filters: Any
+    ) -> Iterator[Building]:
+        building_ids = self.indexes.read_keys(
+            ("q", "r"),
+            ((cell.q, cell.r) for cell in center.neighborhood(radius)),
+            **filters,
+        )
+
+        return self._read_all(building_ids)
+
+    def is_occupied(self, location: Location) -> bool:
+        return self.occupancy.is_occupied(location)
+
+    def read_occupied(self, grid_size: int) -> NDArray[np.bool_]:
+        return self.occupancy.occupied(grid_size)
+
+    def _read_all(self, building_ids: Iterable[str]) -> Iterator[Building]:
         buildings = []
         for building_id in building_ids:
             building = self._buildings.get(building_id)
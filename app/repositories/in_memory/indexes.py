@@ -1,76 +1,280 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import copy
+import math
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
-from typing import Any, Callable, Generic, Hashable, TypeVar
+from itertools import product
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Self,
+    TypeVar,
+)
 
 TEntity = TypeVar("TEntity")
 TKey = TypeVar("TKey", bound=Hashable)
 TId = TypeVar("TId", bound=Hashable)
 
+# NOTE: Shared by every index for unknown keys, must never be written to
+_EMPTY_BUCKET: dict[Any, None] = {}
+
 
 @dataclass
 class IndexManager(Generic[TEntity, TId]):
     extractors: dict[str, Callable[[TEntity], Any]]
+    composites: list[tuple[str, ...]] = field(default_factory=list)
+    ordered: list[str] = field(default_factory=list)
 
     _indexes: dict[str, _FieldIndex[TEntity, Any, TId]] = field(init=False)
+    _composites: list[_CompositeIndex[TEntity, TId]] = field(init=False)
 
     def __post_init__(self) -> None:
+        for _field in [*self.ordered, *(f for c in self.composites for f in c)]:
+            if _field not in self.extractors:
+                raise ValueError(f"Unknown indexed field <{_field}>")
+
         self._indexes = {
-            _field: _FieldIndex(key_extractor=extractor)
+            _field: (
+                _RangeIndex(key_extractor=extractor)
+                if _field in self.ordered
+                else _FieldIndex(key_extractor=extractor)
+            )
             for _field, extractor in self.extractors.items()
         }
 
+        self._composites = [
+            _CompositeIndex(
+                key_extractor=_composite_key_extractor(
+                    [self.extractors[_field] for _field in fields]
+                ),
+                fields=fields,
+            )
+            for fields in sorted(self.composites, key=len, reverse=True)
+        ]
+
+    def copy(self) -> IndexManager[TEntity, TId]:
+        copied = copy.copy(self)
+        copied._indexes = {
+            _field: index.copy() for _field, index in self._indexes.items()
+        }
+        copied._composites = [composite.copy() for composite in self._composites]
+
+        return copied
+
     def create_one(self, entity_id: TId, entity: TEntity) -> None:
-        for index in self._indexes.values():
+        for index in self._all_indexes():
             index.create_one(entity_id, entity)
 
     def delete_one(self, entity_id: TId, entity: TEntity) -> None:
-        for index in self._indexes.values():
+        for index in self._all_indexes():
             index.delete_one(entity_id, entity)
 
     def update_one(
         self, entity_id: TId, old_entity: TEntity, new_entity: TEntity
     ) -> None:
-        for index in self._indexes.values():
+        for index in self._all_indexes():
             index.update_one(entity_id, old_entity, new_entity)
 
-    def read_many(self, **filters: Any) -> set[TId]:
+    def create_many(self, entities: Mapping[TId, TEntity]) -> None:
+        for index in self._all_indexes():
+            index.create_many(entities)
+
+    def delete_many(self, entities: Mapping[TId, TEntity]) -> None:
+        for index in self._all_indexes():
+            index.delete_many(entities)
+
+    def update_many(self, changes: Iterable[tuple[TId, TEntity, TEntity]]) -> None:
+        changes = list(changes)
+        for index in self._all_indexes():
+            index.update_many(changes)
+
+    def read_many(self, **filters: Any) -> Iterator[TId]:
         if not filters:
             raise ValueError("No filters specified")
 
+        candidate_ids = self._candidates_for(filters)
+
+        candidate_ids.sort(key=len)
+        smallest, *others = candidate_ids
+
+        # NOTE: Buckets are live views, writers on other threads change them.
+        # The smallest is copied before probing, lookups into the others are
+        # safe.
+        return (
+            entity_id
+            for entity_id in tuple(smallest)
+            if all(entity_id in other for other in others)
+        )
+
+    def count(self, **filters: Any) -> int:
+        if not filters:
+            raise ValueError("No filters specified")
+
+        # NOTE: One index covering every filter knows its size without a walk
+        candidate_ids = self._candidates_for(filters)
+        if len(candidate_ids) == 1:
+            return len(candidate_ids[0])
+
+        return sum(1 for _ in self.read_many(**filters))
+
+    def read_range(
+        self,
+        bounds: dict[str, tuple[Any, Any]],
+        entities: Mapping[TId, TEntity] | None = None,
+        **filters: Any,
+    ) -> Iterator[TId]:
+        if not bounds:
+            raise ValueError("No bounds specified")
+
+        keys_per_field = {
+            _field: self._range_index_of(_field).keys_between(lower, upper)
+            for _field, (lower, upper) in bounds.items()
+        }
+
+        if len(bounds) == 1:
+            [(_field, keys)] = keys_per_field.items()
+            return self._read_buckets(self._indexes[_field], keys, filters)
+
+        candidates = {
+            _field: sum(len(self._indexes[_field].read_one(key)) for key in keys)
+            for _field, keys in keys_per_field.items()
+        }
+        narrowest = min(candidates, key=candidates.__getitem__)
+        combinations = math.prod(len(keys) for keys in keys_per_field.values())
+        unbounded = any(bound == (None, None) for bound in bounds.values())
+
+        # NOTE: Walking occupied key combinations only pays off while there are
+        # fewer of them than entities in the narrowest range. Otherwise that
+        # range is walked and the other bounds checked on the entities.
+        if entities is not None and (unbounded or combinations > candidates[narrowest]):
+            return self._read_checked(
+                self._read_buckets(
+                    self._indexes[narrowest], keys_per_field[narrowest], filters
+                ),
+                entities,
+                {
+                    _field: bound
+                    for _field, bound in bounds.items()
+                    if _field != narrowest
+                },
+            )
+
+        return self._read_buckets(
+            self._composite_of(tuple(bounds)),
+            product(*keys_per_field.values()),
+            filters,
+        )
+
+    def read_keys(
+        self, fields: tuple[str, ...], keys: Iterable[tuple[Any, ...]], **filters: Any
+    ) -> Iterator[TId]:
+        return self._read_buckets(self._composite_of(fields), keys, filters)
+
+    def _read_buckets(
+        self,
+        index: _FieldIndex[TEntity, Any, TId],
+        keys: Iterable[Any],
+        filters: dict[str, Any],
+    ) -> Iterator[TId]:
+        others = self._candidates_for(filters) if filters else []
+
+        return (
+            entity_id
+            for key in keys
+            for entity_id in tuple(index.read_one(key))
+            if all(entity_id in other for other in others)
+        )
+
+    def _read_checked(
+        self,
+        entity_ids: Iterable[TId],
+        entities: Mapping[TId, TEntity],
+        bounds: dict[str, tuple[Any, Any]],
+    ) -> Iterator[TId]:
+        extractors = [
+            (self.extractors[_field], lower, upper)
+            for _field, (lower, upper) in bounds.items()
+        ]
+        for entity_id in entity_ids:
+            entity = entities.get(entity_id)
+            if entity is not None and all(
+                _between(extractor(entity), lower, upper)
+                for extractor, lower, upper in extractors
+            ):
+                yield entity_id
+
+    def _candidates_for(self, filters: dict[str, Any]) -> list[AbstractSet[TId]]:
         for _field in filters:
             if _field not in self._indexes:
                 raise ValueError(f"Unknown filter <{_field}>")
 
-        candidate_ids = [
-            self._indexes[_field].read_one(value) for _field, value in filters.items()
-        ]
+        candidate_ids = []
+        remaining = dict(filters)
+        for composite in self._composites:
+            if composite.covers(remaining):
+                candidate_ids.append(composite.read_one(composite.key_of(remaining)))
+                for _field in composite.fields:
+                    del remaining[_field]
 
-        candidate_ids.sort(key=len)
-        ids = candidate_ids[0]
-        for candidate_id in candidate_ids[1:]:
-            ids = ids.intersection(candidate_id)
-            if not ids:
-                break
+        candidate_ids.extend(
+            self._indexes[_field].read_one(value) for _field, value in remaining.items()
+        )
+
+        return candidate_ids
+
+    def _range_index_of(self, _field: str) -> _RangeIndex[TEntity, TId]:
+        index = self._indexes.get(_field)
+        if not isinstance(index, _RangeIndex):
+            raise ValueError(f"Unknown range filter <{_field}>")
 
-        return ids
+        return index
+
+    def _composite_of(self, fields: tuple[str, ...]) -> _CompositeIndex[TEntity, TId]:
+        for composite in self._composites:
+            if composite.fields == fields:
+                return composite
+
+        raise ValueError(f"No composite index for <{', '.join(fields)}>")
+
+    def _all_indexes(self) -> list[_FieldIndex[TEntity, Any, TId]]:
+        return [*self._indexes.values(), *self._composites]
+
+
+def _between(value: Any, lower: Any, upper: Any) -> bool:
+    return (lower is None or lower <= value) and (upper is None or value <= upper)
+
+
+def _composite_key_extractor(
+    extractors: list[Callable[[TEntity], Any]],
+) -> Callable[[TEntity], tuple[Any, ...]]:
+    return lambda entity: tuple(extractor(entity) for extractor in extractors)
 
 
 @dataclass
 class _FieldIndex(Generic[TEntity, TKey, TId]):
     key_extractor: Callable[[TEntity], TKey]
 
-    _index: defaultdict[TKey, set[TId]] = field(
-        default_factory=lambda: defaultdict(set), init=False
-    )
+    _index: dict[TKey, dict[TId, None]] = field(default_factory=dict, init=False)
+
+    def copy(self) -> Self:
+        copied = copy.copy(self)
+        copied._index = {key: dict(bucket) for key, bucket in self._index.items()}
+
+        return copied
 
     def create_one(self, entity_id: TId, entity: TEntity) -> None:
         key = self.key_extractor(entity)
-        self._index[key].add(entity_id)
+        self._add(key, entity_id)
 
-    def read_one(self, key: TKey) -> set[TId]:
-        return self._index[key].copy()
+    def read_one(self, key: TKey) -> AbstractSet[TId]:
+        return self._index.get(key, _EMPTY_BUCKET).keys()
 
     def update_one(
         self, entity_id: TId, old_entity: TEntity, new_entity: TEntity
@@ -79,16 +283,107 @@ class _FieldIndex(Generic[TEntity, TKey, TId]):
         new_key = self.key_extractor(new_entity)
 
         if old_key != new_key:
-            self._index[old_key].discard(entity_id)
-            self._clean_empty_index(old_key)
-            self._index[new_key].add(entity_id)
+            self._remove(old_key, entity_id)
+            self._add(new_key, entity_id)
 
     def delete_one(self, entity_id: TId, entity: TEntity) -> None:
         key = self.key_extractor(entity)
-        self._index[key].discard(entity_id)
+        self._remove(key, entity_id)
+
+    def create_many(self, entities: Mapping[TId, TEntity]) -> None:
+        for key, entity_ids in self._group_by_key(entities.items()).items():
+            self._add_all(key, entity_ids)
+
+    def update_many(self, changes: Iterable[tuple[TId, TEntity, TEntity]]) -> None:
+        removed: dict[TKey, list[TId]] = {}
+        added: dict[TKey, list[TId]] = {}
+        for entity_id, old_entity, new_entity in changes:
+            old_key = self.key_extractor(old_entity)
+            new_key = self.key_extractor(new_entity)
+
+            if old_key != new_key:
+                removed.setdefault(old_key, []).append(entity_id)
+                added.setdefault(new_key, []).append(entity_id)
+
+        for key, entity_ids in removed.items():
+            self._remove_all(key, entity_ids)
+        for key, entity_ids in added.items():
+            self._add_all(key, entity_ids)
+
+    def delete_many(self, entities: Mapping[TId, TEntity]) -> None:
+        for key, entity_ids in self._group_by_key(entities.items()).items():
+            self._remove_all(key, entity_ids)
+
+    def _group_by_key(
+        self, entities: Iterable[tuple[TId, TEntity]]
+    ) -> dict[TKey, list[TId]]:
+        grouped: dict[TKey, list[TId]] = {}
+        for entity_id, entity in entities:
+            grouped.setdefault(self.key_extractor(entity), []).append(entity_id)
+
+        return grouped
+
+    def _add(self, key: TKey, entity_id: TId) -> None:
+        self._add_all(key, (entity_id,))
+
+    def _remove(self, key: TKey, entity_id: TId) -> None:
+        self._remove_all(key, (entity_id,))
+
+    def _add_all(self, key: TKey, entity_ids: Iterable[TId]) -> None:
+        bucket = self._index.get(key)
+        if bucket is None:
+            bucket = self._index[key] = {}
+
+        bucket.update(dict.fromkeys(entity_ids))
+
+    def _remove_all(self, key: TKey, entity_ids: Iterable[TId]) -> None:
+        bucket = self._index.get(key)
+        if bucket is None:
+            return
+
+        for entity_id in entity_ids:
+            bucket.pop(entity_id, None)
+        if not bucket:
+            del self._index[key]
+
+
+@dataclass
+class _RangeIndex(_FieldIndex[TEntity, Any, TId]):
+    _keys: list[Any] = field(default_factory=list, init=False)
+
+    def copy(self) -> Self:
+        copied = super().copy()
+        copied._keys = list(self._keys)
+
+        return copied
+
+    def keys_between(self, lower: Any, upper: Any) -> list[Any]:
+        start = 0 if lower is None else bisect_left(self._keys, lower)
+        end = len(self._keys) if upper is None else bisect_right(self._keys, upper)
+
+        return self._keys[start:end]
+
+    def _add_all(self, key: Any, entity_ids: Iterable[TId]) -> None:
+        if key not in self._index:
+            insort(self._keys, key)
+
+        super()._add_all(key, entity_ids)
+
+    def _remove_all(self, key: Any, entity_ids: Iterable[TId]) -> None:
+        super()._remove_all(key, entity_ids)
+
+        if key not in self._index:
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+
+@dataclass
+class _CompositeIndex(_FieldIndex[TEntity, tuple[Any, ...], TId]):
+    fields: tuple[str, ...]
 
-        self._clean_empty_index(key)
+    def covers(self, filters: dict[str, Any]) -> bool:
+        return all(_field in filters for _field in self.fields)
 
-    def _clean_empty_index(self, old_key: TKey) -> None:  # pragma: no cover
-        if not self._index[old_key]:
-            del self._index[old_key]
+    def key_of(self, filters: dict[str, Any]) -> tuple[Any, ...]:
+        return tuple(filters[_field] for _field in self.fields)
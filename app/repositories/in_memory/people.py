@@ -1,13 +1,29 @@
+from __future__ import annotations
+
 from dataclasses import dataclass, field
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
 
 from app.models.errors import DoesNotExistError, ExistsError
-from app.models.person import Person
+from app.models.location import Location
+from app.models.person import Person, PersonRole
 from app.repositories.in_memory.indexes import IndexManager
+from app.repositories.occupancy import Occupancy
+from app.repositories.people import (
+    ROLE_CODES,
+    ROLES,
+    PeopleColumns,
+    PeopleRepository,
+    expiry_of,
+    with_column_values,
+)
+from app.repositories.timing_wheel import TimingWheel
 
 
 @dataclass
-class PeopleInMemoryRepository:
+class PeopleInMemoryRepository(PeopleRepository):
     _people: dict[str, Person] = field(default_factory=dict)
 
     indexes: IndexManager[Person, str] = field(
@@ -16,9 +32,15 @@ class PeopleInMemoryRepository:
                 "q": lambda person: person.location.q,
                 "r": lambda person: person.location.r,
                 "is_dead": lambda person: person.is_dead,
-            }
+                "role": lambda person: person.role,
+            },
+            composites=[("q", "r")],
+            ordered=["q", "r"],
         )
     )
+    # NOTE: One occupancy layer per role, indexed by role code
+    occupancy: Occupancy = field(default_factory=lambda: Occupancy(layers=len(ROLES)))
+    expiries: TimingWheel = field(default_factory=TimingWheel)
 
     def __len__(self) -> int:  # pragma: no cover
         return len(self._people)
@@ -26,6 +48,14 @@ class PeopleInMemoryRepository:
     def __iter__(self) -> Iterator[Person]:  # pragma: no cover
         return iter(self._people.values())
 
+    def copy(self) -> PeopleInMemoryRepository:
+        return PeopleInMemoryRepository(
+            _people=dict(self._people),
+            indexes=self.indexes.copy(),
+            occupancy=self.occupancy.copy(),
+            expiries=self.expiries.copy(),
+        )
+
     def read_one(self, person_id: str) -> Person:
         person = self._people.get(person_id)
         if not person:
@@ -38,6 +68,8 @@ class PeopleInMemoryRepository:
         if existing:
             raise ExistsError(existing.id)
 
+        self.occupancy.add_one(person.location, ROLE_CODES[person.role])
+        self.expiries.schedule(person.id, expiry_of(person))
         self._people[person.id] = person
         self.indexes.create_one(person.id, person)
 
@@ -48,6 +80,8 @@ class PeopleInMemoryRepository:
         if not person:
             raise DoesNotExistError(person_id)
 
+        self.occupancy.remove_one(person.location, ROLE_CODES[person.role])
+        self.expiries.cancel(person_id, expiry_of(person))
         self.indexes.delete_one(person_id, person)
         self._people.pop(person_id, None)
 
@@ -56,15 +90,108 @@ class PeopleInMemoryRepository:
         if not existing:
             raise DoesNotExistError(person.id)
 
+        self.occupancy.move_one(
+            existing.location,
+            person.location,
+            ROLE_CODES[existing.role],
+            ROLE_CODES[person.role],
+        )
+        self.expiries.reschedule(person.id, expiry_of(existing), expiry_of(person))
         self.indexes.update_one(person.id, existing, person)
         self._people[person.id] = person
 
+    def is_occupied(self, location: Location, role: PersonRole | None = None) -> bool:
+        return self.occupancy.is_occupied(location, _layer_of(role))
+
+    def read_occupied(
+        self, grid_size: int, role: PersonRole | None = None
+    ) -> NDArray[np.bool_]:
+        return self.occupancy.occupied(grid_size, _layer_of(role))
+
+    def read_expiring(self, tick: int) -> Iterator[Person]:
+        return self.read_all(self.expiries.due(tick))
+
+    def read_columns(self) -> PeopleColumns:
+        return PeopleColumns.of(list(self._people.values()))
+
+    def update_columns(self, ids: Sequence[str], **columns: NDArray[Any]) -> None:
+        values = {name: column.tolist() for name, column in columns.items()}
+
+        self.update_many(
+            with_column_values(
+                self.read_one(person_id),
+                {name: column[position] for name, column in values.items()},
+            )
+            for position, person_id in enumerate(ids)
+        )
+
+    def create_many(self, people: Iterable[Person]) -> list[Person]:
+        created: dict[str, Person] = {}
+        for person in people:
+            if person.id in self._people or person.id in created:
+                raise ExistsError(person.id)
+            created[person.id] = person
+
+        self.occupancy.add_many(
+            [person.location for person in created.values()],
+            [ROLE_CODES[person.role] for person in created.values()],
+        )
+        self.expiries.schedule_many(
+            list(created), [expiry_of(person) for person in created.values()]
+        )
+        self._people.update(created)
+        self.indexes.create_many(created)
+
+        return list(created.values())
+
+    def delete_many(self, person_ids: Iterable[str]) -> None:
+        deleted = {person_id: self.read_one(person_id) for person_id in person_ids}
+
+        self.occupancy.remove_many(
+            [person.location for person in deleted.values()],
+            [ROLE_CODES[person.role] for person in deleted.values()],
+        )
+        self.expiries.cancel_many(
+            list(deleted), [expiry_of(person) for person in deleted.values()]
+        )
+        self.indexes.delete_many(deleted)
+        for person_id in deleted:
+            del self._people[person_id]
+
+    def update_many(self, people: Iterable[Person]) -> None:
+        updated = {person.id: person for person in people}
+        changes = [
+            (person_id, self.read_one(person_id), person)
+            for person_id, person in updated.items()
+        ]
+
+        self.occupancy.move_many(
+            [existing.location for _, existing, _ in changes],
+            [person.location for _, _, person in changes],
+            [ROLE_CODES[existing.role] for _, existing, _ in changes],
+            [ROLE_CODES[person.role] for _, _, person in changes],
+        )
+        for person_id, existing, person in changes:
+            self.expiries.reschedule(person_id, expiry_of(existing), expiry_of(person))
+        self.indexes.update_many(changes)
+        for person_id, _, person in changes:
+            self._people[person_id] = person
+
     def read_many(self, **filters: Any) -> Iterator[Person]:
         if not filters:
             return iter(self._people.values())
 
         people_ids = self.indexes.read_many(**filters)
 
+        return self.read_all(people_ids)
+
+    def count(self, **filters: Any) -> int:
+        if not filters:
+            return len(self._people)
+
+        return self.indexes.count(**filters)
+
+    def read_all(self, people_ids: Iterable[str]) -> Iterator[Person]:
         people = []
         for person_id in people_ids:
             person = self._people.get(person_id)
@@ -72,3 +199,39 @@ class PeopleInMemoryRepository:
                 people.append(person)
 
         return iter(people)
+
+    def read_range(
+        self, _field: str, lower: Any = None, upper: Any = None, **filters: Any
+    ) -> Iterator[Person]:
+        people_ids = self.indexes.read_range({_field: (lower, upper)}, **filters)
+
+        return self.read_all(people_ids)
+
+    def read_bbox(
+        self,
+        q_min: int | None = None,
+        q_max: int | None = None,
+        r_min: int | None = None,
+        r_max: int | None = None,
+        **filters: Any,
+    ) -> Iterator[Person]:
+        people_ids = self.indexes.read_range(
+            {"q": (q_min, q_max), "r": (r_min, r_max)}, self._people, **filters
+        )
+
+        return self.read_all(people_ids)
+
+    def read_within_radius(
+        self, center: Location, radius: int, **filters: Any
+    ) -> Iterator[Person]:
+        people_ids = self.indexes.read_keys(
+            ("q", "r"),
+            ((cell.q, cell.r) for cell in center.neighborhood(radius)),
+            **filters,
+        )
+
+        return self.read_all(people_ids)
+
+
+def _layer_of(role: PersonRole | None) -> int | None:
+    return None if role is None else ROLE_CODES[role]
@@ -0,0 +1,532 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.models.errors import DoesNotExistError, ExistsError
+from app.models.location import Location
+from app.models.person import Person, PersonRole
+from app.repositories.occupancy import fit_to_grid
+from app.repositories.people import (
+    ROLE_CODES,
+    ROLES,
+    PeopleColumns,
+    PeopleRepository,
+    expiry_of,
+)
+from app.repositories.timing_wheel import TimingWheel
+
+_FILTERS = {"q", "r", "is_dead", "role"}
+_RANGES = {"q", "r"}
+_NO_ROW = -1
+
+
+@dataclass
+class PeopleColumnarRepository(PeopleRepository):
+    grid_size: int
+    capacity: int = 1024
+
+    _ids: list[str] = field(default_factory=list, init=False)
+    _rows: dict[str, int] = field(default_factory=dict, init=False)
+
+    _q: NDArray[np.int32] = field(init=False)
+    _r: NDArray[np.int32] = field(init=False)
+    _role: NDArray[np.int8] = field(init=False)
+    _is_dead: NDArray[np.bool_] = field(init=False)
+    _death_tick: NDArray[np.int32] = field(init=False)
+
+    # NOTE: Per-cell linked lists of rows, cell_head[q * grid_size + r]
+    _cell_head: NDArray[np.int32] = field(init=False)
+    _next_in_cell: NDArray[np.int32] = field(init=False)
+
+    _expiries: TimingWheel = field(default_factory=TimingWheel, init=False)
+
+    def __post_init__(self) -> None:
+        self._q = np.zeros(self.capacity, dtype=np.int32)
+        self._r = np.zeros(self.capacity, dtype=np.int32)
+        self._role = np.zeros(self.capacity, dtype=np.int8)
+        self._is_dead = np.zeros(self.capacity, dtype=np.bool_)
+        self._death_tick = np.zeros(self.capacity, dtype=np.int32)
+
+        self._cell_head = np.full(self.grid_size**2, _NO_ROW, dtype=np.int32)
+        self._next_in_cell = np.full(self.capacity, _NO_ROW, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[Person]:
+        return self._people_at(np.arange(len(self._ids)))
+
+    def copy(self) -> PeopleColumnarRepository:
+        copied = copy.copy(self)
+        copied._ids = list(self._ids)
+        copied._rows = dict(self._rows)
+        for name, column in self._all_columns_by_name().items():
+            setattr(copied, f"_{name}", column.copy())
+        copied._cell_head = self._cell_head.copy()
+        copied._next_in_cell = self._next_in_cell.copy()
+        copied._expiries = self._expiries.copy()
+
+        return copied
+
+    def is_occupied(self, location: Location, role: PersonRole | None = None) -> bool:
+        q, r = location.q, location.r
+        if not (0 <= q < self.grid_size and 0 <= r < self.grid_size):
+            return False
+
+        if role is not None:
+            return any(
+                self._role[row] == ROLE_CODES[role] for row in self._rows_in(q, r)
+            )
+
+        return bool(self._cell_head[q * self.grid_size + r] != _NO_ROW)
+
+    def read_occupied(
+        self, grid_size: int, role: PersonRole | None = None
+    ) -> NDArray[np.bool_]:
+        if role is None:
+            occupied = self._cell_head != _NO_ROW
+        else:
+            rows = np.flatnonzero(self._mask({"role": role}))
+            occupied = np.zeros(self.grid_size**2, dtype=np.bool_)
+            occupied[self._q[rows] * self.grid_size + self._r[rows]] = True
+
+        return fit_to_grid(occupied.reshape(self.grid_size, -1), grid_size)
+
+    def read_columns(self) -> PeopleColumns:
+        size = len(self._ids)
+
+        return PeopleColumns(
+            ids=list(self._ids),
+            q=_read_only(self._q[:size]),
+            r=_read_only(self._r[:size]),
+            role=_read_only(self._role[:size]),
+            is_dead=_read_only(self._is_dead[:size]),
+            death_tick=_read_only(self._death_tick[:size]),
+        )
+
+    def read_expiring(self, tick: int) -> Iterator[Person]:
+        return self._people_at(self._rows_of(self._expiries.due(tick)))
+
+    def read_one(self, person_id: str) -> Person:
+        row = self._rows.get(person_id)
+        if row is None:
+            raise DoesNotExistError(person_id)
+
+        return next(self._people_at(np.array([row])))
+
+    def create_one(self, person: Person) -> Person:
+        if person.id in self._rows:
+            raise ExistsError(person.id)
+
+        self._ensure_within_grid(person.location)
+        if len(self._ids) == self.capacity:
+            self._grow()
+
+        row = len(self._ids)
+        self._ids.append(person.id)
+        self._rows[person.id] = row
+        self._write(row, person)
+        self._link(row)
+        self._expiries.schedule(person.id, expiry_of(person))
+
+        return person
+
+    def delete_one(self, person_id: str) -> None:
+        row = self._rows.get(person_id)
+        if row is None:
+            raise DoesNotExistError(person_id)
+
+        self._unlink(row)
+        self._expiries.cancel(person_id, self._expiry_at(row))
+
+        last = len(self._ids) - 1
+        if row != last:
+            self._unlink(last)
+            for column in self._all_columns_by_name().values():
+                column[row] = column[last]
+            self._ids[row] = self._ids[last]
+            self._rows[self._ids[row]] = row
+            self._link(row)
+
+        self._ids.pop()
+        del self._rows[person_id]
+
+    def update_one(self, person: Person) -> None:
+        row = self._rows.get(person.id)
+        if row is None:
+            raise DoesNotExistError(person.id)
+
+        self._ensure_within_grid(person.location)
+
+        moved = person.location.q != self._q[row] or person.location.r != self._r[row]
+        if moved:
+            self._unlink(row)
+        self._expiries.reschedule(person.id, self._expiry_at(row), expiry_of(person))
+
+        self._write(row, person)
+
+        if moved:
+            self._link(row)
+
+    def create_many(self, people: Iterable[Person]) -> list[Person]:
+        created: dict[str, Person] = {}
+        for person in people:
+            if person.id in self._rows or person.id in created:
+                raise ExistsError(person.id)
+            self._ensure_within_grid(person.location)
+            created[person.id] = person
+
+        if not created:
+            return []
+
+        start = len(self._ids)
+        end = start + len(created)
+        while end > self.capacity:
+            self._grow()
+
+        columns = PeopleColumns.of(list(created.values()))
+        for name, values in _values_of(columns).items():
+            self._all_columns_by_name()[name][start:end] = values
+
+        self._ids.extend(columns.ids)
+        self._rows.update(zip(columns.ids, range(start, end)))
+        self._rebuild_cells()
+        self._expiries.schedule_many(
+            columns.ids, [expiry_of(person) for person in created.values()]
+        )
+
+        return list(created.values())
+
+    def delete_many(self, person_ids: Iterable[str]) -> None:
+        rows = self._rows_of(list(dict.fromkeys(person_ids)))
+        if not rows.size:
+            return
+
+        self._expiries.cancel_many(
+            [self._ids[row] for row in rows.tolist()], self._expiries_at(rows)
+        )
+
+        keep = np.ones(len(self._ids), dtype=np.bool_)
+        keep[rows] = False
+        kept = np.flatnonzero(keep)
+
+        for column in self._all_columns_by_name().values():
+            column[: kept.size] = column[kept]
+
+        self._ids = [self._ids[row] for row in kept.tolist()]
+        self._rows = {person_id: row for row, person_id in enumerate(self._ids)}
+        self._rebuild_cells()
+
+    def update_many(self, people: Iterable[Person]) -> None:
+        updated = {person.id: person for person in people}
+        for person in updated.values():
+            self._ensure_within_grid(person.location)
+
+        columns = PeopleColumns.of(list(updated.values()))
+        self.update_columns(columns.ids, **_values_of(columns))
+
+    def update_columns(self, ids: Sequence[str], **columns: NDArray[Any]) -> None:
+        rows = self._rows_of(ids)
+
+        for name in ["q", "r"]:
+            if name in columns and not self._within_grid(columns[name]):
+                raise ValueError(f"Column <{name}> is off the grid")
+
+        expiring = "is_dead" in columns or "death_tick" in columns
+        old_expiries = self._expiries_at(rows) if expiring else []
+
+        for name, values in columns.items():
+            self._all_columns_by_name()[name][rows] = values
+
+        if "q" in columns or "r" in columns:
+            self._rebuild_cells()
+
+        if expiring:
+            for person_id, old, new in zip(
+                ids, old_expiries, self._expiries_at(rows), strict=True
+            ):
+                self._expiries.reschedule(person_id, old, new)
+
+    def read_many(self, **filters: Any) -> Iterator[Person]:
+        if not filters:
+            return iter(self)
+
+        self._ensure_known(filters, _FILTERS, "Unknown filter")
+
+        if "q" in filters and "r" in filters:
+            rows = self._rows_in(filters["q"], filters["r"])
+            return self._people_at(self._matching(rows, filters))
+
+        return self._people_at(np.flatnonzero(self._mask(filters)))
+
+    def count(self, **filters: Any) -> int:
+        if not filters:
+            return len(self._ids)
+
+        self._ensure_known(filters, _FILTERS, "Unknown filter")
+
+        return int(self._mask(filters).sum())
+
+    def read_all(self, people_ids: Iterable[str]) -> Iterator[Person]:
+        rows = [self._rows.get(person_id) for person_id in people_ids]
+
+        return self._people_at([row for row in rows if row is not None])
+
+    def read_range(
+        self, _field: str, lower: Any = None, upper: Any = None, **filters: Any
+    ) -> Iterator[Person]:
+        self._ensure_known([_field], _RANGES, "Unknown range filter")
+        self._ensure_known(filters, _FILTERS, "Unknown filter")
+
+        mask = self._mask(filters) & self._range_mask(_field, lower, upper)
+
+        return self._people_at(np.flatnonzero(mask))
+
+    def read_bbox(
+        self,
+        q_min: int | None = None,
+        q_max: int | None = None,
+        r_min: int | None = None,
+        r_max: int | None = None,
+        **filters: Any,
+    ) -> Iterator[Person]:
+        self._ensure_known(filters, _FILTERS, "Unknown filter")
+
+        # NOTE: Boxes with fewer cells than people walk the cell index instead
+        # of masking every row
+        qs = _cells_between(q_min, q_max, self.grid_size)
+        rs = _cells_between(r_min, r_max, self.grid_size)
+        if len(qs) * len(rs) < len(self._ids):
+            rows = sorted(row for q in qs for r in rs for row in self._rows_in(q, r))
+            return self._people_at(self._matching(rows, filters))
+
+        mask = (
+            self._mask(filters)
+            & self._range_mask("q", q_min, q_max)
+            & self._range_mask("r", r_min, r_max)
+        )
+
+        return self._people_at(np.flatnonzero(mask))
+
+    def read_within_radius(
+        self, center: Location, radius: int, **filters: Any
+    ) -> Iterator[Person]:
+        self._ensure_known(filters, _FILTERS, "Unknown filter")
+
+        rows = [
+            row
+            for cell in center.neighborhood(radius)
+            for row in self._rows_in(cell.q, cell.r)
+        ]
+
+        return self._people_at(self._matching(rows, filters))
+
+    def _people_at(self, rows: NDArray[np.intp] | list[int]) -> Iterator[Person]:
+        rows = np.asarray(rows, dtype=np.intp)
+
+        return iter(
+            [
+                Person(
+                    id=self._ids[row],
+                    location=Location(q=q, r=r),
+                    role=ROLES[role],
+                    is_dead=is_dead,
+                    death_tick=death_tick,
+                )
+                for row, q, r, role, is_dead, death_tick in zip(
+                    rows.tolist(),
+                    self._q[rows].tolist(),
+                    self._r[rows].tolist(),
+                    self._role[rows].tolist(),
+                    self._is_dead[rows].tolist(),
+                    self._death_tick[rows].tolist(),
+                )
+            ]
+        )
+
+    def _rows_of(self, person_ids: Sequence[str]) -> NDArray[np.intp]:
+        rows = np.empty(len(person_ids), dtype=np.intp)
+        for position, person_id in enumerate(person_ids):
+            row = self._rows.get(person_id)
+            if row is None:
+                raise DoesNotExistError(person_id)
+            rows[position] = row
+
+        return rows
+
+    def _rows_in(self, q: int, r: int) -> list[int]:
+        if not (0 <= q < self.grid_size and 0 <= r < self.grid_size):
+            return []
+
+        rows = []
+        row = int(self._cell_head[q * self.grid_size + r])
+        while row != _NO_ROW:
+            rows.append(row)
+            row = int(self._next_in_cell[row])
+
+        return rows
+
+    def _matching(self, rows: list[int], filters: dict[str, Any]) -> list[int]:
+        columns = self._columns_by_name()
+        filters = _encoded(filters)
+
+        return [
+            row
+            for row in rows
+            if all(columns[_field][row] == value for _field, value in filters.items())
+        ]
+
+    def _mask(self, filters: dict[str, Any]) -> NDArray[np.bool_]:
+        columns = self._columns_by_name()
+        mask = np.ones(len(self._ids), dtype=np.bool_)
+        for _field, value in _encoded(filters).items():
+            mask &= columns[_field][: len(self._ids)] == value
+
+        return mask
+
+    def _range_mask(self, _field: str, lower: Any, upper: Any) -> NDArray[np.bool_]:
+        column = self._columns_by_name()[_field][: len(self._ids)]
+        mask = np.ones(len(self._ids), dtype=np.bool_)
+        if lower is not None:
+            mask &= column >= lower
+        if upper is not None:
+            mask &= column <= upper
+
+        return mask
+
+    def _write(self, row: int, person: Person) -> None:
+        self._q[row] = person.location.q
+        self._r[row] = person.location.r
+        self._role[row] = ROLE_CODES[person.role]
+        self._is_dead[row] = person.is_dead
+        self._death_tick[row] = person.death_tick
+
+    def _expiry_at(self, row: int) -> int | None:
+        return None if self._is_dead[row] else int(self._death_tick[row])
+
+    def _expiries_at(self, rows: NDArray[np.intp]) -> list[int | None]:
+        return [
+            None if is_dead else death_tick
+            for is_dead, death_tick in zip(
+                self._is_dead[rows].tolist(), self._death_tick[rows].tolist()
+            )
+        ]
+
+    def _link(self, row: int) -> None:
+        cell = int(self._q[row]) * self.grid_size + int(self._r[row])
+        self._next_in_cell[row] = self._cell_head[cell]
+        self._cell_head[cell] = row
+
+    def _unlink(self, row: int) -> None:
+        cell = int(self._q[row]) * self.grid_size + int(self._r[row])
+
+        previous = _NO_ROW
+        current = int(self._cell_head[cell])
+        while current != row:
+            previous = current
+            current = int(self._next_in_cell[current])
+
+        if previous == _NO_ROW:
+            self._cell_head[cell] = self._next_in_cell[row]
+        else:
+            self._next_in_cell[previous] = self._next_in_cell[row]
+
+    def _rebuild_cells(self) -> None:
+        self._cell_head.fill(_NO_ROW)
+
+        size = len(self._ids)
+        if not size:
+            return
+
+        cells = self._q[:size].astype(np.int64) * self.grid_size + self._r[:size]
+        rows = np.argsort(cells, kind="stable")
+        sorted_cells = cells[rows]
+
+        same_cell_as_next = sorted_cells[:-1] == sorted_cells[1:]
+        self._next_in_cell[rows] = np.append(
+            np.where(same_cell_as_next, rows[1:], _NO_ROW), _NO_ROW
+        )
+
+        starts = np.flatnonzero(np.append(True, ~same_cell_as_next))
+        self._cell_head[sorted_cells[starts]] = rows[starts]
+
+    def _grow(self) -> None:
+        self.capacity = max(self.capacity * 2, 1)
+
+        self._q = _resized(self._q, self.capacity, 0)
+        self._r = _resized(self._r, self.capacity, 0)
+        self._role = _resized(self._role, self.capacity, 0)
+        self._is_dead = _resized(self._is_dead, self.capacity, False)
+        self._death_tick = _resized(self._death_tick, self.capacity, 0)
+        self._next_in_cell = _resized(self._next_in_cell, self.capacity, _NO_ROW)
+
+    def _columns_by_name(self) -> dict[str, NDArray[Any]]:
+        return {
+            "q": self._q,
+            "r": self._r,
+            "role": self._role,
+            "is_dead": self._is_dead,
+        }
+
+    def _all_columns_by_name(self) -> dict[str, NDArray[Any]]:
+        return {
+            "q": self._q,
+            "r": self._r,
+            "role": self._role,
+            "is_dead": self._is_dead,
+            "death_tick": self._death_tick,
+        }
+
+    def _within_grid(self, values: NDArray[Any]) -> bool:
+        return bool(np.all((values >= 0) & (values < self.grid_size)))
+
+    def _ensure_within_grid(self, location: Location) -> None:
+        if not (0 <= location.q < self.grid_size and 0 <= location.r < self.grid_size):
+            raise ValueError(f"Location <{location.q}, {location.r}> is off the grid")
+
+    @staticmethod
+    def _ensure_known(filters: Iterable[str], known: set[str], message: str) -> None:
+        for _field in filters:
+            if _field not in known:
+                raise ValueError(f"{message} <{_field}>")
+
+
+def _resized(array: NDArray[Any], capacity: int, fill: Any) -> NDArray[Any]:
+    resized = np.full(capacity, fill, dtype=array.dtype)
+    resized[: len(array)] = array
+
+    return resized
+
+
+def _cells_between(lower: int | None, upper: int | None, grid_size: int) -> range:
+    return range(
+        max(lower or 0, 0), min(grid_size, grid_size if upper is None else upper + 1)
+    )
+
+
+def _encoded(filters: dict[str, Any]) -> dict[str, Any]:
+    if "role" not in filters:
+        return filters
+
+    return {**filters, "role": ROLE_CODES[filters["role"]]}
+
+
+def _values_of(columns: PeopleColumns) -> dict[str, NDArray[Any]]:
+    return {
+        "q": columns.q,
+        "r": columns.r,
+        "role": columns.role,
+        "is_dead": columns.is_dead,
+        "death_tick": columns.death_tick,
+    }
+
+
+def _read_only(array: NDArray[Any]) -> NDArray[Any]:
+    array.flags.writeable = False
+
+    return array
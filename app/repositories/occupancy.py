@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.models.location import Location
+
+
+@dataclass
+class Occupancy:
+    layers: int = 1
+
+    # NOTE: Entities per (layer, q, r), grown on demand since repositories know
+    # no grid
+    _counts: NDArray[np.int32] = field(init=False)
+    _compiled: dict[tuple[int, int | None], NDArray[np.bool_]] = field(
+        default_factory=dict, init=False
+    )
+
+    def __post_init__(self) -> None:
+        self._counts = np.zeros((self.layers, 0, 0), dtype=np.int32)
+
+    def copy(self) -> Occupancy:
+        copied = Occupancy(layers=self.layers)
+        copied._counts = self._counts.copy()
+        copied._compiled = dict(self._compiled)
+
+        return copied
+
+    def is_occupied(self, location: Location, layer: int | None = None) -> bool:
+        _, rows, columns = self._counts.shape
+        if not (0 <= location.q < rows and 0 <= location.r < columns):
+            return False
+
+        counts = self._counts[:, location.q, location.r]
+
+        return bool(counts.any() if layer is None else counts[layer] > 0)
+
+    def occupied(self, grid_size: int, layer: int | None = None) -> NDArray[np.bool_]:
+        compiled = self._compiled.get((grid_size, layer))
+        if compiled is None:
+            counts = self._counts if layer is None else self._counts[[layer]]
+            compiled = self._compiled[grid_size, layer] = fit_to_grid(
+                np.any(counts > 0, axis=0), grid_size
+            )
+
+        return compiled
+
+    def add_one(self, location: Location, layer: int = 0) -> None:
+        self._ensure_fits(location.q, location.r)
+        self._counts[layer, location.q, location.r] += 1
+        self._compiled.clear()
+
+    def remove_one(self, location: Location, layer: int = 0) -> None:
+        self._counts[layer, location.q, location.r] -= 1
+        self._compiled.clear()
+
+    def move_one(
+        self, old: Location, new: Location, old_layer: int = 0, new_layer: int = 0
+    ) -> None:
+        if old != new or old_layer != new_layer:
+            self.add_one(new, new_layer)
+            self.remove_one(old, old_layer)
+
+    def add_many(
+        self, locations: Sequence[Location], layers: Sequence[int] | None = None
+    ) -> None:
+        self._change(locations, layers, 1)
+
+    def remove_many(
+        self, locations: Sequence[Location], layers: Sequence[int] | None = None
+    ) -> None:
+        self._change(locations, layers, -1)
+
+    def move_many(
+        self,
+        old: Sequence[Location],
+        new: Sequence[Location],
+        old_layers: Sequence[int] | None = None,
+        new_layers: Sequence[int] | None = None,
+    ) -> None:
+        old_layers = old_layers or [0] * len(old)
+        new_layers = new_layers or [0] * len(new)
+        moved = [
+            position
+            for position in range(len(old))
+            if old[position] != new[position]
+            or old_layers[position] != new_layers[position]
+        ]
+
+        # NOTE: Adding first validates the new locations before anything changes
+        self.add_many(
+            [new[position] for position in moved],
+            [new_layers[position] for position in moved],
+        )
+        self.remove_many(
+            [old[position] for position in moved],
+            [old_layers[position] for position in moved],
+        )
+
+    def _change(
+        self,
+        locations: Sequence[Location],
+        layers: Sequence[int] | None,
+        delta: int,
+    ) -> None:
+        if not locations:
+            return
+
+        q = np.array([location.q for location in locations], dtype=np.int64)
+        r = np.array([location.r for location in locations], dtype=np.int64)
+        if delta > 0:
+            self._ensure_fits(int(q.min()), int(r.min()))
+            self._ensure_fits(int(q.max()), int(r.max()))
+
+        layer = np.zeros(len(locations), dtype=np.int64)
+        if layers is not None:
+            layer[:] = layers
+
+        np.add.at(self._counts, (layer, q, r), delta)
+        self._compiled.clear()
+
+    def _ensure_fits(self, q: int, r: int) -> None:
+        if q < 0 or r < 0:
+            raise ValueError(f"Location <{q}, {r}> can not be occupied")
+
+        _, rows, columns = self._counts.shape
+        if q < rows and r < columns:
+            return
+
+        grown = np.zeros(
+            (self.layers, max(q + 1, 2 * rows), max(r + 1, 2 * columns)),
+            dtype=np.int32,
+        )
+        grown[:, :rows, :columns] = self._counts
+        self._counts = grown
+
+
+def fit_to_grid(occupied: NDArray[np.bool_], grid_size: int) -> NDArray[np.bool_]:
+    # NOTE: Flat and read only, indexed by cell like Topology
+    grid = np.zeros((grid_size, grid_size), dtype=np.bool_)
+    rows, columns = (min(size, grid_size) for size in occupied.shape)
+    grid[:rows, :columns] = occupied[:rows, :columns]
+
+    flat = grid.reshape(-1)
+    flat.flags.writeable = False
+
+    return flat
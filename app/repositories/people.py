@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.models.location import Location
+from app.models.person import Person, PersonRole
+
+ROLES = list(PersonRole)
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+
+@dataclass(frozen=True)
+class PeopleColumns:
+    ids: list[str]
+    q: NDArray[np.int32]
+    r: NDArray[np.int32]
+    role: NDArray[np.int8]
+    is_dead: NDArray[np.bool_]
+    death_tick: NDArray[np.int32]
+
+    @classmethod
+    def of(cls, people: Sequence[Person]) -> PeopleColumns:
+        return cls(
+            ids=[person.id for person in people],
+            q=np.array([person.location.q for person in people], dtype=np.int32),
+            r=np.array([person.location.r for person in people], dtype=np.int32),
+            role=np.array([ROLE_CODES[person.role] for person in people], np.int8),
+            is_dead=np.array([person.is_dead for person in people], dtype=np.bool_),
+            death_tick=np.array([person.death_tick for person in people], np.int32),
+        )
+
+
+def with_column_values(person: Person, values: dict[str, Any]) -> Person:
+    changes: dict[str, Any] = {}
+    if "q" in values or "r" in values:
+        changes["location"] = Location(
+            q=values.get("q", person.location.q),
+            r=values.get("r", person.location.r),
+        )
+    if "role" in values:
+        changes["role"] = ROLES[values["role"]]
+    if "is_dead" in values:
+        changes["is_dead"] = values["is_dead"]
+    if "death_tick" in values:
+        changes["death_tick"] = values["death_tick"]
+
+    return replace(person, **changes)
+
+
+def expiry_of(person: Person) -> int | None:
+    # NOTE: Only the living are waiting to die of old age
+    return None if person.is_dead else person.death_tick
+
+
+class PeopleRepository(ABC):  # pragma: no cover
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Person]:
+        pass
+
+    @abstractmethod
+    def copy(self) -> PeopleRepository:
+        pass
+
+    @abstractmethod
+    def read_one(self, person_id: str) -> Person:
+        pass
+
+    @abstractmethod
+    def create_one(self, person: Person) -> Person:
+        pass
+
+    @abstractmethod
+    def delete_one(self, person_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def update_one(self, person: Person) -> None:
+        pass
+
+    @abstractmethod
+    def create_many(self, people: Iterable[Person]) -> list[Person]:
+        pass
+
+    @abstractmethod
+    def delete_many(self, person_ids: Iterable[str]) -> None:
+        pass
+
+    @abstractmethod
+    def update_many(self, people: Iterable[Person]) -> None:
+        pass
+
+    @abstractmethod
+    def read_many(self, **filters: Any) -> Iterator[Person]:
+        pass
+
+    @abstractmethod
+    def count(self, **filters: Any) -> int:
+        pass
+
+    @abstractmethod
+    def read_all(self, people_ids: Iterable[str]) -> Iterator[Person]:
+        pass
+
+    @abstractmethod
+    def read_range(
+        self, _field: str, lower: Any = None, upper: Any = None, **filters: Any
+    ) -> Iterator[Person]:
+        pass
+
+    @abstractmethod
+    def read_bbox(
+        self,
+        q_min: int | None = None,
+        q_max: int | None = None,
+        r_min: int | None = None,
+        r_max: int | None = None,
+        **filters: Any,
+    ) -> Iterator[Person]:
+        pass
+
+    @abstractmethod
+    def read_within_radius(
+        self, center: Location, radius: int, **filters: Any
+    ) -> Iterator[Person]:
+        pass
+
+    @abstractmethod
+    def is_occupied(self, location: Location, role: PersonRole | None = None) -> bool:
+        pass
+
+    @abstractmethod
+    def read_occupied(
+        self, grid_size: int, role: PersonRole | None = None
+    ) -> NDArray[np.bool_]:
+        pass
+
+    @abstractmethod
+    def read_expiring(self, tick: int) -> Iterator[Person]:
+        pass
+
+    @abstractmethod
+    def read_columns(self) -> PeopleColumns:
+        pass
+
+    @abstractmethod
+    def update_columns(self, ids: Sequence[str], **columns: NDArray[Any]) -> None:
+        pass
@@ -16,12 +16,14 @@ class PeopleSnapshotFileRepository:
     def __post_init__(self) -> None:
         self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
 
-    def save(self, people: list[Person]) -> None:
-        raw = {"people": [asdict(person) for person in people]}
+    # NOTE: Files keep the remaining lifespan, death ticks only mean something
+    # within the run that counted them
+    def save(self, people: list[Person], tick: int = 0) -> None:
+        raw = {"people": [_raw_person_of(person, tick) for person in people]}
 
         self.snapshot_file.write_text(json.dumps(raw, indent=2))
 
-    def load(self) -> list[Person]:
+    def load(self, tick: int = 0) -> list[Person]:
         snapshot = self._fetch_snapshot()
 
         return [
@@ -30,7 +32,7 @@ class PeopleSnapshotFileRepository:
                 location=Location(**person["location"]),
                 role=PersonRole(person["role"]),
                 is_dead=person["is_dead"],
-                lifespan=person["lifespan"],
+                death_tick=tick + person["lifespan"],
             )
             for person in snapshot.people()
         ]
@@ -42,6 +44,13 @@ class PeopleSnapshotFileRepository:
         return _RawSnapshotData(self.snapshot_file.read_text())
 
 
+def _raw_person_of(person: Person, tick: int) -> dict[str, Any]:
+    raw = asdict(person)
+    raw["lifespan"] = raw.pop("death_tick") - tick
+
+    return raw
+
+
 @dataclass
 class _RawSnapshotData:
     raw: str
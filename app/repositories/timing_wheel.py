@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+
+@dataclass
+class TimingWheel:
+    # NOTE: Keys per absolute tick, so a bucket never holds a later round of the
+    # wheel. Dicts keep insertion order, so expiry order is reproducible.
+    _buckets: dict[int, dict[str, None]] = field(default_factory=dict)
+
+    def copy(self) -> TimingWheel:
+        return TimingWheel(
+            _buckets={tick: dict(keys) for tick, keys in self._buckets.items()}
+        )
+
+    def due(self, tick: int) -> list[str]:
+        return [
+            key
+            for bucket_tick in sorted(self._buckets)
+            if bucket_tick <= tick
+            for key in self._buckets[bucket_tick]
+        ]
+
+    def schedule(self, key: str, tick: int | None) -> None:
+        if tick is not None:
+            self._buckets.setdefault(tick, {})[key] = None
+
+    def cancel(self, key: str, tick: int | None) -> None:
+        if tick is None or tick not in self._buckets:
+            return
+
+        bucket = self._buckets[tick]
+        bucket.pop(key, None)
+        if not bucket:
+            del self._buckets[tick]
+
+    def reschedule(self, key: str, old: int | None, new: int | None) -> None:
+        if old != new:
+            self.cancel(key, old)
+            self.schedule(key, new)
+
+    def schedule_many(self, keys: Sequence[str], ticks: Sequence[int | None]) -> None:
+        for key, tick in zip(keys, ticks):
+            self.schedule(key, tick)
+
+    def cancel_many(self, keys: Sequence[str], ticks: Sequence[int | None]) -> None:
+        for key, tick in zip(keys, ticks):
+            self.cancel(key, tick)
@@ -6,6 +6,8 @@ from app.models.errors import DoesNotExistError
 from app.models.location import Location
 from app.routers.dependables import BuildingsServiceDependable
 from app.routers.schemas.building import (
+    BBOX_FILTERS,
+    RADIUS_FILTERS,
     BuildingCreate,
     BuildingFilters,
     BuildingLocation,
@@ -23,9 +25,29 @@ router = APIRouter(prefix="/buildings", tags=["Buildings"])
 def read_many(
     buildings: BuildingsServiceDependable, params: BuildingFilters = Depends()
 ) -> list[BuildingRead]:
-    filters = params.model_dump(exclude_none=True)
+    filters = params.model_dump(
+        exclude_none=True, exclude=BBOX_FILTERS | RADIUS_FILTERS
+    )
+    bbox = params.model_dump(exclude_none=True, include=BBOX_FILTERS)
+    radius = params.model_dump(exclude_none=True, include=RADIUS_FILTERS)
 
-    _buildings = buildings.read_many(**filters)
+    if radius and (bbox or radius.keys() != RADIUS_FILTERS):
+        raise HTTPException(
+            status_code=422,
+            detail="near_q, near_r and radius must be given together "
+            "and can't be combined with a bounding box",
+        )
+
+    if radius:
+        _buildings = buildings.read_within_radius(
+            Location(q=radius["near_q"], r=radius["near_r"]),
+            radius["radius"],
+            **filters,
+        )
+    elif bbox:
+        _buildings = buildings.read_bbox(**bbox, **filters)
+    else:
+        _buildings = buildings.read_many(**filters)
 
     return [
         BuildingRead(
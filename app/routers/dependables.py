@@ -5,6 +5,7 @@ from starlette.requests import Request
 
 from app.services.buildings import BuildingsService
 from app.services.people import PeopleService
+from app.services.simulation import SimulationService
 from app.services.websocket import WebSocketService
 
 
@@ -27,3 +28,12 @@ def get_websocket_manager(websocket: WebSocket) -> WebSocketService:
 
 
 WebSocketManagerDependable = Annotated[WebSocketService, Depends(get_websocket_manager)]
+
+
+def get_simulation_service(request: Request) -> SimulationService:
+    return request.app.state.simulation  # type: ignore
+
+
+SimulationServiceDependable = Annotated[
+    SimulationService, Depends(get_simulation_service)
+]
@@ -6,6 +6,8 @@ from app.models.location import Location
 from app.models.person import Person
 from app.routers.dependables import PeopleServiceDependable
 from app.routers.schemas.person import (
+    BBOX_FILTERS,
+    RADIUS_FILTERS,
     PersonCreate,
     PersonFilters,
     PersonLocation,
@@ -24,9 +26,29 @@ def read_many(
     people: PeopleServiceDependable,
     params: PersonFilters = Depends(),
 ) -> list[PersonRead]:
-    filters = params.model_dump(exclude_none=True)
+    filters = params.model_dump(
+        exclude_none=True, exclude=BBOX_FILTERS | RADIUS_FILTERS
+    )
+    bbox = params.model_dump(exclude_none=True, include=BBOX_FILTERS)
+    radius = params.model_dump(exclude_none=True, include=RADIUS_FILTERS)
+
+    if radius and (bbox or radius.keys() != RADIUS_FILTERS):
+        raise HTTPException(
+            status_code=422,
+            detail="near_q, near_r and radius must be given together "
+            "and can't be combined with a bounding box",
+        )
 
-    _people = people.read_many(**filters)
+    if radius:
+        _people = people.read_within_radius(
+            Location(q=radius["near_q"], r=radius["near_r"]),
+            radius["radius"],
+            **filters,
+        )
+    elif bbox:
+        _people = people.read_bbox(**bbox, **filters)
+    else:
+        _people = people.read_many(**filters)
 
     return [
         PersonRead(
@@ -37,7 +59,7 @@ def read_many(
             ),
             role=person.role,
             is_dead=person.is_dead,
-            lifespan=person.lifespan,
+            lifespan=people.lifespan_of(person),
         )
         for person in _people
     ]
@@ -62,7 +84,7 @@ def read_one(person_id: str, people: PeopleServiceDependable) -> PersonRead:
         ),
         role=_person.role,
         is_dead=_person.is_dead,
-        lifespan=_person.lifespan,
+        lifespan=people.lifespan_of(_person),
     )
 
 
@@ -79,7 +101,7 @@ def create_one(person: PersonCreate, people: PeopleServiceDependable) -> PersonR
         ),
         role=person.role,
         is_dead=person.is_dead,
-        lifespan=person.lifespan,
+        death_tick=people.death_tick_of(person.lifespan),
     )
 
     created = people.create_one(_person)
@@ -92,7 +114,7 @@ def create_one(person: PersonCreate, people: PeopleServiceDependable) -> PersonR
         ),
         role=created.role,
         is_dead=created.is_dead,
-        lifespan=created.lifespan,
+        lifespan=people.lifespan_of(created),
     )
 
 
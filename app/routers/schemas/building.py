@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field
 
 from app.runner.config import config
 
+BBOX_FILTERS = {"q_min", "q_max", "r_min", "r_max"}
+RADIUS_FILTERS = {"near_q", "near_r", "radius"}
+
 
 class BuildingLocation(BaseModel):
     q: int = Field(ge=0, lt=config.GRID_SIZE)
@@ -20,3 +23,12 @@ class BuildingRead(BaseModel):
 class BuildingFilters(BaseModel):
     q: int | None = None
     r: int | None = None
+
+    q_min: int | None = None
+    q_max: int | None = None
+    r_min: int | None = None
+    r_max: int | None = None
+
+    near_q: int | None = None
+    near_r: int | None = None
+    radius: int | None = Field(default=None, ge=0, le=config.GRID_SIZE)
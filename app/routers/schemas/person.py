@@ -3,6 +3,9 @@ from pydantic import BaseModel, Field
 from app.models.person import PersonRole
 from app.runner.config import config
 
+BBOX_FILTERS = {"q_min", "q_max", "r_min", "r_max"}
+RADIUS_FILTERS = {"near_q", "near_r", "radius"}
+
 
 class PersonLocation(BaseModel):
     q: int = Field(ge=0, lt=config.GRID_SIZE)
@@ -28,3 +31,12 @@ class PersonFilters(BaseModel):
     q: int | None = None
     r: int | None = None
     is_dead: bool | None = None
+
+    q_min: int | None = None
+    q_max: int | None = None
+    r_min: int | None = None
+    r_max: int | None = None
+
+    near_q: int | None = None
+    near_r: int | None = None
+    radius: int | None = Field(default=None, ge=0, le=config.GRID_SIZE)
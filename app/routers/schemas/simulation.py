@@ -0,0 +1,51 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.models.person import PersonRole
+
+
+class TickStatsRead(BaseModel):
+    tick_hz: float
+    overrun_policy: str
+    ticks: int
+    late_ticks: int
+    skipped_ticks: int
+    duration_p50: float
+    duration_p95: float
+    duration_p99: float
+    loop_lag_p50: float
+    loop_lag_p99: float
+    loop_lag_max: float
+
+
+class SubscriptionRead(BaseModel):
+    q_min: int | None
+    q_max: int | None
+    r_min: int | None
+    r_max: int | None
+    role: PersonRole | None
+    is_dead: bool | None
+    ids: tuple[str, ...] | None
+
+
+class WebSocketClientRead(BaseModel):
+    format: str
+    subscription: SubscriptionRead
+    awaiting_keyframe: bool
+    queued_frames: int
+    lag_ticks: int
+    sent_frames: int
+    dropped_frames: int
+
+
+class SubscriptionUpdate(BaseModel):
+    type: Literal["subscribe"]
+
+    q_min: int | None = None
+    q_max: int | None = None
+    r_min: int | None = None
+    r_max: int | None = None
+    role: PersonRole | None = None
+    is_dead: bool | None = None
+    ids: list[str] | None = Field(default=None, max_length=1000)
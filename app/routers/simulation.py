@@ -1,7 +1,22 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Annotated
 
-from app.routers.dependables import WebSocketManagerDependable
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette import status
+
+from app.routers.dependables import (
+    SimulationServiceDependable,
+    WebSocketManagerDependable,
+)
+from app.routers.schemas.simulation import (
+    SubscriptionRead,
+    SubscriptionUpdate,
+    TickStatsRead,
+    WebSocketClientRead,
+)
 from app.runner.config import config
+from app.services.frames import FrameFormat
+from app.services.subscriptions import Subscription
 
 router = APIRouter(prefix="/simulation", tags=["Simulation"])
 
@@ -10,16 +25,87 @@ router = APIRouter(prefix="/simulation", tags=["Simulation"])
 async def websocket_endpoint(
     websocket: WebSocket,
     websocket_manager: WebSocketManagerDependable,
+    frame_format: Annotated[FrameFormat, Query(alias="format")] = FrameFormat.json,
+    since: Annotated[int | None, Query(ge=0)] = None,
 ) -> None:
-    await websocket_manager.connect(websocket)
+    await websocket_manager.connect(websocket, frame_format, since)
     try:
         while True:
-            await websocket.receive_text()
+            message = await websocket.receive_text()
+
+            # NOTE: Clients that lost track of deltas ask for a keyframe
+            if message == "keyframe":
+                websocket_manager.await_keyframe(websocket)
+            elif message.startswith("{"):
+                websocket_manager.subscribe(websocket, _subscription_of(message))
+    except ValidationError:
+        websocket_manager.disconnect(websocket)
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Invalid subscription"
+        )
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket)
 
 
+def _subscription_of(message: str) -> Subscription:
+    update = SubscriptionUpdate.model_validate_json(message)
+
+    return Subscription(
+        q_min=update.q_min,
+        q_max=update.q_max,
+        r_min=update.r_min,
+        r_max=update.r_max,
+        role=update.role,
+        is_dead=update.is_dead,
+        people_ids=None if update.ids is None else tuple(dict.fromkeys(update.ids)),
+    )
+
+
 # HACK: Get grid size from endpoint because static can't use .env properly
 @router.get("/config")
 def get_config() -> dict[str, int]:
     return {"grid_size": config.GRID_SIZE}
+
+
+@router.get("/stats", response_model=TickStatsRead)
+def read_stats(simulation: SimulationServiceDependable) -> TickStatsRead:
+    scheduler = simulation.scheduler
+    loop_lag = simulation.loop_lag
+
+    return TickStatsRead(
+        tick_hz=scheduler.tick_hz,
+        overrun_policy=scheduler.policy.value,
+        ticks=scheduler.stats.ticks,
+        late_ticks=scheduler.stats.late_ticks,
+        skipped_ticks=scheduler.stats.skipped_ticks,
+        duration_p50=scheduler.stats.percentile(50),
+        duration_p95=scheduler.stats.percentile(95),
+        duration_p99=scheduler.stats.percentile(99),
+        loop_lag_p50=loop_lag.lags.percentile(50),
+        loop_lag_p99=loop_lag.lags.percentile(99),
+        loop_lag_max=loop_lag.max_lag,
+    )
+
+
+@router.get("/clients", response_model=list[WebSocketClientRead])
+def read_clients(simulation: SimulationServiceDependable) -> list[WebSocketClientRead]:
+    return [
+        WebSocketClientRead(
+            format=client.format.value,
+            subscription=SubscriptionRead(
+                q_min=client.subscription.q_min,
+                q_max=client.subscription.q_max,
+                r_min=client.subscription.r_min,
+                r_max=client.subscription.r_max,
+                role=client.subscription.role,
+                is_dead=client.subscription.is_dead,
+                ids=client.subscription.people_ids,
+            ),
+            awaiting_keyframe=client.awaiting_keyframe,
+            queued_frames=client.queued_frames,
+            lag_ticks=client.lag_ticks,
+            sent_frames=client.sent_frames,
+            dropped_frames=client.dropped_frames,
+        )
+        for client in list(simulation.websocket_manager.clients.values())
+    ]
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typer import Typer
+import time
+from typing import Annotated
+
+from typer import Option, Typer, echo
 
 from app.routers import buildings, people, simulation
-from app.runner.config import config
-from app.runner.factory import ServiceFactory
+from app.runner.config import Config, config
+from app.runner.factory import JsonFileRepository, ServiceFactory
 from app.runner.fastapi import CityApi, UvicornServer
+from app.services.sharding import gil_enabled
 
 cli = Typer(no_args_is_help=True, add_completion=False)
 
@@ -33,3 +37,85 @@ def run(host: str = "0.0.0.0", port: int = 8000, path: str = "") -> None:
             .build()
         )
     )
+
+
+@cli.command()
+def simulate(
+    ticks: Annotated[int, Option(min=1)],
+    out: Annotated[str, Option()],
+    seed: int | None = None,
+) -> None:
+    settings = Config()
+    settings.SNAPSHOT_PATH = None
+    settings.SEED = seed
+    factory = ServiceFactory(config=settings)
+
+    factory.world_entities.initialize()
+
+    agent_updates = 0
+    elapsed = 0.0
+    for _ in range(ticks):
+        agent_updates += factory.people_service.count(is_dead=False)
+
+        started = time.perf_counter()
+        factory.simulation_service.tick()
+        elapsed += time.perf_counter() - started
+
+    snapshot = JsonFileRepository(snapshot_path=out)
+    people = factory.people_service
+    snapshot.people().save(people.read_many(), tick=people.tick)
+    snapshot.buildings().save(factory.buildings_service.read_many())
+
+    echo(f"{ticks} ticks in {elapsed:.2f}s")
+    echo(
+        f"{ticks / elapsed:.2f} ticks/s, {agent_updates / elapsed:.0f} agent-updates/s"
+    )
+
+
+@cli.command()
+def benchmark(
+    threads: Annotated[list[int], Option()] = [1, 2, 4, 8],
+    people_amount: int = 20_000,
+    grid_size: int = 300,
+    ticks: int = 10,
+) -> None:
+    echo(f"GIL enabled: {gil_enabled()}")
+
+    engines = [("sequential", 1), ("vectorized", 1)]
+    engines.extend(("threaded", amount) for amount in threads)
+
+    serial = None
+    for engine, amount in engines:
+        settings = Config()
+        settings.GRID_SIZE = grid_size
+        settings.PEOPLE_AMOUNT = people_amount
+        settings.BUILDINGS_AMOUNT = 0
+        settings.SNAPSHOT_PATH = None
+        settings.SEED = 0
+        settings.PEOPLE_REPOSITORY = "columnar"
+        settings.SIMULATION_ENGINE = engine
+        settings.THREADS = amount
+
+        factory = ServiceFactory(config=settings)
+        seconds = _seconds_per_tick(factory, ticks)
+        serial = serial or seconds
+
+        # NOTE: The pool falls back to fewer threads with the GIL or small grids
+        used = factory.shard_pool.shards if engine == "threaded" else amount
+        fallback = f" (asked for {amount})" if used != amount else ""
+
+        echo(
+            f"{engine:>10} threads={used:<3} "
+            f"{seconds * 1000:9.2f} ms/tick  x{serial / seconds:.2f}{fallback}"
+        )
+
+
+def _seconds_per_tick(factory: ServiceFactory, ticks: int) -> float:
+    factory.world_entities.initialize()
+    factory.simulation_service.tick()
+
+    started = time.perf_counter()
+    for _ in range(ticks):
+        factory.simulation_service.tick()
+
+    return (time.perf_counter() - started) / ticks
@@ -7,12 +7,28 @@ load_dotenv()
 
 class Config:
     GRID_SIZE: int = int(os.getenv("GRID_SIZE", "100"))
+    MAP_LAYOUT: str = os.getenv("MAP_LAYOUT", "rectangle")
     PEOPLE_AMOUNT: int = int(os.getenv("PEOPLE_AMOUNT", "100"))
     BUILDINGS_AMOUNT: int = int(os.getenv("BUILDINGS_AMOUNT", "200"))
     KILLER_PROBABILITY: float = float(os.getenv("KILLER_PROBABILITY", "0.1"))
     POLICE_PROBABILITY: float = float(os.getenv("POLICE_PROBABILITY", "0.1"))
     SNAPSHOT_PATH: str | None = os.getenv("SNAPSHOT_PATH")
     SNAPSHOT_INTERVAL: str | None = os.getenv("SNAPSHOT_INTERVAL")
+    PEOPLE_REPOSITORY: str = os.getenv("PEOPLE_REPOSITORY", "in_memory")
+    SEED: int | None = int(os.environ["SEED"]) if os.getenv("SEED") else None
+    SIMULATION_ENGINE: str = os.getenv("SIMULATION_ENGINE", "sequential")
+    SHARDS: int = int(os.getenv("SHARDS", str(os.cpu_count() or 1)))
+    THREADS: int = int(os.getenv("THREADS", str(os.cpu_count() or 1)))
+    TICK_HZ: float = float(os.getenv("TICK_HZ", "1"))
+    TICK_OVERRUN_POLICY: str = os.getenv("TICK_OVERRUN_POLICY", "skip")
+    TICK_EXECUTION: str = os.getenv("TICK_EXECUTION", "thread")
+    TICK_SLICE_MS: float = float(os.getenv("TICK_SLICE_MS", "10"))
+    KEYFRAME_INTERVAL: int = int(os.getenv("KEYFRAME_INTERVAL", "50"))
+    WEBSOCKET_QUEUE_SIZE: int = int(os.getenv("WEBSOCKET_QUEUE_SIZE", "8"))
+    WEBSOCKET_SLOW_CLIENT_POLICY: str = os.getenv(
+        "WEBSOCKET_SLOW_CLIENT_POLICY", "drop_oldest"
+    )
+    WEBSOCKET_HISTORY_SIZE: int = int(os.getenv("WEBSOCKET_HISTORY_SIZE", "100"))
 
 
 config = Config()
@@ -6,18 +6,31 @@ from pathlib import Path
 
 from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
 from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.repositories.people import PeopleRepository
 from app.repositories.text_file.buildings_snapshot import (
     BuildingsSnapshotFileRepository,
 )
 from app.repositories.text_file.people_snapshot import PeopleSnapshotFileRepository
 from app.runner.config import Config
-from app.services.actions import ActionsService
+from app.services.actions import ActionsService, VectorizedActionsService
 from app.services.buildings import BuildingsService
-from app.services.movement import MovementService
+from app.services.frames import check_grid_size
+from app.services.movement import MovementService, VectorizedMovementService
 from app.services.people import PeopleService
-from app.services.simulation import SimulationService
+from app.services.randomness import RandomService
+from app.services.scheduler import OverrunPolicy, TickScheduler
+from app.services.sharding import (
+    ShardedActionsService,
+    ShardedMovementService,
+    ShardPool,
+    StripePool,
+    ThreadShardPool,
+)
+from app.services.simulation import SimulationService, TickExecution
 from app.services.snapshot import SnapshotService
-from app.services.websocket import WebSocketService
+from app.services.topology import Layout, Topology
+from app.services.websocket import SlowClientPolicy, WebSocketService
 from app.services.world_entities import WorldEntities
 
 
@@ -42,26 +55,100 @@ class ServiceFactory:
 
     @cached_property
     def websocket_manager(self) -> WebSocketService:
-        return WebSocketService()
+        return WebSocketService(
+            queue_size=self.config.WEBSOCKET_QUEUE_SIZE,
+            policy=SlowClientPolicy(self.config.WEBSOCKET_SLOW_CLIENT_POLICY),
+            history_size=self.config.WEBSOCKET_HISTORY_SIZE,
+        )
 
     @cached_property
     def buildings_service(self) -> BuildingsService:
         return BuildingsService(buildings=BuildingsInMemoryRepository())
 
+    @cached_property
+    def people_repository(self) -> PeopleRepository:
+        if self.config.PEOPLE_REPOSITORY == "in_memory":
+            return PeopleInMemoryRepository()
+
+        if self.config.PEOPLE_REPOSITORY == "columnar":
+            return PeopleColumnarRepository(grid_size=self.config.GRID_SIZE)
+
+        raise ValueError(
+            f"Unknown PEOPLE_REPOSITORY <{self.config.PEOPLE_REPOSITORY}>, "
+            f"expected in_memory or columnar"
+        )
+
     @cached_property
     def people_service(self) -> PeopleService:
-        return PeopleService(people=PeopleInMemoryRepository())
+        return PeopleService(people=self.people_repository)
+
+    @cached_property
+    def topology(self) -> Topology:
+        return Topology(
+            grid_size=self.config.GRID_SIZE, layout=Layout(self.config.MAP_LAYOUT)
+        )
+
+    @cached_property
+    def random_service(self) -> RandomService:
+        return RandomService(seed=self.config.SEED)
+
+    @cached_property
+    def shard_pool(self) -> StripePool:
+        if self.config.SIMULATION_ENGINE == "threaded":
+            return ThreadShardPool(topology=self.topology, shards=self.config.THREADS)
+
+        return ShardPool(topology=self.topology, shards=self.config.SHARDS)
 
     @cached_property
     def actions_service(self) -> ActionsService:
-        return ActionsService(people=self.people_service)
+        if self.config.SIMULATION_ENGINE == "sequential":
+            return ActionsService(people=self.people_service, topology=self.topology)
+
+        if self.config.SIMULATION_ENGINE == "vectorized":
+            return VectorizedActionsService(
+                people=self.people_service, topology=self.topology
+            )
+
+        if self.config.SIMULATION_ENGINE in ("sharded", "threaded"):
+            return ShardedActionsService(
+                people=self.people_service, topology=self.topology, pool=self.shard_pool
+            )
+
+        raise ValueError(
+            f"Unknown SIMULATION_ENGINE <{self.config.SIMULATION_ENGINE}>, "
+            f"expected sequential, vectorized, sharded or threaded"
+        )
 
     @cached_property
     def movement_service(self) -> MovementService:
-        return MovementService(
-            grid_size=self.config.GRID_SIZE,
-            buildings=self.buildings_service,
-            people=self.people_service,
+        if self.config.SIMULATION_ENGINE == "sequential":
+            return MovementService(
+                topology=self.topology,
+                buildings=self.buildings_service,
+                people=self.people_service,
+                streams=self.random_service,
+            )
+
+        if self.config.SIMULATION_ENGINE == "vectorized":
+            return VectorizedMovementService(
+                topology=self.topology,
+                buildings=self.buildings_service,
+                people=self.people_service,
+                streams=self.random_service,
+            )
+
+        if self.config.SIMULATION_ENGINE in ("sharded", "threaded"):
+            return ShardedMovementService(
+                topology=self.topology,
+                buildings=self.buildings_service,
+                people=self.people_service,
+                streams=self.random_service,
+                pool=self.shard_pool,
+            )
+
+        raise ValueError(
+            f"Unknown SIMULATION_ENGINE <{self.config.SIMULATION_ENGINE}>, "
+            f"expected sequential, vectorized, sharded or threaded"
         )
 
     @cached_property
@@ -84,22 +171,32 @@ class ServiceFactory:
 
     @cached_property
     def simulation_service(self) -> SimulationService:
+        check_grid_size(self.config.GRID_SIZE)
+
         return SimulationService(
             websocket_manager=self.websocket_manager,
             people=self.people_service,
             movement=self.movement_service,
             actions=self.actions_service,
+            scheduler=TickScheduler(
+                tick_hz=self.config.TICK_HZ,
+                policy=OverrunPolicy(self.config.TICK_OVERRUN_POLICY),
+            ),
+            execution=TickExecution(self.config.TICK_EXECUTION),
+            slice_budget=self.config.TICK_SLICE_MS / 1000,
+            keyframe_interval=self.config.KEYFRAME_INTERVAL,
         )
 
     @cached_property
     def world_entities(self) -> WorldEntities:
         return WorldEntities(
             snapshot_service=self.snapshot_service,
-            grid_size=self.config.GRID_SIZE,
+            topology=self.topology,
             people_amount=self.config.PEOPLE_AMOUNT,
             building_amount=self.config.BUILDINGS_AMOUNT,
             buildings_service=self.buildings_service,
             people_service=self.people_service,
             killer_probability=self.config.KILLER_PROBABILITY,
             police_probability=self.config.POLICE_PROBABILITY,
+            streams=self.random_service,
         )
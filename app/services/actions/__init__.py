@@ -1,3 +1,3 @@
-from app.services.actions.actions import ActionsService
+from app.services.actions.actions import ActionsService, VectorizedActionsService
 
-__all__ = ["ActionsService"]
+__all__ = ["ActionsService", "VectorizedActionsService"]
@@ -1,44 +1,128 @@
 from dataclasses import dataclass, field, replace
+from typing import Iterator
 
-from app.models.location import Location
-from app.models.person import Person
+import numpy as np
+from numpy.typing import NDArray
+
+from app.models.person import Person, PersonRole
+from app.repositories.people import ROLE_CODES, PeopleColumns
 from app.services.actions.strategies import RoleStrategies
 from app.services.people import PeopleService
+from app.services.topology import Topology
 
 
 @dataclass
 class ActionsService:
     people: PeopleService
+    topology: Topology
 
     strategies: RoleStrategies = field(default_factory=lambda: RoleStrategies())
 
     def kill(self) -> None:
-        for person in self.people.read_many(is_dead=False):
-            strategy = self.strategies.get_strategy_for(person.role)
-            adjacent_people = self._get_adjacent_people_of(person)
-            targets = strategy.get_targets_from(adjacent_people)
-
-            for target in targets:
-                dead_target = replace(target, is_dead=True)
-                self.people.update_one(dead_target)
-
-    def _get_adjacent_people_of(self, person: Person) -> list[Person]:
-        directions = [
-            (1, 0),  # East
-            (1, -1),  # Northeast
-            (0, -1),  # Northwest
-            (-1, 0),  # West
-            (-1, 1),  # Southwest
-            (0, 1),  # Southeast
+        for _ in self.kill_in_steps():
+            pass
+
+    def kill_in_steps(self) -> Iterator[None]:
+        dead_targets: dict[str, Person] = {}
+        for role, strategy in self.strategies.acting().items():
+            # NOTE: Occupancy per role rules out most hunters without reads. The
+            # dead are only written after the phase, so it holds throughout.
+            targeted = self._occupied_by(strategy.target_roles)
+
+            for person in self.people.read_many(is_dead=False, role=role):
+                cells = self.topology.adjacent_cells(person.location)
+
+                if any(targeted[cell] for cell in cells):
+                    targets = strategy.get_targets_from(self._people_at(cells))
+                    for target in targets:
+                        dead_targets[target.id] = replace(target, is_dead=True)
+
+                yield
+
+        self.people.update_many(dead_targets.values())
+
+    def _occupied_by(self, roles: set[PersonRole]) -> NDArray[np.bool_]:
+        occupied = np.zeros(self.topology.cells, dtype=np.bool_)
+        for role in roles:
+            occupied |= self.people.read_occupied(self.topology.grid_size, role)
+
+        return occupied
+
+    def _people_at(self, cells: list[int]) -> list[Person]:
+        grid_size = self.topology.grid_size
+
+        return [
+            person
+            for q, r in (divmod(cell, grid_size) for cell in cells)
+            for person in self.people.read_many(q=q, r=r)
         ]
 
-        adjacent_people = []
-        for dq, dr in directions:
-            adjacent_location = Location(
-                q=person.location.q + dq, r=person.location.r + dr
-            )
-            adjacent_people.extend(
-                self.people.read_many(q=adjacent_location.q, r=adjacent_location.r)
+
+@dataclass
+class VectorizedActionsService(ActionsService):
+    def kill_in_steps(self) -> Iterator[None]:
+        self.kill()
+        yield
+
+    def kill(self) -> None:
+        columns = self.people.read_columns()
+        alive = ~columns.is_dead
+        if not alive.any():
+            return
+
+        cells = self.topology.cells_of(columns.q, columns.r)
+        threatened = self._threatened(self._hunted_cells(columns, cells, alive))
+
+        # NOTE: Everyone alive at the start of the phase acts, even if killed in it
+        role_bits = np.left_shift(1, columns.role).astype(np.uint8)
+        victims = np.flatnonzero(alive & (threatened[cells] & role_bits > 0))
+        if not victims.size:
+            return
+
+        self.people.update_columns(
+            [columns.ids[row] for row in victims.tolist()],
+            is_dead=np.ones(victims.size, dtype=np.bool_),
+        )
+
+    def _hunted_cells(
+        self,
+        columns: PeopleColumns,
+        cells: NDArray[np.int64],
+        alive: NDArray[np.bool_],
+    ) -> NDArray[np.uint8]:
+        # NOTE: Bit n of hunted[cell] is set when someone there hunts role n. One
+        # extra zero cell at the end is what NO_CELL neighbors read.
+        hunted = np.zeros(self.topology.cells + 1, dtype=np.uint8)
+
+        for role, strategy in self.strategies.acting().items():
+            hunters = alive & (columns.role == ROLE_CODES[role])
+            if not hunters.any():
+                continue
+
+            target_bits = sum(
+                1 << ROLE_CODES[target] for target in strategy.target_roles
             )
 
-        return adjacent_people
+            np.bitwise_or.at(hunted, cells[hunters], np.uint8(target_bits))
+
+        return hunted
+
+    def _threatened(self, hunted: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        threatened = np.zeros(self.topology.cells, dtype=np.uint8)
+        threaten_cells(hunted, threatened, self.topology.neighbors, 0, len(threatened))
+
+        return threatened
+
+
+def threaten_cells(
+    hunted: NDArray[np.uint8],
+    threatened: NDArray[np.uint8],
+    neighbors: NDArray[np.int32],
+    start: int,
+    stop: int,
+) -> None:
+    # NOTE: One gather per direction, much faster than reducing along rows
+    block = neighbors[start:stop]
+    threatened[start:stop] = hunted[block[:, 0]]
+    for direction in range(1, block.shape[1]):
+        threatened[start:stop] |= hunted[block[:, direction]]
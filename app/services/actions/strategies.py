@@ -5,27 +5,48 @@ from app.models.person import Person, PersonRole
 
 
 class RoleStrategy(ABC):  # pragma: no cover
+    @property
+    @abstractmethod
+    def target_roles(self) -> set[PersonRole]:
+        pass
+
+    @property
+    def can_act(self) -> bool:
+        return bool(self.target_roles)
+
     @abstractmethod
     def get_targets_from(self, adjacent_people: list[Person]) -> list[Person]:
         pass
 
 
 class CitizenStrategy(RoleStrategy):
+    @property
+    def target_roles(self) -> set[PersonRole]:
+        return set()
+
     def get_targets_from(self, adjacent_people: list[Person]) -> list[Person]:
         return []
 
 
 class KillerStrategy(RoleStrategy):
+    @property
+    def target_roles(self) -> set[PersonRole]:
+        return {PersonRole.citizen}
+
     def get_targets_from(self, adjacent_people: list[Person]) -> list[Person]:
         return [
-            person for person in adjacent_people if person.role == PersonRole.citizen
+            person for person in adjacent_people if person.role in self.target_roles
         ]
 
 
 class PoliceStrategy(RoleStrategy):
+    @property
+    def target_roles(self) -> set[PersonRole]:
+        return {PersonRole.killer}
+
     def get_targets_from(self, adjacent_people: list[Person]) -> list[Person]:
         return [
-            person for person in adjacent_people if person.role == PersonRole.killer
+            person for person in adjacent_people if person.role in self.target_roles
         ]
 
 
@@ -41,5 +62,12 @@ class RoleStrategies:
     def get_strategy_for(self, role: PersonRole) -> RoleStrategy:
         return self.strategies[role]
 
+    def acting(self) -> dict[PersonRole, RoleStrategy]:
+        return {
+            role: strategy
+            for role, strategy in self.strategies.items()
+            if strategy.can_act
+        }
+
     def register_strategy_for(self, role: PersonRole, strategy: RoleStrategy) -> None:
         self.strategies[role] = strategy
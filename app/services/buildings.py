@@ -1,7 +1,11 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterable
+
+import numpy as np
+from numpy.typing import NDArray
 
 from app.models.building import Building
+from app.models.location import Location
 from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
 
 
@@ -12,11 +16,46 @@ class BuildingsService:
     def create_one(self, building: Building) -> Building:
         return self.buildings.create_one(building)
 
+    def create_many(self, buildings: Iterable[Building]) -> list[Building]:
+        return self.buildings.create_many(buildings)
+
     def read_one(self, building_id: str) -> Building:
         return self.buildings.read_one(building_id)
 
     def read_many(self, **filters: Any) -> list[Building]:
         return list(self.buildings.read_many(**filters))
 
+    def read_range(
+        self, _field: str, lower: Any = None, upper: Any = None, **filters: Any
+    ) -> list[Building]:
+        return list(self.buildings.read_range(_field, lower, upper, **filters))
+
+    def read_bbox(
+        self,
+        q_min: int | None = None,
+        q_max: int | None = None,
+        r_min: int | None = None,
+        r_max: int | None = None,
+        **filters: Any,
+    ) -> list[Building]:
+        return list(self.buildings.read_bbox(q_min, q_max, r_min, r_max, **filters))
+
+    def read_within_radius(
+        self, center: Location, radius: int, **filters: Any
+    ) -> list[Building]:
+        return list(self.buildings.read_within_radius(center, radius, **filters))
+
+    def is_occupied(self, location: Location) -> bool:
+        return self.buildings.is_occupied(location)
+
+    def read_occupied(self, grid_size: int) -> NDArray[np.bool_]:
+        return self.buildings.read_occupied(grid_size)
+
     def delete_one(self, building_id: str) -> None:
         self.buildings.delete_one(building_id)
+
+    def delete_many(self, building_ids: Iterable[str]) -> None:
+        self.buildings.delete_many(building_ids)
+
+    def update_many(self, buildings: Iterable[Building]) -> None:
+        self.buildings.update_many(buildings)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Sequence
+
+from numpy.typing import NDArray
+
+from app.models.person import Person
+
+_MOVES = {"q", "r"}
+
+
+@dataclass
+class ChangeSet:
+    # NOTE: Ids only, frames read the current state of everyone listed. Dicts
+    # keep the order changes were made in.
+    created: dict[str, None] = field(default_factory=dict)
+    moved: dict[str, None] = field(default_factory=dict)
+    died: dict[str, None] = field(default_factory=dict)
+    deleted: dict[str, None] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.moved or self.died or self.deleted)
+
+    def create(self, person_ids: Iterable[str]) -> None:
+        for person_id in person_ids:
+            self.deleted.pop(person_id, None)
+            self.created[person_id] = None
+
+    def move(self, person_ids: Iterable[str]) -> None:
+        self.moved.update(dict.fromkeys(person_ids))
+
+    def die(self, person_ids: Iterable[str]) -> None:
+        self.died.update(dict.fromkeys(person_ids))
+
+    def delete(self, person_ids: Iterable[str]) -> None:
+        for person_id in person_ids:
+            self.created.pop(person_id, None)
+            self.moved.pop(person_id, None)
+            self.died.pop(person_id, None)
+            self.deleted[person_id] = None
+
+    def update(self, existing: Sequence[Person], updated: Sequence[Person]) -> None:
+        for before, after in zip(existing, updated):
+            if after.location != before.location:
+                self.moved[after.id] = None
+            if after.is_dead and not before.is_dead:
+                self.died[after.id] = None
+
+            # NOTE: Anything else is sent whole, like a person just created
+            if (after.role, after.death_tick) != (before.role, before.death_tick) or (
+                before.is_dead and not after.is_dead
+            ):
+                self.created[after.id] = None
+
+    def update_columns(
+        self, ids: Sequence[str], columns: dict[str, NDArray[Any]]
+    ) -> None:
+        if _MOVES & columns.keys():
+            self.move(ids)
+        if "is_dead" in columns:
+            is_dead = columns["is_dead"].tolist()
+            self.die(ids[position] for position, dead in enumerate(is_dead) if dead)
+        if columns.keys() - _MOVES - {"is_dead"}:
+            self.create(ids)
+
+    def merge(self, later: ChangeSet) -> None:
+        self.create(later.created)
+        self.move(later.moved)
+        self.die(later.died)
+        self.delete(later.deleted)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from app.models.person import Person, PersonRole
+from app.services.changes import ChangeSet
+from app.services.people import PeopleService
+from app.services.subscriptions import EVERYONE, Subscription
+
+
+class FrameType(str, Enum):
+    keyframe = "keyframe"
+    delta = "delta"
+
+
+class FrameFormat(str, Enum):
+    json = "json"
+    binary = "binary"
+
+
+# NOTE: Type, tick, then how many ids are mapped, created, moved, died and
+# deleted. Sections follow by element size, so typed arrays stay aligned.
+BINARY_HEADER = struct.Struct("<B3x6I")
+BINARY_FRAME_TYPES = {FrameType.keyframe: 0, FrameType.delta: 1}
+BINARY_ROLES = {role: code for code, role in enumerate(PersonRole)}
+BINARY_DEAD = 1
+# NOTE: Locations are packed as uint16
+BINARY_MAX_GRID_SIZE = 2**16
+
+
+@dataclass(frozen=True)
+class Frames:
+    tick: int
+
+    # NOTE: Encoded once for every client. Clients in sync get delta, which is
+    # a keyframe too every keyframe_interval ticks.
+    delta: str | bytes
+    keyframe: str | bytes | None = None
+    format: FrameFormat = FrameFormat.json
+    subscription: Subscription = EVERYONE
+
+
+@dataclass(frozen=True)
+class Frame:
+    type: FrameType
+    tick: int
+
+    # NOTE: A keyframe creates everyone
+    created: list[Person]
+    moved: list[Person] = field(default_factory=list)
+    died: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+
+@dataclass
+class WireIds:
+    # NOTE: Small ids standing in for person ids in binary frames. Released
+    # when people are deleted, but never reused, so a client that missed a
+    # frame can't mistake one person for another.
+    ids: dict[str, int] = field(default_factory=dict)
+    _next: int = 0
+
+    def ids_of(self, person_ids: Iterable[str], mapped: dict[str, int]) -> list[int]:
+        wire_ids = []
+        for person_id in person_ids:
+            wire_id = self.ids.get(person_id)
+            if wire_id is None:
+                wire_id = self.ids[person_id] = mapped[person_id] = self._next
+                self._next += 1
+
+            wire_ids.append(wire_id)
+
+        return wire_ids
+
+    def known(self, person_ids: Iterable[str]) -> list[int]:
+        return [
+            wire_id
+            for person_id in person_ids
+            if (wire_id := self.ids.get(person_id)) is not None
+        ]
+
+    def release(self, person_ids: Iterable[str]) -> None:
+        for person_id in person_ids:
+            self.ids.pop(person_id, None)
+
+
+def check_grid_size(grid_size: int) -> None:
+    if grid_size > BINARY_MAX_GRID_SIZE:
+        raise ValueError(
+            f"Grid size <{grid_size}> does not fit binary frames, "
+            f"expected at most {BINARY_MAX_GRID_SIZE}"
+        )
+
+
+def keyframe_of(people: PeopleService, subscription: Subscription = EVERYONE) -> Frame:
+    return Frame(
+        type=FrameType.keyframe,
+        tick=people.tick,
+        created=subscription.read(people),
+    )
+
+
+def delta_of(people: PeopleService, changes: ChangeSet) -> Frame:
+    current = {
+        person.id: person
+        for person in people.read_all(
+            {**changes.created, **changes.moved, **changes.died}
+        )
+    }
+    updated = [person_id for person_id in current if person_id not in changes.created]
+
+    # NOTE: Someone changed and then deleted within one frame is only deleted
+    return Frame(
+        type=FrameType.delta,
+        tick=people.tick,
+        created=[
+            current[person_id] for person_id in changes.created if person_id in current
+        ],
+        moved=[
+            current[person_id] for person_id in updated if person_id in changes.moved
+        ],
+        died=[person_id for person_id in updated if person_id in changes.died],
+        deleted=list(changes.deleted),
+    )
+
+
+def view_delta_of(view: Frame, changes: ChangeSet, seen: dict[str, None]) -> Frame:
+    # NOTE: What a subscription sees now against what it saw the tick before.
+    # People coming into view are created, those leaving it deleted.
+    visible = {person.id for person in view.created}
+    kept = [
+        person
+        for person in view.created
+        if person.id in seen and person.id not in changes.created
+    ]
+
+    return Frame(
+        type=FrameType.delta,
+        tick=view.tick,
+        created=[
+            person
+            for person in view.created
+            if person.id not in seen or person.id in changes.created
+        ],
+        moved=[person for person in kept if person.id in changes.moved],
+        died=[person.id for person in kept if person.id in changes.died],
+        deleted=[person_id for person_id in seen if person_id not in visible],
+    )
+
+
+def encode(
+    frame: Frame,
+    people: PeopleService,
+    frame_format: FrameFormat,
+    wire_ids: WireIds,
+) -> str | bytes:
+    if frame_format == FrameFormat.binary:
+        return binary_of(frame, people, wire_ids)
+
+    return json.dumps(json_of(frame, people), separators=(",", ":"))
+
+
+def json_of(frame: Frame, people: PeopleService) -> dict[str, Any]:
+    records = [record_of(person, people) for person in frame.created]
+    if frame.type == FrameType.keyframe:
+        return {"type": frame.type.value, "tick": frame.tick, "people": records}
+
+    return {
+        "type": frame.type.value,
+        "tick": frame.tick,
+        "created": records,
+        "moved": [
+            {"id": person.id, "location": asdict(person.location)}
+            for person in frame.moved
+        ],
+        "died": frame.died,
+        "deleted": frame.deleted,
+    }
+
+
+def binary_of(frame: Frame, people: PeopleService, wire_ids: WireIds) -> bytes:
+    # NOTE: Created people may be new to the client without being new, like
+    # those coming into a subscription's view, so they are always mapped
+    created_ids = wire_ids.ids_of((person.id for person in frame.created), {})
+    mapped = dict(zip((person.id for person in frame.created), created_ids))
+
+    moved_ids = wire_ids.ids_of((person.id for person in frame.moved), mapped)
+    died_ids = wire_ids.ids_of(frame.died, mapped)
+    deleted_ids = wire_ids.known(frame.deleted)
+
+    names = [person_id.encode() for person_id in mapped]
+    sections = [
+        _column(list(mapped.values()), "<u4"),
+        _column(created_ids, "<u4"),
+        _column([people.lifespan_of(person) for person in frame.created], "<u4"),
+        _column(moved_ids, "<u4"),
+        _column(died_ids, "<u4"),
+        _column(deleted_ids, "<u4"),
+        *_locations_of(frame.created),
+        *_locations_of(frame.moved),
+        _column([len(name) for name in names], "<u2"),
+        _column([BINARY_ROLES[person.role] for person in frame.created], "u1"),
+        _column(
+            [BINARY_DEAD if person.is_dead else 0 for person in frame.created], "u1"
+        ),
+    ]
+    header = BINARY_HEADER.pack(
+        BINARY_FRAME_TYPES[frame.type],
+        frame.tick,
+        len(mapped),
+        len(created_ids),
+        len(moved_ids),
+        len(died_ids),
+        len(deleted_ids),
+    )
+
+    return b"".join([header, *sections, *names])
+
+
+def record_of(person: Person, people: PeopleService) -> dict[str, Any]:
+    record = asdict(person)
+    del record["death_tick"]
+    record["lifespan"] = people.lifespan_of(person)
+
+    return record
+
+
+def _locations_of(people: Sequence[Person]) -> list[bytes]:
+    return [
+        _column([person.location.q for person in people], "<u2"),
+        _column([person.location.r for person in people], "<u2"),
+    ]
+
+
+def _column(values: list[int], dtype: str) -> bytes:
+    return np.array(values, dtype=dtype).tobytes()
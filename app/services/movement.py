@@ -1,62 +1,152 @@
-import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from typing import Iterator, Sequence
 
-from app.models.location import Location
+import numpy as np
+from numpy.typing import NDArray
+
+from app.models.location import DIRECTIONS, Location
 from app.models.person import Person
 from app.services.buildings import BuildingsService
 from app.services.people import PeopleService
+from app.services.randomness import Phase, RandomService
+from app.services.topology import NO_CELL, Topology, free_cells
 
 
 @dataclass
 class MovementService:
-    grid_size: int
+    topology: Topology
     buildings: BuildingsService
     people: PeopleService
+    streams: RandomService = field(default_factory=RandomService)
 
     def move_people_to_random_adjacent_location(self) -> None:
-        for person in self.people.read_many(is_dead=False):
-            generated_location = self._generate_random_adjacent_location_for(person)
-            reduced_lifespan = person.lifespan - 1
-            updated_person = Person(
-                id=person.id,
-                location=generated_location,
-                role=person.role,
-                is_dead=reduced_lifespan <= 0,
-                lifespan=reduced_lifespan,
+        for _ in self.move_in_steps():
+            pass
+
+    def move_in_steps(self) -> Iterator[None]:
+        people = self.people.read_many(is_dead=False)
+        rng = self.streams.stream(Phase.movement)
+        preferences = rng.random((len(people), len(DIRECTIONS))).argsort(axis=1)
+
+        # NOTE: Checked by cell, kept up to date as people move during the tick
+        occupied = self._occupied()
+        for person, preference in zip(people, preferences.tolist()):
+            generated_location = self._generate_random_adjacent_location_for(
+                person, preference, occupied
             )
-            self.people.update_one(updated_person)
+            if generated_location != person.location:
+                self.people.update_one(replace(person, location=generated_location))
+                occupied[self.topology.cell_of(generated_location)] = True
+                occupied[self.topology.cell_of(person.location)] = not self._is_free(
+                    person.location
+                )
 
-    def _generate_random_adjacent_location_for(self, person: Person) -> Location:
-        directions = [
-            (1, 0),  # East
-            (1, -1),  # Northeast
-            (0, -1),  # Northwest
-            (-1, 0),  # West
-            (-1, 1),  # Southwest
-            (0, 1),  # Southeast
-        ]
+            yield
 
-        random.shuffle(directions)
+    def _generate_random_adjacent_location_for(
+        self, person: Person, preferences: Sequence[int], occupied: NDArray[np.bool_]
+    ) -> Location:
+        neighbors = self.topology.neighbor_cells(person.location)
 
-        for dq, dr in directions:
-            new_q = person.location.q + dq
-            new_r = person.location.r + dr
+        for preference in preferences:
+            cell = neighbors[preference]
+            if cell != NO_CELL and not occupied[cell]:
+                return self.topology.location_of(cell)
 
-            if not self._is_within_bounds(new_q, new_r):
-                continue
+        return person.location
 
-            new_location = Location(q=new_q, r=new_r)
+    def _occupied(self) -> NDArray[np.bool_]:
+        grid_size = self.topology.grid_size
 
-            if self._is_location_free(new_location):
-                return new_location
+        return self.buildings.read_occupied(grid_size) | self.people.read_occupied(
+            grid_size
+        )
 
-        return person.location
+    def _is_free(self, location: Location) -> bool:
+        return not (
+            self.people.is_occupied(location) or self.buildings.is_occupied(location)
+        )
+
+
+@dataclass
+class VectorizedMovementService(MovementService):
+    conflict_rounds: int = 4
+
+    def move_in_steps(self) -> Iterator[None]:
+        self.move_people_to_random_adjacent_location()
+        yield
+
+    def move_people_to_random_adjacent_location(self) -> None:
+        columns = self.people.read_columns()
+        alive = np.flatnonzero(~columns.is_dead)
+        if not alive.size:
+            return
+
+        # NOTE: Cells off the map count as occupied, so nobody moves onto them
+        grid_size = self.topology.grid_size
+        occupied = (
+            ~self.topology.in_map
+            | self.buildings.read_occupied(grid_size)
+            | self.people.read_occupied(grid_size)
+        )
+        cells = self.topology.cells_of(columns.q, columns.r)[alive]
+        new_cells = self._move(cells, occupied)
+
+        # NOTE: Blocked people stay put, only those who moved are written
+        moved = new_cells != cells
+        if not moved.any():
+            return
+
+        new_q, new_r = self.topology.coordinates_of(new_cells[moved])
+        self.people.update_columns(
+            [columns.ids[row] for row in alive[moved].tolist()], q=new_q, r=new_r
+        )
+
+    def _move(
+        self, cells: NDArray[np.int64], occupied: NDArray[np.bool_]
+    ) -> NDArray[np.int64]:
+        return move_batch(
+            cells,
+            self.topology.neighbors,
+            occupied,
+            self.streams.stream(Phase.movement),
+            self.conflict_rounds,
+        )
+
+
+def move_batch(
+    cells: NDArray[np.int64],
+    neighbors: NDArray[np.int32],
+    occupied: NDArray[np.bool_],
+    rng: np.random.Generator,
+    conflict_rounds: int,
+) -> NDArray[np.int64]:
+    new_cells = cells.copy()
+
+    # NOTE: Same as shuffling the six directions separately for everyone
+    preferences = np.argsort(rng.random((len(cells), len(DIRECTIONS))), axis=1)
+    candidates = np.take_along_axis(neighbors[cells], preferences, axis=1)
+
+    pending = np.arange(len(cells))
+    for _ in range(conflict_rounds):
+        free = free_cells(candidates[pending], occupied)
+        has_free = free.any(axis=1)
+        movers = pending[has_free]
+        if not movers.size:
+            break
+
+        targets = candidates[movers, free[has_free].argmax(axis=1)]
+
+        # NOTE: One random winner per contested cell, the rest retry
+        shuffled = rng.permutation(len(movers))
+        _, first_claims = np.unique(targets[shuffled], return_index=True)
+        won = shuffled[first_claims]
 
-    def _is_within_bounds(self, q: int, r: int) -> bool:
-        return 0 <= q < self.grid_size and 0 <= r < self.grid_size
+        winners = movers[won]
+        occupied[cells[winners]] = False
+        occupied[targets[won]] = True
+        new_cells[winners] = targets[won]
 
-    def _is_location_free(self, location: Location) -> bool:
-        has_person = self.people.read_many(q=location.q, r=location.r)
-        has_building = self.buildings.read_many(q=location.q, r=location.r)
+        pending = np.setdiff1d(pending, winners, assume_unique=True)
 
-        return not has_person and not has_building
+    return new_cells
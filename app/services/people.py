@@ -1,16 +1,69 @@
-from dataclasses import dataclass
-from typing import Any
+from __future__ import annotations
 
-from app.models.person import Person
-from app.repositories.in_memory.people import PeopleInMemoryRepository
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from threading import Lock
+from typing import Any, Callable, Iterable, Iterator, Sequence, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.models.location import Location
+from app.models.person import Person, PersonRole
+from app.repositories.people import PeopleColumns, PeopleRepository
+from app.services.changes import ChangeSet
+
+T = TypeVar("T")
 
 
 @dataclass
 class PeopleService:
-    people: PeopleInMemoryRepository
+    people: PeopleRepository
+    tick: int = 0
+
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+    _changes: ChangeSet = field(default_factory=ChangeSet, init=False, repr=False)
+    _pending_writes: list[Callable[[PeopleRepository], Any]] | None = field(
+        default=None, init=False, repr=False
+    )
+
+    @contextmanager
+    def next_generation(self) -> Iterator[PeopleService]:
+        with self._lock:
+            staged = PeopleService(people=self.people.copy(), tick=self.tick + 1)
+            self._pending_writes = []
+
+        try:
+            yield staged
+        except BaseException:
+            with self._lock:
+                self._pending_writes = None
+            raise
+
+        # NOTE: Writes made while staging win over the staged generation
+        with self._lock:
+            for write in self._pending_writes or []:
+                write(staged.people)
+            self.people = staged.people
+            self.tick = staged.tick
+
+            # NOTE: Writes made while staging happened after the staged ones
+            staged._changes.merge(self._changes)
+            self._changes = staged._changes
+            self._pending_writes = None
 
     def create_one(self, person: Person) -> Person:
-        return self.people.create_one(person)
+        return self._write(
+            lambda people: people.create_one(person),
+            lambda changes: changes.create([person.id]),
+        )
+
+    def create_many(self, people: Iterable[Person]) -> list[Person]:
+        created = list(people)
+        return self._write(
+            lambda repository: repository.create_many(created),
+            lambda changes: changes.create(person.id for person in created),
+        )
 
     def read_one(self, person_id: str) -> Person:
         return self.people.read_one(person_id)
@@ -18,8 +71,106 @@ class PeopleService:
     def read_many(self, **filters: Any) -> list[Person]:
         return list(self.people.read_many(**filters))
 
+    def count(self, **filters: Any) -> int:
+        return self.people.count(**filters)
+
+    def read_all(self, people_ids: Iterable[str]) -> list[Person]:
+        return list(self.people.read_all(people_ids))
+
+    def read_range(
+        self, _field: str, lower: Any = None, upper: Any = None, **filters: Any
+    ) -> list[Person]:
+        return list(self.people.read_range(_field, lower, upper, **filters))
+
+    def read_bbox(
+        self,
+        q_min: int | None = None,
+        q_max: int | None = None,
+        r_min: int | None = None,
+        r_max: int | None = None,
+        **filters: Any,
+    ) -> list[Person]:
+        return list(self.people.read_bbox(q_min, q_max, r_min, r_max, **filters))
+
+    def read_within_radius(
+        self, center: Location, radius: int, **filters: Any
+    ) -> list[Person]:
+        return list(self.people.read_within_radius(center, radius, **filters))
+
+    def is_occupied(self, location: Location, role: PersonRole | None = None) -> bool:
+        return self.people.is_occupied(location, role)
+
+    def read_occupied(
+        self, grid_size: int, role: PersonRole | None = None
+    ) -> NDArray[np.bool_]:
+        return self.people.read_occupied(grid_size, role)
+
+    def read_expiring(self) -> list[Person]:
+        return list(self.people.read_expiring(self.tick))
+
+    def lifespan_of(self, person: Person) -> int:
+        return max(person.death_tick - self.tick, 0)
+
+    def death_tick_of(self, lifespan: int) -> int:
+        return self.tick + lifespan
+
+    def read_columns(self) -> PeopleColumns:
+        return self.people.read_columns()
+
+    def update_columns(self, ids: Sequence[str], **columns: NDArray[Any]) -> None:
+        self._write(
+            lambda people: people.update_columns(ids, **columns),
+            lambda changes: changes.update_columns(ids, columns),
+        )
+
     def delete_one(self, person_id: str) -> None:
-        self.people.delete_one(person_id)
+        self._write(
+            lambda people: people.delete_one(person_id),
+            lambda changes: changes.delete([person_id]),
+        )
 
     def update_one(self, person: Person) -> None:
-        self.people.update_one(person)
+        existing = self.people.read_one(person.id)
+        self._write(
+            lambda people: people.update_one(person),
+            lambda changes: changes.update([existing], [person]),
+        )
+
+    def delete_many(self, person_ids: Iterable[str]) -> None:
+        deleted = list(person_ids)
+        self._write(
+            lambda people: people.delete_many(deleted),
+            lambda changes: changes.delete(deleted),
+        )
+
+    def update_many(self, people: Iterable[Person]) -> None:
+        updated = list(people)
+        existing = [self.people.read_one(person.id) for person in updated]
+        self._write(
+            lambda repository: repository.update_many(updated),
+            lambda changes: changes.update(existing, updated),
+        )
+
+    def drain_changes(self) -> ChangeSet:
+        with self._lock:
+            changes, self._changes = self._changes, ChangeSet()
+
+        return changes
+
+    def expire(self) -> None:
+        self.update_many(
+            replace(person, is_dead=True) for person in self.read_expiring()
+        )
+
+    def _write(
+        self,
+        write: Callable[[PeopleRepository], T],
+        record: Callable[[ChangeSet], None],
+    ) -> T:
+        with self._lock:
+            result = write(self.people)
+            record(self._changes)
+            if self._pending_writes is not None:
+                self._pending_writes.append(write)
+
+        return result
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Sequence
+
+import numpy as np
+
+
+class Phase(IntEnum):
+    world = 0
+    actions = 1
+    movement = 2
+
+
+@dataclass
+class RandomService:
+    seed: int | None = None
+    tick: int = 0
+
+    _entropy: int | Sequence[int] | None = field(init=False)
+
+    def __post_init__(self) -> None:
+        # NOTE: Unseeded runs draw fresh entropy once, streams derive from it
+        self._entropy = np.random.SeedSequence(self.seed).entropy
+
+    def advance(self) -> None:
+        self.tick += 1
+
+    def seed_for(self, phase: Phase, shard: int = 0) -> np.random.SeedSequence:
+        return np.random.SeedSequence(
+            self._entropy, spawn_key=(self.tick, int(phase), shard)
+        )
+
+    def stream(self, phase: Phase, shard: int = 0) -> np.random.Generator:
+        return generator_of(self.seed_for(phase, shard))
+
+
+def generator_of(seed: np.random.SeedSequence) -> np.random.Generator:
+    # NOTE: Philox is counter-based, so streams never overlap whatever their key
+    return np.random.Generator(np.random.Philox(seed))
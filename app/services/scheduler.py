@@ -0,0 +1,131 @@
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Awaitable, Callable
+
+
+class OverrunPolicy(str, Enum):
+    skip = "skip"
+    catch_up = "catch_up"
+    slow_down = "slow_down"
+
+
+@dataclass
+class DurationWindow:
+    size: int = 1000
+
+    _durations: deque[float] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._durations = deque(maxlen=self.size)
+
+    def record(self, duration: float) -> None:
+        self._durations.append(duration)
+
+    def percentile(self, percent: float) -> float:
+        if not self._durations:
+            return 0.0
+
+        durations = sorted(self._durations)
+        # NOTE: Nearest rank, the smallest duration at least percent of the
+        # window is under or at
+        rank = max(math.ceil(percent / 100 * len(durations)) - 1, 0)
+
+        return durations[rank]
+
+
+@dataclass
+class TickStats:
+    window: int = 1000
+
+    ticks: int = 0
+    late_ticks: int = 0
+    skipped_ticks: int = 0
+
+    durations: DurationWindow = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.durations = DurationWindow(size=self.window)
+
+    def record(self, duration: float) -> None:
+        self.ticks += 1
+        self.durations.record(duration)
+
+    def percentile(self, percent: float) -> float:
+        return self.durations.percentile(percent)
+
+
+@dataclass
+class LoopLagMonitor:
+    interval: float = 0.1
+
+    lags: DurationWindow = field(default_factory=DurationWindow)
+    max_lag: float = 0.0
+
+    clock: Callable[[], float] = time.monotonic
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+
+    async def run(self) -> None:
+        while True:
+            expected = self.clock() + self.interval
+            await self.sleep(self.interval)
+
+            # NOTE: How much later than asked the loop got back to us
+            lag = max(self.clock() - expected, 0.0)
+            self.lags.record(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+
+@dataclass
+class TickScheduler:
+    tick_hz: float = 1.0
+    policy: OverrunPolicy = OverrunPolicy.skip
+    max_catch_up: int = 5
+
+    stats: TickStats = field(default_factory=TickStats)
+
+    clock: Callable[[], float] = time.monotonic
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+
+    def __post_init__(self) -> None:
+        if self.tick_hz <= 0:
+            raise ValueError(f"Tick rate must be positive, got <{self.tick_hz}>")
+
+    @property
+    def interval(self) -> float:
+        return 1 / self.tick_hz
+
+    async def run(self, tick: Callable[[], Awaitable[None]]) -> None:
+        scheduled = self.clock()
+        while True:
+            started = self.clock()
+            await tick()
+            finished = self.clock()
+
+            self.stats.record(finished - started)
+            scheduled = self._next_slot_after(scheduled, finished)
+
+            await self.sleep(max(scheduled - self.clock(), 0.0))
+
+    def _next_slot_after(self, scheduled: float, now: float) -> float:
+        # NOTE: Slots sit on a fixed grid, so on-time ticks never drift
+        next_slot = scheduled + self.interval
+        if now <= next_slot:
+            return next_slot
+
+        self.stats.late_ticks += 1
+        missed = int((now - next_slot) // self.interval)
+
+        if self.policy == OverrunPolicy.skip:
+            self.stats.skipped_ticks += missed + 1
+            return next_slot + (missed + 1) * self.interval
+
+        if self.policy == OverrunPolicy.catch_up:
+            dropped = max(missed + 1 - self.max_catch_up, 0)
+            self.stats.skipped_ticks += dropped
+            return next_slot + dropped * self.interval
+
+        return now
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import os
+import sys
+import weakref
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, TypeVar
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from app.services.actions.actions import VectorizedActionsService, threaten_cells
+from app.services.movement import VectorizedMovementService, move_batch
+from app.services.randomness import Phase, RandomService, generator_of
+from app.services.topology import Topology
+
+T = TypeVar("T")
+
+# NOTE: Everything a worker needs to map a shared array: (slot, name, shape,
+# dtype). A slot keeps its role when its block is replaced by a bigger one.
+SharedSpec = tuple[str, str, tuple[int, ...], str]
+
+
+@dataclass
+class SharedArray:
+    slot: str
+    shape: tuple[int, ...]
+    dtype: DTypeLike
+
+    memory: SharedMemory = field(init=False)
+
+    def __post_init__(self) -> None:
+        size = int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+        self.memory = SharedMemory(create=True, size=max(size, 1))
+
+    @property
+    def array(self) -> NDArray[Any]:
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self.memory.buf)
+
+    @property
+    def spec(self) -> SharedSpec:
+        return self.slot, self.memory.name, self.shape, np.dtype(self.dtype).str
+
+    def release(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+
+@dataclass
+class StripePool(ABC):  # pragma: no cover
+    topology: Topology
+    shards: int = field(default_factory=lambda: os.cpu_count() or 1)
+
+    def __post_init__(self) -> None:
+        # NOTE: Red-black passes need every stripe to be at least two rows tall,
+        # and an even number of stripes when the first and last ones touch
+        self.shards = max(min(self.shards, self.grid_size // 2), 1)
+        if self.topology.wraps and self.shards > 1:
+            self.shards -= self.shards % 2
+
+    @property
+    def grid_size(self) -> int:
+        return self.topology.grid_size
+
+    def stripes(self) -> list[tuple[int, int]]:
+        bounds = np.linspace(0, self.grid_size, self.shards + 1).astype(int).tolist()
+
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def cell_stripes(self) -> list[tuple[int, int]]:
+        return [
+            (start * self.grid_size, stop * self.grid_size)
+            for start, stop in self.stripes()
+        ]
+
+    @abstractmethod
+    def threatened(self, hunted: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        pass
+
+    @abstractmethod
+    def move(
+        self,
+        cells: NDArray[np.int64],
+        occupied: NDArray[np.bool_],
+        streams: RandomService,
+        conflict_rounds: int,
+    ) -> NDArray[np.int64]:
+        pass
+
+    def _people_per_stripe(
+        self, sorted_cells: NDArray[np.int64], streams: RandomService
+    ) -> list[tuple[int, int, np.random.SeedSequence]]:
+        stripes = self.cell_stripes()
+        bounds = np.searchsorted(
+            sorted_cells, [start for start, _ in stripes] + [self.topology.cells]
+        ).tolist()
+
+        return [
+            (bounds[shard], bounds[shard + 1], streams.seed_for(Phase.movement, shard))
+            for shard in range(len(stripes))
+        ]
+
+
+@dataclass
+class ShardPool(StripePool):
+    _executor: Executor = field(init=False)
+    _arrays: dict[str, SharedArray] = field(init=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.shards, mp_context=get_context("spawn")
+        )
+
+        cells = self.topology.cells
+        self._arrays = {
+            "neighbors": SharedArray(
+                "neighbors", self.topology.neighbors.shape, np.int32
+            ),
+            "occupied": SharedArray("occupied", (cells,), np.bool_),
+            "hunted": SharedArray("hunted", (cells + 1,), np.uint8),
+            "threatened": SharedArray("threatened", (cells,), np.uint8),
+            "cells": SharedArray("cells", (0,), np.int64),
+        }
+        self._arrays["neighbors"].array[...] = self.topology.neighbors
+
+        weakref.finalize(self, _close, self._executor, self._arrays)
+
+    def threatened(self, hunted: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        shared_hunted, shared_threatened = (
+            self._arrays["hunted"],
+            self._arrays["threatened"],
+        )
+        shared_hunted.array[...] = hunted
+
+        self._run(
+            _threaten_stripe,
+            [
+                (
+                    shared_hunted.spec,
+                    shared_threatened.spec,
+                    self._arrays["neighbors"].spec,
+                    start,
+                    stop,
+                )
+                for start, stop in self.cell_stripes()
+            ],
+        )
+
+        return shared_threatened.array.copy()
+
+    def move(
+        self,
+        cells: NDArray[np.int64],
+        occupied: NDArray[np.bool_],
+        streams: RandomService,
+        conflict_rounds: int,
+    ) -> NDArray[np.int64]:
+        self._ensure_agents(len(cells))
+        shared_cells, shared_occupied = self._arrays["cells"], self._arrays["occupied"]
+
+        # NOTE: Sorted by cell, every stripe owns one contiguous slice of people
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        shared_cells.array[: len(cells)] = sorted_cells
+        shared_occupied.array[...] = occupied
+
+        tasks = [
+            (
+                shared_cells.spec,
+                self._arrays["neighbors"].spec,
+                shared_occupied.spec,
+                start,
+                stop,
+                seed,
+                conflict_rounds,
+            )
+            for start, stop, seed in self._people_per_stripe(sorted_cells, streams)
+        ]
+
+        # NOTE: A stripe moves people into the border rows of its neighbours, so
+        # neighbours never run together. Even stripes go first, then odd ones.
+        self._run(_move_stripe, tasks[0::2])
+        self._run(_move_stripe, tasks[1::2])
+
+        new_cells = np.empty_like(cells)
+        new_cells[order] = shared_cells.array[: len(cells)]
+
+        return new_cells
+
+    def _run(self, task: Callable[..., None], arguments: list[tuple[Any, ...]]) -> None:
+        futures = [self._executor.submit(task, *args) for args in arguments]
+        for future in futures:
+            future.result()
+
+    def _ensure_agents(self, size: int) -> None:
+        if size <= self._arrays["cells"].shape[0]:
+            return
+
+        capacity = max(size, 2 * self._arrays["cells"].shape[0])
+        self._arrays["cells"].release()
+        self._arrays["cells"] = SharedArray("cells", (capacity,), np.int64)
+
+
+@dataclass
+class ThreadShardPool(StripePool):
+    _executor: Executor = field(init=False)
+
+    def __post_init__(self) -> None:
+        # NOTE: Threads only run NumPy kernels in parallel without the GIL
+        if gil_enabled():
+            self.shards = 1
+
+        super().__post_init__()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.shards, thread_name_prefix="simulation-shard"
+        )
+        weakref.finalize(self, self._executor.shutdown)
+
+    def threatened(self, hunted: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        threatened = np.zeros(self.topology.cells, dtype=np.uint8)
+
+        self._run(
+            [
+                partial(
+                    threaten_cells,
+                    hunted,
+                    threatened,
+                    self.topology.neighbors,
+                    start,
+                    stop,
+                )
+                for start, stop in self.cell_stripes()
+            ]
+        )
+
+        return threatened
+
+    def move(
+        self,
+        cells: NDArray[np.int64],
+        occupied: NDArray[np.bool_],
+        streams: RandomService,
+        conflict_rounds: int,
+    ) -> NDArray[np.int64]:
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        occupied = occupied.copy()
+
+        stripes = self._people_per_stripe(sorted_cells, streams)
+        for stripes_in_pass in [stripes[0::2], stripes[1::2]]:
+            moved = self._run(
+                [
+                    partial(
+                        move_batch,
+                        sorted_cells[start:stop],
+                        self.topology.neighbors,
+                        occupied,
+                        generator_of(seed),
+                        conflict_rounds,
+                    )
+                    for start, stop, seed in stripes_in_pass
+                ]
+            )
+
+            # NOTE: Every stripe fills its own buffer, merged in stripe order
+            for (start, stop, _), new_cells in zip(stripes_in_pass, moved):
+                sorted_cells[start:stop] = new_cells
+
+        new_cells = np.empty_like(cells)
+        new_cells[order] = sorted_cells
+
+        return new_cells
+
+    def _run(self, tasks: list[Callable[[], T]]) -> list[T]:
+        if len(tasks) == 1:
+            return [tasks[0]()]
+
+        futures = [self._executor.submit(task) for task in tasks]
+
+        return [future.result() for future in futures]
+
+
+def gil_enabled() -> bool:
+    is_gil_enabled: Callable[[], bool] = getattr(sys, "_is_gil_enabled", lambda: True)
+
+    return is_gil_enabled()
+
+
+@dataclass
+class ShardedActionsService(VectorizedActionsService):
+    pool: StripePool = field(kw_only=True)
+
+    def _threatened(self, hunted: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        return self.pool.threatened(hunted)
+
+
+@dataclass
+class ShardedMovementService(VectorizedMovementService):
+    pool: StripePool = field(kw_only=True)
+
+    def _move(
+        self, cells: NDArray[np.int64], occupied: NDArray[np.bool_]
+    ) -> NDArray[np.int64]:
+        return self.pool.move(cells, occupied, self.streams, self.conflict_rounds)
+
+
+def _close(executor: Executor, arrays: dict[str, SharedArray]) -> None:
+    executor.shutdown(cancel_futures=True)
+    for array in arrays.values():
+        array.release()
+
+
+# NOTE: Worker side, each process maps a slot's block once and keeps it until
+# the pool replaces that block
+_attached: dict[str, SharedMemory] = {}
+
+
+def _view(spec: SharedSpec) -> NDArray[Any]:
+    slot, name, shape, dtype = spec
+    memory = _attached.get(slot)
+    if memory is None or memory.name != name:
+        if memory is not None:
+            memory.close()
+
+        memory = _attached[slot] = SharedMemory(name=name)
+
+    return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _threaten_stripe(
+    hunted: SharedSpec,
+    threatened: SharedSpec,
+    neighbors: SharedSpec,
+    start: int,
+    stop: int,
+) -> None:
+    threaten_cells(_view(hunted), _view(threatened), _view(neighbors), start, stop)
+
+
+def _move_stripe(
+    cells: SharedSpec,
+    neighbors: SharedSpec,
+    occupied: SharedSpec,
+    start: int,
+    stop: int,
+    seed: np.random.SeedSequence,
+    conflict_rounds: int,
+) -> None:
+    if start == stop:
+        return
+
+    stripe = _view(cells)[start:stop]
+    stripe[:] = move_batch(
+        stripe,
+        _view(neighbors),
+        _view(occupied),
+        generator_of(seed),
+        conflict_rounds,
+    )
@@ -1,10 +1,32 @@
 import asyncio
-from dataclasses import asdict, dataclass
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Callable, Iterator
 
 from app.services.actions import ActionsService
+from app.services.changes import ChangeSet
+from app.services.frames import (
+    Frame,
+    FrameFormat,
+    Frames,
+    WireIds,
+    delta_of,
+    encode,
+    keyframe_of,
+    view_delta_of,
+)
 from app.services.movement import MovementService
 from app.services.people import PeopleService
-from app.services.websocket import WebSocketService
+from app.services.scheduler import LoopLagMonitor, TickScheduler
+from app.services.subscriptions import Subscription
+from app.services.websocket import Feed, WebSocketService
+
+
+class TickExecution(str, Enum):
+    thread = "thread"
+    sliced = "sliced"
 
 
 @dataclass
@@ -14,14 +36,164 @@ class SimulationService:
     movement: MovementService
     actions: ActionsService
 
+    scheduler: TickScheduler = field(default_factory=TickScheduler)
+    loop_lag: LoopLagMonitor = field(default_factory=LoopLagMonitor)
+
+    execution: TickExecution = TickExecution.thread
+    slice_budget: float = 0.01
+    clock: Callable[[], float] = time.perf_counter
+
+    # NOTE: In ticks, everyone gets a keyframe instead of a delta that often
+    keyframe_interval: int = 50
+    _keyframe_tick: int | None = field(default=None, init=False)
+    _wire_ids: WireIds = field(default_factory=WireIds, init=False)
+    # NOTE: People each subscription saw on the previous tick
+    _seen: dict[Subscription, dict[str, None]] = field(default_factory=dict, init=False)
+
+    # NOTE: One worker keeps ticks in order, double buffering keeps readers safe
+    executor: Executor = field(
+        default_factory=lambda: ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="simulation-tick"
+        )
+    )
+
     async def broadcast_state(self) -> None:
-        if self.websocket_manager.has_active_connections:
-            people = [asdict(person) for person in self.people.read_many()]
-            await self.websocket_manager.broadcast(people)
+        self.websocket_manager.broadcast(*self._read_frames())
+
+    def tick(self) -> None:
+        with self.people.next_generation() as staged:
+            replace(self.actions, people=staged).kill()
+            replace(
+                self.movement, people=staged
+            ).move_people_to_random_adjacent_location()
+            staged.expire()
+
+        self.movement.streams.advance()
 
     async def run(self) -> None:
-        while True:
-            self.actions.kill()
-            self.movement.move_people_to_random_adjacent_location()
+        await asyncio.gather(
+            self.scheduler.run(self._tick_and_broadcast),
+            self.loop_lag.run(),
+        )
+
+    async def tick_in_slices(self) -> None:
+        with self.people.next_generation() as staged:
+            await self._run_in_slices(
+                replace(self.actions, people=staged).kill_in_steps()
+            )
+            await self._run_in_slices(
+                replace(self.movement, people=staged).move_in_steps()
+            )
+            staged.expire()
+
+        self.movement.streams.advance()
+
+    async def _run_in_slices(self, steps: Iterator[None]) -> None:
+        deadline = self.clock() + self.slice_budget
+        for _ in steps:
+            if self.clock() >= deadline:
+                await asyncio.sleep(0)
+                deadline = self.clock() + self.slice_budget
+
+    async def _tick_and_broadcast(self) -> None:
+        if self.execution == TickExecution.sliced:
+            await self.tick_in_slices()
             await self.broadcast_state()
-            await asyncio.sleep(1)
+            return
+
+        loop = asyncio.get_running_loop()
+        read = await loop.run_in_executor(self.executor, self._tick_and_read_frames)
+
+        self.websocket_manager.broadcast(*read)
+
+    def _tick_and_read_frames(self) -> list[Frames]:
+        self.tick()
+
+        return self._read_frames()
+
+    def _read_frames(self) -> list[Frames]:
+        # NOTE: Drained every tick, changes must not pile up without listeners
+        changes = self.people.drain_changes()
+        feeds = self.websocket_manager.feeds
+        self._seen = {
+            subscription: seen
+            for subscription, seen in self._seen.items()
+            if subscription in feeds
+        }
+
+        tick = self.people.tick
+        periodic = bool(feeds) and (
+            self._keyframe_tick is None
+            or tick - self._keyframe_tick >= self.keyframe_interval
+        )
+        if periodic:
+            self._keyframe_tick = tick
+
+        frames = [
+            frames
+            for subscription, feed in feeds.items()
+            for frames in self._frames_of(subscription, feed, changes, periodic)
+        ]
+
+        # NOTE: Deleted people keep their wire ids until their deltas are encoded
+        self._wire_ids.release(changes.deleted)
+
+        return frames
+
+    def _frames_of(
+        self,
+        subscription: Subscription,
+        feed: Feed,
+        changes: ChangeSet,
+        periodic: bool,
+    ) -> list[Frames]:
+        keyframe: Frame | None = None
+        if subscription.is_everyone:
+            delta = (
+                keyframe_of(self.people) if periodic else delta_of(self.people, changes)
+            )
+            if periodic:
+                keyframe = delta
+            elif feed.awaits_keyframe:
+                keyframe = keyframe_of(self.people)
+        else:
+            # NOTE: Read through the indexes, never the whole population. The
+            # view is what a keyframe of the subscription would send.
+            view = keyframe_of(self.people, subscription)
+            seen = self._seen.get(subscription, {})
+            delta = view if periodic else view_delta_of(view, changes, seen)
+            self._seen[subscription] = dict.fromkeys(
+                person.id for person in view.created
+            )
+            if periodic or feed.awaits_keyframe:
+                keyframe = view
+
+        return [
+            self._encoded(subscription, frame_format, delta, keyframe)
+            for frame_format in sorted(feed.formats)
+        ]
+
+    def _encoded(
+        self,
+        subscription: Subscription,
+        frame_format: FrameFormat,
+        delta: Frame,
+        keyframe: Frame | None,
+    ) -> Frames:
+        encoded_delta = self._encode(delta, frame_format)
+        encoded_keyframe: str | bytes | None = encoded_delta
+        if keyframe is not delta:
+            encoded_keyframe = (
+                None if keyframe is None else self._encode(keyframe, frame_format)
+            )
+
+        return Frames(
+            tick=delta.tick,
+            delta=encoded_delta,
+            keyframe=encoded_keyframe,
+            format=frame_format,
+            subscription=subscription,
+        )
+
+    def _encode(self, frame: Frame, frame_format: FrameFormat) -> str | bytes:
+        return encode(frame, self.people, frame_format, self._wire_ids)
@@ -22,24 +22,22 @@ class SnapshotService:
     interval_seconds: int
 
     def load_people(self) -> list[Person]:
-        people = self.people_snapshot_repository.load()
+        people = self.people_snapshot_repository.load(tick=self.people_service.tick)
 
-        for person in people:
-            self.people_service.create_one(person)
+        self.people_service.create_many(people)
 
         return people
 
     def load_buildings(self) -> list[Building]:
         buildings = self.buildings_snapshot_repository.load()
 
-        for building in buildings:
-            self.buildings_service.create_one(building)
+        self.buildings_service.create_many(buildings)
 
         return buildings
 
     def save_people(self) -> None:
         people = self.people_service.read_many()
-        self.people_snapshot_repository.save(people)
+        self.people_snapshot_repository.save(people, tick=self.people_service.tick)
 
     def save_buildings(self) -> None:
         buildings = self.buildings_service.read_many()
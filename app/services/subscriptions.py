@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from app.models.person import Person, PersonRole
+from app.services.people import PeopleService
+
+
+@dataclass(frozen=True)
+class Subscription:
+    q_min: int | None = None
+    q_max: int | None = None
+    r_min: int | None = None
+    r_max: int | None = None
+    role: PersonRole | None = None
+    is_dead: bool | None = None
+
+    # NOTE: Followed people, those of them matching the other filters are sent
+    people_ids: tuple[str, ...] | None = None
+
+    @property
+    def is_everyone(self) -> bool:
+        return self == EVERYONE
+
+    @property
+    def has_bbox(self) -> bool:
+        return any(
+            bound is not None
+            for bound in (self.q_min, self.q_max, self.r_min, self.r_max)
+        )
+
+    @property
+    def filters(self) -> dict[str, Any]:
+        filters = {"role": self.role, "is_dead": self.is_dead}
+
+        return {_field: value for _field, value in filters.items() if value is not None}
+
+    def read(self, people: PeopleService) -> list[Person]:
+        if self.people_ids is not None:
+            return [
+                person
+                for person in people.read_all(self.people_ids)
+                if self.matches(person)
+            ]
+
+        # NOTE: Both go through the repository's spatial and field indexes
+        if self.has_bbox:
+            return people.read_bbox(
+                self.q_min, self.q_max, self.r_min, self.r_max, **self.filters
+            )
+
+        return people.read_many(**self.filters)
+
+    def matches(self, person: Person) -> bool:
+        return (
+            _between(person.location.q, self.q_min, self.q_max)
+            and _between(person.location.r, self.r_min, self.r_max)
+            and all(
+                getattr(person, _field) == value
+                for _field, value in self.filters.items()
+            )
+        )
+
+
+EVERYONE = Subscription()
+
+
+def _between(value: int, lower: int | None, upper: int | None) -> bool:
+    return (lower is None or lower <= value) and (upper is None or value <= upper)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import Enum
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.models.location import DIRECTIONS, Location
+
+NO_CELL = -1
+
+
+class Layout(str, Enum):
+    rectangle = "rectangle"
+    torus = "torus"
+    hexagon = "hexagon"
+
+
+@dataclass
+class Topology:
+    grid_size: int
+    layout: Layout = Layout.rectangle
+
+    # NOTE: Cell of (q, r) is q * grid_size + r, neighbors[cell] follows DIRECTIONS
+    # and holds NO_CELL where a neighbor falls off the map
+    in_map: NDArray[np.bool_] = field(init=False)
+    neighbors: NDArray[np.int32] = field(init=False)
+
+    def __post_init__(self) -> None:
+        q, r = np.divmod(np.arange(self.cells), self.grid_size)
+        self.in_map = self._in_map(q, r)
+
+        directions = np.array(DIRECTIONS)
+        neighbor_q = q[:, None] + directions[:, 0]
+        neighbor_r = r[:, None] + directions[:, 1]
+        if self.layout == Layout.torus:
+            neighbor_q %= self.grid_size
+            neighbor_r %= self.grid_size
+
+        within = (
+            (neighbor_q >= 0)
+            & (neighbor_q < self.grid_size)
+            & (neighbor_r >= 0)
+            & (neighbor_r < self.grid_size)
+        )
+        neighbors = np.where(within, neighbor_q * self.grid_size + neighbor_r, 0)
+        within &= self.in_map[neighbors] & self.in_map[:, None]
+
+        self.neighbors = np.where(within, neighbors, NO_CELL).astype(np.int32)
+
+    @property
+    def cells(self) -> int:
+        return self.grid_size**2
+
+    @property
+    def wraps(self) -> bool:
+        return self.layout == Layout.torus
+
+    def contains(self, location: Location) -> bool:
+        return (
+            0 <= location.q < self.grid_size
+            and 0 <= location.r < self.grid_size
+            and bool(self.in_map[self.cell_of(location)])
+        )
+
+    def cell_of(self, location: Location) -> int:
+        return location.q * self.grid_size + location.r
+
+    def location_of(self, cell: int) -> Location:
+        q, r = divmod(cell, self.grid_size)
+
+        return Location(q=q, r=r)
+
+    def neighbor_cells(self, location: Location) -> list[int]:
+        cells: list[int] = self.neighbors[self.cell_of(location)].tolist()
+
+        return cells
+
+    def adjacent_cells(self, location: Location) -> list[int]:
+        return [
+            cell
+            for cell in dict.fromkeys(self.neighbor_cells(location))
+            if cell != NO_CELL
+        ]
+
+    def neighbors_of(self, location: Location) -> list[Location]:
+        return [self.location_of(cell) for cell in self.adjacent_cells(location)]
+
+    def free_neighbors(
+        self, cells: NDArray[np.int64], occupied: NDArray[np.bool_]
+    ) -> NDArray[np.bool_]:
+        return free_cells(self.neighbors[cells], occupied)
+
+    def cells_of(self, q: NDArray[np.int32], r: NDArray[np.int32]) -> NDArray[np.int64]:
+        return q.astype(np.int64) * self.grid_size + r
+
+    def coordinates_of(
+        self, cells: NDArray[np.int64]
+    ) -> tuple[NDArray[np.int32], NDArray[np.int32]]:
+        q, r = np.divmod(cells, self.grid_size)
+
+        return q.astype(np.int32), r.astype(np.int32)
+
+    def _in_map(self, q: NDArray[np.int64], r: NDArray[np.int64]) -> NDArray[np.bool_]:
+        if self.layout != Layout.hexagon:
+            return np.ones(self.cells, dtype=np.bool_)
+
+        # NOTE: The largest hexagon centred in the grid, corners are off the map
+        radius = (self.grid_size - 1) // 2
+        dq, dr = q - radius, r - radius
+        in_map: NDArray[np.bool_] = (
+            (np.abs(dq) <= radius)
+            & (np.abs(dr) <= radius)
+            & (np.abs(dq + dr) <= radius)
+        )
+
+        return in_map
+
+
+def free_cells(
+    cells: NDArray[np.int32], occupied: NDArray[np.bool_]
+) -> NDArray[np.bool_]:
+    free: NDArray[np.bool_] = cells != NO_CELL
+    free[free] = ~occupied[cells[free]]
+
+    return free
@@ -1,24 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import suppress
 from dataclasses import dataclass, field
-from typing import Any
+from enum import Enum
 
 from starlette.websockets import WebSocket
 
+from app.services.frames import FrameFormat, Frames
+from app.services.subscriptions import EVERYONE, Subscription
+
+# NOTE: 1013 is "try again later", the client fell too far behind
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+class SlowClientPolicy(str, Enum):
+    drop_oldest = "drop_oldest"
+    disconnect = "disconnect"
+
+
+@dataclass
+class WebSocketClient:
+    websocket: WebSocket
+    queue_size: int = 8
+    policy: SlowClientPolicy = SlowClientPolicy.drop_oldest
+    format: FrameFormat = FrameFormat.json
+    subscription: Subscription = EVERYONE
+
+    # NOTE: Deltas only make sense on top of a keyframe
+    awaiting_keyframe: bool = True
+    sent_frames: int = 0
+    dropped_frames: int = 0
+    queued_tick: int | None = None
+    sent_tick: int | None = None
+    closed: bool = False
+
+    _queue: asyncio.Queue[tuple[int, str | bytes]] = field(init=False, repr=False)
+    _sender: asyncio.Task[None] = field(init=False, repr=False)
+    # NOTE: Frames missed before resuming, sent ahead of the queue
+    _missed: list[tuple[int, str | bytes]] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._sender = asyncio.create_task(self._send_queued())
+
+    @property
+    def queued_frames(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def lag_ticks(self) -> int:
+        if self.queued_tick is None or self.sent_tick is None:
+            return 0
+
+        return self.queued_tick - self.sent_tick
+
+    def resume(self, missed: list[tuple[int, str | bytes]]) -> None:
+        self._missed = missed
+        self.awaiting_keyframe = False
+        if missed:
+            self.queued_tick, _ = missed[-1]
+
+    def push(self, frames: Frames) -> None:
+        # NOTE: The subscription may have changed since the frames were read
+        if self.closed or frames.subscription != self.subscription:
+            return
+
+        if self._queue.full():
+            if self.policy == SlowClientPolicy.disconnect:
+                self.close()
+                asyncio.create_task(self._close_websocket())
+                return
+
+            self._queue.get_nowait()
+            self.dropped_frames += 1
+
+            # NOTE: The deltas after a dropped frame build on it, start over
+            self.awaiting_keyframe = True
+
+        if self.awaiting_keyframe:
+            if frames.keyframe is None:
+                return
+
+            self.awaiting_keyframe = False
+            self._queue.put_nowait((frames.tick, frames.keyframe))
+        else:
+            self._queue.put_nowait((frames.tick, frames.delta))
+
+        self.queued_tick = frames.tick
+
+    def close(self) -> None:
+        self.closed = True
+        self._sender.cancel()
+
+    async def _send_queued(self) -> None:
+        try:
+            missed, self._missed = self._missed, []
+            for tick, data in missed:
+                await self._send(tick, data)
+            while True:
+                await self._send(*await self._queue.get())
+        except Exception:
+            # NOTE: The connection went away, its endpoint disconnects it
+            self.closed = True
+
+    async def _send(self, tick: int, data: str | bytes) -> None:
+        self.sent_frames += 1
+        self.sent_tick = tick
+        if isinstance(data, bytes):
+            await self.websocket.send_bytes(data)
+        else:
+            await self.websocket.send_text(data)
+
+    async def _close_websocket(self) -> None:
+        with suppress(RuntimeError):
+            await self.websocket.close(code=SLOW_CLIENT_CLOSE_CODE)
+
+
+@dataclass
+class FrameHistory:
+    size: int = 100
+
+    # NOTE: Deltas of consecutive ticks, oldest first
+    _frames: deque[tuple[int, str | bytes]] = field(init=False)
+    idle_ticks: int = 0
+
+    def __post_init__(self) -> None:
+        self._frames = deque(maxlen=self.size)
+
+    def record(self, tick: int, delta: str | bytes) -> None:
+        if self._frames and tick > self._frames[-1][0] + 1:
+            self._frames.clear()
+
+        self._frames.append((tick, delta))
+
+    def since(self, tick: int) -> list[tuple[int, str | bytes]] | None:
+        if not self._frames:
+            return None
+
+        first, _ = self._frames[0]
+        last, _ = self._frames[-1]
+        if not first - 1 <= tick <= last:
+            return None
+
+        return [
+            (frame_tick, data) for frame_tick, data in self._frames if frame_tick > tick
+        ]
+
+
+@dataclass
+class Feed:
+    # NOTE: Clients with the same subscription share its frames
+    formats: set[FrameFormat] = field(default_factory=set)
+    awaits_keyframe: bool = False
+
 
 @dataclass
 class WebSocketService:
-    active_connections: list[WebSocket] = field(default_factory=list)
+    queue_size: int = 8
+    policy: SlowClientPolicy = SlowClientPolicy.drop_oldest
+    history_size: int = 100
+
+    # NOTE: By id(), connections are mappings and compare by their scope
+    clients: dict[int, WebSocketClient] = field(default_factory=dict)
+    # NOTE: Recent deltas of the whole world per format, for clients resuming
+    histories: dict[FrameFormat, FrameHistory] = field(default_factory=dict)
 
     @property
     def has_active_connections(self) -> bool:
-        return bool(self.active_connections)
+        return bool(self.clients)
 
-    async def connect(self, websocket: WebSocket) -> None:
+    @property
+    def feeds(self) -> dict[Subscription, Feed]:
+        feeds: dict[Subscription, Feed] = {}
+
+        # NOTE: Whole world feeds outlive their clients for history_size ticks,
+        # clients reconnecting all at once resume them instead of starting over
+        for frame_format in self.histories:
+            feeds.setdefault(EVERYONE, Feed()).formats.add(frame_format)
+
+        for client in list(self.clients.values()):
+            feed = feeds.setdefault(client.subscription, Feed())
+            feed.formats.add(client.format)
+            feed.awaits_keyframe |= client.awaiting_keyframe
+
+        return feeds
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        frame_format: FrameFormat = FrameFormat.json,
+        since: int | None = None,
+    ) -> None:
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = self.clients[id(websocket)] = WebSocketClient(
+            websocket=websocket,
+            queue_size=self.queue_size,
+            policy=self.policy,
+            format=frame_format,
+        )
+
+        # NOTE: Without the frames since then buffered, a keyframe follows
+        history = self.histories.get(frame_format)
+        missed = None if since is None or history is None else history.since(since)
+        if missed is not None:
+            client.resume(missed)
 
     def disconnect(self, websocket: WebSocket) -> None:
-        self.active_connections.remove(websocket)
+        client = self.clients.pop(id(websocket), None)
+        if client is not None:
+            client.close()
+
+    def await_keyframe(self, websocket: WebSocket) -> None:
+        client = self.clients.get(id(websocket))
+        if client is not None:
+            client.awaiting_keyframe = True
+
+    def subscribe(self, websocket: WebSocket, subscription: Subscription) -> None:
+        client = self.clients.get(id(websocket))
+        if client is not None:
+            # NOTE: The people in view change wholesale, start over from them
+            client.subscription = subscription
+            client.awaiting_keyframe = True
+
+    def broadcast(self, *frames: Frames) -> None:
+        by_feed = {(each.subscription, each.format): each for each in frames}
+        watched = set()
+        for key, client in list(self.clients.items()):
+            if client.closed:
+                self.clients.pop(key, None)
+                continue
+
+            if client.subscription.is_everyone:
+                watched.add(client.format)
+
+            matching = by_feed.get((client.subscription, client.format))
+            if matching is not None:
+                client.push(matching)
+
+        self._record(by_feed, watched)
+
+    def _record(
+        self,
+        by_feed: dict[tuple[Subscription, FrameFormat], Frames],
+        watched: set[FrameFormat],
+    ) -> None:
+        for (subscription, frame_format), frames in by_feed.items():
+            if not subscription.is_everyone or not self.history_size:
+                continue
+
+            history = self.histories.get(frame_format)
+            if history is None:
+                history = self.histories[frame_format] = FrameHistory(
+                    size=self.history_size
+                )
+            history.record(frames.tick, frames.delta)
 
-    async def broadcast(self, data: list[dict[str, Any]]) -> None:
-        for connection in self.active_connections:
-            await connection.send_json(data)
+        for frame_format, history in list(self.histories.items()):
+            history.idle_ticks = (
+                0 if frame_format in watched else history.idle_ticks + 1
+            )
+            if history.idle_ticks > self.history_size:
+                del self.histories[frame_format]
@@ -1,21 +1,25 @@
 from __future__ import annotations
 
-import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import numpy as np
 
 from app.models.building import Building
 from app.models.location import Location
 from app.models.person import Person, PersonRole
 from app.services.buildings import BuildingsService
 from app.services.people import PeopleService
+from app.services.randomness import Phase, RandomService
 from app.services.snapshot import SnapshotService
+from app.services.topology import Topology
 
 
 @dataclass
 class WorldEntities:
     snapshot_service: SnapshotService | None
 
-    grid_size: int
+    topology: Topology
 
     people_amount: int
     building_amount: int
@@ -26,6 +30,8 @@ class WorldEntities:
     people_service: PeopleService
     buildings_service: BuildingsService
 
+    streams: RandomService = field(default_factory=RandomService)
+
     def initialize(self) -> None:
         if self.snapshot_service:
             try:
@@ -38,7 +44,8 @@ class WorldEntities:
         self._generate_world()
 
     def _generate_world(self) -> None:
-        total_locations = self.grid_size**2
+        cells = np.flatnonzero(self.topology.in_map)
+        total_locations = len(cells)
         total_entities = self.people_amount + self.building_amount
 
         if total_entities > total_locations:
@@ -48,28 +55,32 @@ class WorldEntities:
                 f"people: {self.people_amount}, buildings: {self.building_amount}."
             )
 
-        all_locations = [
-            Location(q=q, r=r)
-            for q in range(self.grid_size)
-            for r in range(self.grid_size)
+        rng = self.streams.stream(Phase.world)
+        sampled_locations = [
+            self.topology.location_of(cell)
+            for cell in rng.choice(cells, size=total_entities, replace=False).tolist()
         ]
 
-        sampled_locations = random.sample(all_locations, total_entities)
-
         building_locations = sampled_locations[: self.building_amount]
         people_locations = sampled_locations[self.building_amount :]
 
         self._generate_buildings(building_locations)
-        self._generate_people(people_locations)
+        self._generate_people(people_locations, rng)
 
     def _generate_buildings(self, locations: list[Location]) -> None:
-        for location in locations:
-            self.buildings_service.create_one(Building(location=location))
-
-    def _generate_people(self, locations: list[Location]) -> None:
-        for location in locations:
-            rand = random.random()
-
+        self.buildings_service.create_many(
+            Building(location=location) for location in locations
+        )
+
+    def _generate_people(
+        self, locations: list[Location], rng: np.random.Generator
+    ) -> None:
+        rolls = rng.random(len(locations)).tolist()
+        lifespans = rng.integers(70, 100, endpoint=True, size=len(locations)).tolist()
+        ids = rng.bytes(16 * len(locations))
+
+        people = []
+        for index, (location, rand) in enumerate(zip(locations, rolls)):
             if rand < self.killer_probability:
                 role = PersonRole.killer
             elif rand < self.killer_probability + self.police_probability:
@@ -77,11 +88,14 @@ class WorldEntities:
             else:
                 role = PersonRole.citizen
 
-            self.people_service.create_one(
+            people.append(
                 Person(
                     location=location,
                     role=role,
                     is_dead=False,
-                    lifespan=random.randint(70, 100),
+                    death_tick=self.people_service.death_tick_of(lifespans[index]),
+                    id=str(UUID(bytes=ids[16 * index : 16 * index + 16], version=4)),
                 )
             )
+
+        self.people_service.create_many(people)
@@ -56,7 +56,7 @@ class FakePerson:
             ),
             role=self.role or PersonRole.citizen,
             is_dead=self.is_dead or False,
-            lifespan=self.lifespan or random.randint(70, 100),
+            death_tick=self.lifespan or random.randint(70, 100),
         )
 
     def json(self) -> dict[str, Any]:
@@ -67,7 +67,7 @@ class FakePerson:
             },
             "role": self.entity.role.value,
             "is_dead": self.entity.is_dead,
-            "lifespan": self.entity.lifespan,
+            "lifespan": self.entity.death_tick,
         }
 
 
@@ -89,3 +89,14 @@ class FakeLocation:
                 "r": self.entity.r,
             },
         }
+
+
+@dataclass
+class FakeClock:
+    now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
@@ -10,6 +10,7 @@ from app.services.buildings import BuildingsService
 from app.services.movement import MovementService
 from app.services.people import PeopleService
 from app.services.simulation import SimulationService
+from app.services.topology import Topology
 from app.services.websocket import WebSocketService
 
 
@@ -27,7 +28,7 @@ def people_service() -> PeopleService:
 
 @pytest.fixture
 def actions_service(people_service: PeopleService) -> ActionsService:
-    return ActionsService(people=people_service)
+    return ActionsService(people=people_service, topology=Topology(grid_size=100))
 
 
 @pytest.fixture
@@ -37,7 +38,9 @@ def movement_service(
     actions_service: ActionsService,
 ) -> MovementService:
     return MovementService(
-        grid_size=100, buildings=buildings_service, people=people_service
+        topology=Topology(grid_size=100),
+        buildings=buildings_service,
+        people=people_service,
     )
 
 
@@ -89,3 +89,27 @@ def test_should_delete_one(client: TestClient) -> None:
     response = client.delete(f"/buildings/{created.json()['id']}")
 
     assert response.status_code == 204
+
+
+def test_should_read_in_bbox(client: TestClient) -> None:
+    building_1 = FakeBuilding(location=Location(q=10, r=20))
+    building_2 = FakeBuilding(location=Location(q=10, r=40))
+    client.post("/buildings", json=building_1.json())
+    client.post("/buildings", json=building_2.json())
+
+    response = client.get("/buildings?r_min=15&r_max=25")
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": ANY, **building_1.json()}]
+
+
+def test_should_read_within_radius(client: TestClient) -> None:
+    building_1 = FakeBuilding(location=Location(q=10, r=20))
+    building_2 = FakeBuilding(location=Location(q=10, r=40))
+    client.post("/buildings", json=building_1.json())
+    client.post("/buildings", json=building_2.json())
+
+    response = client.get("/buildings?near_q=11&near_r=20&radius=2")
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": ANY, **building_1.json()}]
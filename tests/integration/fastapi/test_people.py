@@ -129,3 +129,33 @@ def test_should_delete_one(client: TestClient) -> None:
     response = client.delete(f"/people/{created.json()['id']}")
 
     assert response.status_code == 204
+
+
+def test_should_read_in_bbox(client: TestClient) -> None:
+    person_1 = FakePerson(location=Location(q=10, r=20))
+    person_2 = FakePerson(location=Location(q=30, r=20))
+    client.post("/people", json=person_1.json())
+    client.post("/people", json=person_2.json())
+
+    response = client.get("/people?q_min=5&q_max=15&r_min=15&r_max=25")
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": ANY, **person_1.json()}]
+
+
+def test_should_read_within_radius(client: TestClient) -> None:
+    person_1 = FakePerson(location=Location(q=10, r=21))
+    person_2 = FakePerson(location=Location(q=12, r=21))
+    client.post("/people", json=person_1.json())
+    client.post("/people", json=person_2.json())
+
+    response = client.get("/people?near_q=10&near_r=20&radius=1")
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": ANY, **person_1.json()}]
+
+
+def test_should_not_read_within_radius_without_center(client: TestClient) -> None:
+    response = client.get("/people?near_q=10&radius=1")
+
+    assert response.status_code == 422
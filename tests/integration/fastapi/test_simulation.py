@@ -1,11 +1,20 @@
 import asyncio
+import time
+from dataclasses import replace
 from unittest.mock import ANY
 
+import pytest
 from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 
 from tests.fake import FakePerson
 
+from app.models.location import Location
+from app.models.person import PersonRole
+from app.services.frames import BINARY_HEADER
 from app.services.movement import MovementService
+from app.services.people import PeopleService
+from app.services.subscriptions import Subscription
 
 
 def test_should_broadcast_person_via_websocket(client: TestClient) -> None:
@@ -19,10 +28,14 @@ def test_should_broadcast_person_via_websocket(client: TestClient) -> None:
 
         data = websocket.receive_json()
 
-        assert data == [
-            {"id": ANY, **person_1.json()},
-            {"id": ANY, **person_2.json()},
-        ]
+        assert data == {
+            "type": "keyframe",
+            "tick": 0,
+            "people": [
+                {"id": ANY, **person_1.json()},
+                {"id": ANY, **person_2.json()},
+            ],
+        }
 
 
 def test_should_broadcast_updated_locations(
@@ -35,12 +48,180 @@ def test_should_broadcast_updated_locations(
         asyncio.run(client.app.state.simulation.broadcast_state())  # type: ignore
 
         first_data = websocket.receive_json()
-        assert first_data == [{"id": ANY, **person.json()}]
+        assert first_data["people"] == [{"id": ANY, **person.json()}]
 
         movement_service.move_people_to_random_adjacent_location()
 
         asyncio.run(client.app.state.simulation.broadcast_state())  # type: ignore
 
         second_data = websocket.receive_json()
-        assert len(second_data) == 1
-        assert second_data != first_data
+        assert second_data == {
+            "type": "delta",
+            "tick": 0,
+            "created": [],
+            "moved": [{"id": first_data["people"][0]["id"], "location": ANY}],
+            "died": [],
+            "deleted": [],
+        }
+        assert second_data["moved"][0]["location"] != person.json()["location"]
+
+
+def test_should_broadcast_binary_frames_when_asked_for(client: TestClient) -> None:
+    client.post("/people", json=FakePerson().json())
+
+    with client.websocket_connect("/simulation/ws?format=binary") as websocket:
+        asyncio.run(client.app.state.simulation.broadcast_state())  # type: ignore
+
+        data = websocket.receive_bytes()
+
+    frame_type, tick, mapped, created, moved, died, deleted = BINARY_HEADER.unpack_from(
+        data
+    )
+    assert (frame_type, tick, mapped, created, moved, died, deleted) == (
+        0,
+        0,
+        1,
+        1,
+        0,
+        0,
+        0,
+    )
+
+
+def test_should_send_keyframe_when_asked(
+    client: TestClient, people_service: PeopleService
+) -> None:
+    person = FakePerson()
+    client.post("/people", json=person.json())
+
+    with client.websocket_connect("/simulation/ws") as websocket:
+        simulation = client.app.state.simulation  # type: ignore
+        asyncio.run(simulation.broadcast_state())
+        websocket.receive_json()
+
+        created = people_service.create_one(FakePerson().entity)
+        websocket.send_text("keyframe")
+        for _ in range(100):
+            feeds = simulation.websocket_manager.feeds.values()
+            if any(feed.awaits_keyframe for feed in feeds):
+                break
+            time.sleep(0.01)
+        asyncio.run(simulation.broadcast_state())
+
+        data = websocket.receive_json()
+
+        assert data["type"] == "keyframe"
+        assert [person["id"] for person in data["people"]][-1] == created.id
+
+
+def test_should_only_broadcast_subscribed_people(
+    client: TestClient, people_service: PeopleService
+) -> None:
+    killer = people_service.create_one(
+        FakePerson(location=Location(q=1, r=1), role=PersonRole.killer).entity
+    )
+    people_service.create_one(
+        FakePerson(location=Location(q=2, r=2), role=PersonRole.citizen).entity
+    )
+    people_service.create_one(
+        FakePerson(location=Location(q=8, r=8), role=PersonRole.killer).entity
+    )
+
+    with client.websocket_connect("/simulation/ws") as websocket:
+        simulation = client.app.state.simulation  # type: ignore
+        websocket.send_json(
+            {"type": "subscribe", "q_max": 4, "r_max": 4, "role": "killer"}
+        )
+        subscription = Subscription(q_max=4, r_max=4, role=PersonRole.killer)
+        for _ in range(100):
+            if list(simulation.websocket_manager.feeds) == [subscription]:
+                break
+            time.sleep(0.01)
+        asyncio.run(simulation.broadcast_state())
+        keyframe = websocket.receive_json()
+
+        people_service.update_one(replace(killer, location=Location(q=6, r=6)))
+        asyncio.run(simulation.broadcast_state())
+        delta = websocket.receive_json()
+
+    assert [person["id"] for person in keyframe["people"]] == [killer.id]
+    assert delta["moved"] == []
+    assert delta["deleted"] == [killer.id]
+
+
+def test_should_resume_stream_since_tick(client: TestClient) -> None:
+    client.post("/people", json=FakePerson().json())
+    simulation = client.app.state.simulation  # type: ignore
+
+    with client.websocket_connect("/simulation/ws") as websocket:
+        asyncio.run(simulation.broadcast_state())
+        keyframe = websocket.receive_json()
+
+    simulation.tick()
+    asyncio.run(simulation.broadcast_state())
+
+    with client.websocket_connect(
+        f"/simulation/ws?since={keyframe['tick']}"
+    ) as websocket:
+        missed = websocket.receive_json()
+
+    assert keyframe["type"] == "keyframe"
+    assert (missed["type"], missed["tick"]) == ("delta", keyframe["tick"] + 1)
+
+
+def test_should_close_on_invalid_subscription(client: TestClient) -> None:
+    with client.websocket_connect("/simulation/ws") as websocket:
+        websocket.send_json({"type": "subscribe", "role": "mayor"})
+
+        with pytest.raises(WebSocketDisconnect) as error:
+            websocket.receive_text()
+
+    assert error.value.code == 1008
+
+
+def test_should_read_tick_stats(client: TestClient) -> None:
+    response = client.get("/simulation/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "tick_hz": 1.0,
+        "overrun_policy": "skip",
+        "ticks": 0,
+        "late_ticks": 0,
+        "skipped_ticks": 0,
+        "duration_p50": 0.0,
+        "duration_p95": 0.0,
+        "duration_p99": 0.0,
+        "loop_lag_p50": 0.0,
+        "loop_lag_p99": 0.0,
+        "loop_lag_max": 0.0,
+    }
+
+
+def test_should_read_websocket_clients(client: TestClient) -> None:
+    with client.websocket_connect("/simulation/ws") as websocket:
+        asyncio.run(client.app.state.simulation.broadcast_state())  # type: ignore
+        websocket.receive_json()
+
+        response = client.get("/simulation/clients")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "format": "json",
+            "subscription": {
+                "q_min": None,
+                "q_max": None,
+                "r_min": None,
+                "r_max": None,
+                "role": None,
+                "is_dead": None,
+                "ids": None,
+            },
+            "awaiting_keyframe": False,
+            "queued_frames": 0,
+            "lag_ticks": 0,
+            "sent_frames": 1,
+            "dropped_frames": 0,
+        }
+    ]
@@ -1,9 +1,11 @@
+import numpy as np
 import pytest
 
 from tests.fake import FakeBuilding
 
 from app.models.building import Building
 from app.models.errors import DoesNotExistError, ExistsError
+from app.models.location import Location
 from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
 
 
@@ -112,3 +114,71 @@ def test_should_read_many(buildings: BuildingsInMemoryRepository) -> None:
     assert list(buildings.read_many(q=building.location.q, r=building.location.r)) == [
         building
     ]
+
+
+def test_should_read_bbox(buildings: BuildingsInMemoryRepository) -> None:
+    inside = FakeBuilding(location=Location(q=5, r=5)).entity
+    outside = FakeBuilding(location=Location(q=5, r=9)).entity
+    buildings.create_one(inside)
+    buildings.create_one(outside)
+
+    assert list(buildings.read_bbox(q_min=4, q_max=6, r_min=4, r_max=6)) == [inside]
+
+
+def test_should_read_within_radius(buildings: BuildingsInMemoryRepository) -> None:
+    near = FakeBuilding(location=Location(q=4, r=6)).entity
+    far = FakeBuilding(location=Location(q=3, r=3)).entity
+    buildings.create_one(near)
+    buildings.create_one(far)
+
+    assert list(buildings.read_within_radius(Location(q=5, r=5), 1)) == [near]
+
+
+def test_should_create_many(buildings: BuildingsInMemoryRepository) -> None:
+    new_buildings = [FakeBuilding().entity for _ in range(3)]
+
+    buildings.create_many(new_buildings)
+
+    assert list(buildings) == new_buildings
+
+
+def test_should_not_create_many_with_duplicates(
+    buildings: BuildingsInMemoryRepository,
+) -> None:
+    building = FakeBuilding().entity
+
+    with pytest.raises(ExistsError):
+        buildings.create_many([building, building])
+
+    assert len(buildings) == 0
+
+
+def test_should_update_and_delete_many(
+    buildings: BuildingsInMemoryRepository,
+) -> None:
+    new_buildings = buildings.create_many(
+        [FakeBuilding(location=Location(q=0, r=r)).entity for r in range(3)]
+    )
+    moved = Building(id=new_buildings[0].id, location=Location(q=1, r=0))
+
+    buildings.update_many([moved])
+    buildings.delete_many([new_buildings[1].id])
+
+    assert list(buildings.read_many(q=1)) == [moved]
+    assert list(buildings.read_many(q=0)) == [new_buildings[2]]
+
+
+def test_should_compile_occupancy_until_changed(
+    buildings: BuildingsInMemoryRepository,
+) -> None:
+    buildings.create_many(
+        [FakeBuilding(location=Location(q=q, r=1)).entity for q in range(3)]
+    )
+
+    occupied = buildings.read_occupied(grid_size=3)
+    building = buildings.create_one(FakeBuilding(location=Location(q=0, r=0)).entity)
+
+    assert buildings.read_occupied(grid_size=3) is not occupied
+    assert np.flatnonzero(occupied).tolist() == [1, 4, 7]
+    assert buildings.is_occupied(building.location)
+    assert not buildings.is_occupied(Location(q=7, r=7))
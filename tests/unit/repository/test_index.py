@@ -1,10 +1,18 @@
+import threading
+from dataclasses import replace
+from unittest.mock import patch
+
 import pytest
 
 from tests.fake import FakePerson
 
 from app.models.location import Location
 from app.models.person import Person
-from app.repositories.in_memory.indexes import _FieldIndex
+from app.repositories.in_memory.indexes import (
+    IndexManager,
+    _CompositeIndex,
+    _FieldIndex,
+)
 
 
 @pytest.fixture
@@ -45,7 +53,7 @@ def test_should_update_location(
         location=updated.location,
         role=new.role,
         is_dead=new.is_dead,
-        lifespan=new.lifespan,
+        death_tick=new.death_tick,
     )
 
     location_index.create_one(new.id, new)
@@ -53,3 +61,223 @@ def test_should_update_location(
 
     assert location_index.read_one(new.location) == set()
     assert location_index.read_one(updated.location) == {new.id}
+
+
+@pytest.fixture
+def index_manager() -> IndexManager[Person, str]:
+    return IndexManager(
+        extractors={
+            "q": lambda person: person.location.q,
+            "r": lambda person: person.location.r,
+            "is_dead": lambda person: person.is_dead,
+        },
+        composites=[("q", "r")],
+        ordered=["q", "r"],
+    )
+
+
+def test_should_read_on_composite_key(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    person = FakePerson(location=Location(q=1, r=2)).entity
+    same_column = FakePerson(location=Location(q=1, r=3)).entity
+    same_row = FakePerson(location=Location(q=0, r=2)).entity
+    for entity in [person, same_column, same_row]:
+        index_manager.create_one(entity.id, entity)
+
+    result = set(index_manager.read_many(q=1, r=2))
+
+    assert result == {person.id}
+
+
+def test_should_combine_composite_key_with_other_filters(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    person = FakePerson(location=Location(q=1, r=2)).entity
+    index_manager.create_one(person.id, person)
+
+    assert set(index_manager.read_many(q=1, r=2, is_dead=False)) == {person.id}
+    assert set(index_manager.read_many(q=1, r=2, is_dead=True)) == set()
+
+
+def test_should_update_composite_key(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    new = FakePerson(location=Location(q=1, r=2)).entity
+    moved = replace(new, location=Location(q=2, r=1))
+    index_manager.create_one(new.id, new)
+    index_manager.update_one(new.id, new, moved)
+
+    assert set(index_manager.read_many(q=1, r=2)) == set()
+    assert set(index_manager.read_many(q=2, r=1)) == {new.id}
+
+
+def test_should_not_create_composite_on_unknown_field() -> None:
+    with pytest.raises(ValueError, match="Unknown indexed field <unknown>"):
+        IndexManager[Person, str](extractors={}, composites=[("unknown",)])
+
+
+def test_should_not_create_key_on_read(
+    location_index: _FieldIndex[Person, Location, str],
+) -> None:
+    location_index.read_one(FakePerson().entity.location)
+
+    assert location_index._index == {}
+
+
+def test_should_read_without_copying(
+    location_index: _FieldIndex[Person, Location, str],
+) -> None:
+    person = FakePerson().entity
+    neighbor = replace(FakePerson().entity, location=person.location)
+    location_index.create_one(person.id, person)
+    result = location_index.read_one(person.location)
+
+    location_index.create_one(neighbor.id, neighbor)
+
+    assert result == {person.id, neighbor.id}
+
+
+def test_should_read_range_over_ordered_keys(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    people = [FakePerson(location=Location(q=q, r=0)).entity for q in [3, 1, 2, 5]]
+    for person in people:
+        index_manager.create_one(person.id, person)
+
+    result = list(index_manager.read_range({"q": (2, 4)}))
+
+    assert result == [people[2].id, people[0].id]
+
+
+def test_should_read_range_with_unbounded_axis_without_walking_keys(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    people = {
+        person.id: person
+        for person in [
+            FakePerson(location=Location(q=q, r=q % 7)).entity for q in range(50)
+        ]
+    }
+    index_manager.create_many(people)
+
+    with patch.object(_CompositeIndex, "read_one", side_effect=AssertionError):
+        result = list(
+            index_manager.read_range({"q": (10, 19), "r": (None, None)}, people)
+        )
+
+    assert result == list(people)[10:20]
+
+
+def test_should_read_sparse_wide_range_without_walking_keys(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    people = {
+        person.id: person
+        for person in [
+            FakePerson(location=Location(q=q, r=q), is_dead=q % 4 == 0).entity
+            for q in range(0, 100, 2)
+        ]
+    }
+    index_manager.create_many(people)
+
+    with patch.object(_CompositeIndex, "read_one", side_effect=AssertionError):
+        result = list(index_manager.read_range({"q": (0, 40), "r": (20, 99)}, people))
+        alive = list(
+            index_manager.read_range(
+                {"q": (0, 99), "r": (0, 99)}, people, is_dead=False
+            )
+        )
+
+    assert result == list(people)[10:21]
+    assert alive == list(people)[1::2]
+
+
+def test_should_forget_emptied_range_keys(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    person = FakePerson(location=Location(q=1, r=1)).entity
+    index_manager.create_one(person.id, person)
+    index_manager.delete_one(person.id, person)
+
+    assert list(index_manager.read_range({"q": (None, None)})) == []
+
+
+def test_should_not_read_range_on_unordered_field(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    with pytest.raises(ValueError, match="Unknown range filter <is_dead>"):
+        list(index_manager.read_range({"is_dead": (False, True)}))
+
+
+def test_should_create_and_delete_many(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    people = {
+        person.id: person
+        for person in [
+            FakePerson(location=Location(q=q, r=0)).entity for q in [2, 1, 2, 3]
+        ]
+    }
+    index_manager.create_many(people)
+    first, *others = people
+
+    assert set(index_manager.read_many(q=2, r=0)) == {first, others[1]}
+
+    index_manager.delete_many({first: people[first]})
+
+    assert set(index_manager.read_many(r=0)) == set(others)
+    assert list(index_manager.read_range({"q": (None, None)})) == others
+
+
+def test_should_update_many(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    people = [FakePerson(location=Location(q=0, r=0)).entity for _ in range(3)]
+    index_manager.create_many({person.id: person for person in people})
+
+    index_manager.update_many(
+        (person.id, person, replace(person, location=Location(q=1, r=0)))
+        for person in people[:2]
+    )
+
+    assert list(index_manager.read_many(q=0)) == [people[2].id]
+    assert set(index_manager.read_many(q=1, r=0)) == {people[0].id, people[1].id}
+
+
+def test_should_copy_independently(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    person = FakePerson(location=Location(q=1, r=1)).entity
+    index_manager.create_one(person.id, person)
+
+    copied = index_manager.copy()
+    copied.delete_one(person.id, person)
+
+    assert list(index_manager.read_many(q=1, r=1)) == [person.id]
+    assert list(index_manager.read_range({"q": (None, None)})) == [person.id]
+    assert list(copied.read_range({"q": (None, None)})) == []
+
+
+def test_should_read_while_another_thread_writes(
+    index_manager: IndexManager[Person, str],
+) -> None:
+    people = [
+        FakePerson(location=Location(q=3, r=r % 5), is_dead=False).entity
+        for r in range(3000)
+    ]
+    for person in people[:1000]:
+        index_manager.create_one(person.id, person)
+
+    def write() -> None:
+        for person in people[1000:]:
+            index_manager.create_one(person.id, person)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive():
+        list(index_manager.read_many(is_dead=False, q=3))
+        list(index_manager.read_range({"q": (2, 4), "r": (0, 4)}, is_dead=False))
+    writer.join()
+
+    assert len(list(index_manager.read_many(q=3))) == 3000
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.models.location import Location
+from app.repositories.occupancy import Occupancy
+
+
+def test_should_count_entities_sharing_a_location() -> None:
+    occupancy = Occupancy()
+    location = Location(q=2, r=3)
+
+    occupancy.add_many([location, location])
+    occupancy.remove_one(location)
+
+    assert occupancy.is_occupied(location)
+
+    occupancy.remove_one(location)
+
+    assert not occupancy.is_occupied(location)
+
+
+def test_should_reuse_compiled_grid_until_changed() -> None:
+    occupancy = Occupancy()
+    occupancy.add_one(Location(q=1, r=0))
+
+    compiled = occupancy.occupied(grid_size=2)
+
+    assert occupancy.occupied(grid_size=2) is compiled
+    assert compiled.tolist() == [False, False, True, False]
+
+    occupancy.move_one(Location(q=1, r=0), Location(q=0, r=1))
+
+    assert occupancy.occupied(grid_size=2).tolist() == [False, True, False, False]
+
+
+def test_should_crop_to_grid() -> None:
+    occupancy = Occupancy()
+    occupancy.add_many([Location(q=0, r=0), Location(q=9, r=9)])
+
+    assert np.flatnonzero(occupancy.occupied(grid_size=3)).tolist() == [0]
+
+
+def test_should_not_change_on_invalid_move() -> None:
+    occupancy = Occupancy()
+    occupancy.add_one(Location(q=0, r=0))
+
+    with pytest.raises(ValueError):
+        occupancy.move_many([Location(q=0, r=0)], [Location(q=-1, r=0)])
+
+    assert occupancy.is_occupied(Location(q=0, r=0))
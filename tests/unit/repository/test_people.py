@@ -1,19 +1,28 @@
+from dataclasses import replace
+
+import numpy as np
 import pytest
 
 from tests.fake import FakePerson
 
 from app.models.errors import DoesNotExistError, ExistsError
+from app.models.location import Location
 from app.models.person import Person, PersonRole
 from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.repositories.people import PeopleRepository
+
 
+@pytest.fixture(params=["in_memory", "columnar"])
+def people(request: pytest.FixtureRequest) -> PeopleRepository:
+    if request.param == "columnar":
+        return PeopleColumnarRepository(grid_size=100, capacity=1)
 
-@pytest.fixture
-def people() -> PeopleInMemoryRepository:
     return PeopleInMemoryRepository()
 
 
 def test_should_read_nothing_when_nothing_exist(
-    people: PeopleInMemoryRepository,
+    people: PeopleRepository,
 ) -> None:
     existing_people = people
 
@@ -28,9 +37,7 @@ def test_should_read_nothing_when_nothing_exist(
         PersonRole.police,
     ],
 )
-def test_should_create_one(
-    people: PeopleInMemoryRepository, person_role: PersonRole
-) -> None:
+def test_should_create_one(people: PeopleRepository, person_role: PersonRole) -> None:
     person = FakePerson(role=person_role).entity
 
     people.create_one(person)
@@ -38,7 +45,7 @@ def test_should_create_one(
     assert len(people) == 1
 
 
-def test_should_not_duplicate_on_create_one(people: PeopleInMemoryRepository) -> None:
+def test_should_not_duplicate_on_create_one(people: PeopleRepository) -> None:
     person = FakePerson().entity
     people.create_one(person)
 
@@ -46,7 +53,7 @@ def test_should_not_duplicate_on_create_one(people: PeopleInMemoryRepository) ->
         people.create_one(person)
 
 
-def test_should_not_read_when_does_not_exist(people: PeopleInMemoryRepository) -> None:
+def test_should_not_read_when_does_not_exist(people: PeopleRepository) -> None:
     with pytest.raises(DoesNotExistError):
         people.read_one(FakePerson().entity.id)
 
@@ -59,9 +66,7 @@ def test_should_not_read_when_does_not_exist(people: PeopleInMemoryRepository) -
         PersonRole.police,
     ],
 )
-def test_should_read_one(
-    people: PeopleInMemoryRepository, person_role: PersonRole
-) -> None:
+def test_should_read_one(people: PeopleRepository, person_role: PersonRole) -> None:
     person = FakePerson(role=person_role).entity
     people.create_one(person)
 
@@ -71,13 +76,13 @@ def test_should_read_one(
 
 
 def test_should_not_delete_when_does_not_exist(
-    people: PeopleInMemoryRepository,
+    people: PeopleRepository,
 ) -> None:
     with pytest.raises(DoesNotExistError):
         people.delete_one(FakePerson().entity.id)
 
 
-def test_should_delete_one(people: PeopleInMemoryRepository) -> None:
+def test_should_delete_one(people: PeopleRepository) -> None:
     person = FakePerson().entity
     people.create_one(person)
 
@@ -87,7 +92,7 @@ def test_should_delete_one(people: PeopleInMemoryRepository) -> None:
 
 
 def test_should_not_update_when_does_not_exist(
-    people: PeopleInMemoryRepository,
+    people: PeopleRepository,
 ) -> None:
     with pytest.raises(DoesNotExistError):
         people.update_one(FakePerson().entity)
@@ -101,9 +106,7 @@ def test_should_not_update_when_does_not_exist(
         PersonRole.police,
     ],
 )
-def test_should_update_one(
-    people: PeopleInMemoryRepository, person_role: PersonRole
-) -> None:
+def test_should_update_one(people: PeopleRepository, person_role: PersonRole) -> None:
     new = FakePerson(role=person_role).entity
     created = people.create_one(new)
     updated = FakePerson(role=person_role).entity
@@ -112,7 +115,7 @@ def test_should_update_one(
         location=updated.location,
         role=updated.role,
         is_dead=updated.is_dead,
-        lifespan=updated.lifespan,
+        death_tick=updated.death_tick,
     )
     people.update_one(person)
 
@@ -122,7 +125,7 @@ def test_should_update_one(
 
 
 def test_should_read_many_with_no_filters(
-    people: PeopleInMemoryRepository,
+    people: PeopleRepository,
 ) -> None:
     person = FakePerson().entity
     people.create_one(person)
@@ -131,14 +134,292 @@ def test_should_read_many_with_no_filters(
 
 
 def test_should_not_read_many_with_unknown_filter(
-    people: PeopleInMemoryRepository,
+    people: PeopleRepository,
 ) -> None:
     with pytest.raises(ValueError, match="Unknown filter <unknown_filter>"):
         people.read_many(unknown_filter="value")
 
 
-def test_should_read_many(people: PeopleInMemoryRepository) -> None:
+def test_should_read_many(people: PeopleRepository) -> None:
     person = FakePerson().entity
     people.create_one(person)
 
     assert list(people.read_many(q=person.location.q, r=person.location.r)) == [person]
+
+
+def test_should_count_without_reading(people: PeopleRepository) -> None:
+    people.create_many(
+        FakePerson(location=Location(q=q, r=0), is_dead=q % 3 == 0).entity
+        for q in range(9)
+    )
+
+    assert people.count() == 9
+    assert people.count(is_dead=False) == 6
+    assert people.count(is_dead=True, q=3) == 1
+    with pytest.raises(ValueError, match="Unknown filter <unknown_filter>"):
+        people.count(unknown_filter="value")
+
+
+def test_should_read_range(people: PeopleRepository) -> None:
+    inside = FakePerson(location=Location(q=5, r=0)).entity
+    outside = FakePerson(location=Location(q=8, r=0)).entity
+    people.create_one(inside)
+    people.create_one(outside)
+
+    assert list(people.read_range("q", 4, 6)) == [inside]
+
+
+def test_should_read_bbox(people: PeopleRepository) -> None:
+    inside = FakePerson(location=Location(q=5, r=5)).entity
+    outside_column = FakePerson(location=Location(q=5, r=9)).entity
+    outside_row = FakePerson(location=Location(q=9, r=5)).entity
+    for person in [inside, outside_column, outside_row]:
+        people.create_one(person)
+
+    assert list(people.read_bbox(q_min=4, q_max=6, r_min=4, r_max=6)) == [inside]
+
+
+def test_should_read_small_bbox_of_crowded_grid(people: PeopleRepository) -> None:
+    crowd = people.create_many(
+        [
+            FakePerson(location=Location(q=q, r=r)).entity
+            for q in range(4)
+            for r in range(4)
+        ]
+    )
+
+    assert list(people.read_bbox(q_min=1, q_max=2, r_min=2, r_max=2)) == [
+        crowd[6],
+        crowd[10],
+    ]
+
+
+def test_should_read_bbox_with_filters(people: PeopleRepository) -> None:
+    alive = FakePerson(location=Location(q=5, r=5)).entity
+    dead = FakePerson(location=Location(q=6, r=6), is_dead=True).entity
+    people.create_one(alive)
+    people.create_one(dead)
+
+    assert list(people.read_bbox(q_min=5, r_max=6, is_dead=True)) == [dead]
+
+
+def test_should_read_within_radius(people: PeopleRepository) -> None:
+    center = Location(q=5, r=5)
+    near = FakePerson(location=Location(q=7, r=3)).entity
+    far = FakePerson(location=Location(q=7, r=6)).entity
+    people.create_one(near)
+    people.create_one(far)
+
+    assert center.distance_to(near.location) == 2
+    assert center.distance_to(far.location) == 3
+    assert list(people.read_within_radius(center, 2)) == [near]
+
+
+def test_should_read_within_radius_with_filters(
+    people: PeopleRepository,
+) -> None:
+    alive = FakePerson(location=Location(q=5, r=5)).entity
+    dead = FakePerson(location=Location(q=5, r=6), is_dead=True).entity
+    people.create_one(alive)
+    people.create_one(dead)
+
+    assert list(people.read_within_radius(Location(q=5, r=5), 1, is_dead=True)) == [
+        dead
+    ]
+
+
+def test_should_keep_reading_after_delete(people: PeopleRepository) -> None:
+    first = FakePerson(location=Location(q=1, r=1)).entity
+    second = FakePerson(location=Location(q=1, r=1)).entity
+    last = FakePerson(location=Location(q=2, r=2)).entity
+    for person in [first, second, last]:
+        people.create_one(person)
+
+    people.delete_one(first.id)
+
+    assert list(people.read_many(q=1, r=1)) == [second]
+    assert list(people.read_many(q=2, r=2)) == [last]
+    assert people.read_one(last.id) == last
+
+
+def test_should_expose_read_only_columns() -> None:
+    people = PeopleColumnarRepository(grid_size=100)
+    person = FakePerson(location=Location(q=3, r=4), role=PersonRole.killer).entity
+    people.create_one(person)
+
+    columns = people.read_columns()
+
+    assert columns.ids == [person.id]
+    assert columns.q.tolist() == [3]
+    assert columns.r.tolist() == [4]
+    with pytest.raises(ValueError):
+        columns.q[0] = 5
+
+
+def test_should_update_columns(people: PeopleRepository) -> None:
+    mover = FakePerson(location=Location(q=1, r=1), lifespan=10).entity
+    stayer = FakePerson(location=Location(q=1, r=1), lifespan=10).entity
+    people.create_one(mover)
+    people.create_one(stayer)
+
+    people.update_columns(
+        [mover.id],
+        q=np.array([2], dtype=np.int32),
+        death_tick=np.array([9], dtype=np.int32),
+    )
+
+    assert people.read_one(mover.id).location == Location(q=2, r=1)
+    assert people.read_one(mover.id).death_tick == 9
+    assert list(people.read_many(q=1, r=1)) == [stayer]
+    assert list(people.read_many(q=2, r=1)) == [people.read_one(mover.id)]
+
+
+def test_should_read_columns(people: PeopleRepository) -> None:
+    person = FakePerson(location=Location(q=3, r=4), is_dead=True).entity
+    people.create_one(person)
+
+    columns = people.read_columns()
+
+    assert columns.ids == [person.id]
+    assert columns.q.tolist() == [3]
+    assert columns.r.tolist() == [4]
+    assert columns.is_dead.tolist() == [True]
+
+
+def test_should_create_many(people: PeopleRepository) -> None:
+    new_people = [FakePerson().entity for _ in range(3)]
+
+    created = people.create_many(new_people)
+
+    assert created == new_people
+    assert [people.read_one(person.id) for person in new_people] == new_people
+
+
+def test_should_not_create_many_when_one_exists(people: PeopleRepository) -> None:
+    existing = people.create_one(FakePerson().entity)
+
+    with pytest.raises(ExistsError):
+        people.create_many([FakePerson().entity, existing])
+
+    assert len(people) == 1
+
+
+def test_should_update_many(people: PeopleRepository) -> None:
+    new_people = people.create_many(
+        [FakePerson(location=Location(q=0, r=q)).entity for q in range(3)]
+    )
+    updated = [
+        replace(person, location=Location(q=5, r=person.location.r), is_dead=True)
+        for person in new_people[:2]
+    ]
+
+    people.update_many(updated)
+
+    assert list(people.read_many(q=5)) == updated
+    assert list(people.read_many(q=0)) == new_people[2:]
+
+
+def test_should_not_update_many_when_one_does_not_exist(
+    people: PeopleRepository,
+) -> None:
+    person = people.create_one(FakePerson().entity)
+
+    with pytest.raises(DoesNotExistError):
+        people.update_many([replace(person, is_dead=True), FakePerson().entity])
+
+    assert people.read_one(person.id) == person
+
+
+def test_should_delete_many(people: PeopleRepository) -> None:
+    new_people = people.create_many(
+        [FakePerson(location=Location(q=0, r=r)).entity for r in range(4)]
+    )
+
+    people.delete_many([new_people[0].id, new_people[2].id])
+
+    assert len(people) == 2
+    assert list(people.read_bbox(q_min=0, q_max=0)) == [new_people[1], new_people[3]]
+
+
+def test_should_copy_independently(people: PeopleRepository) -> None:
+    person = people.create_one(FakePerson(location=Location(q=1, r=1)).entity)
+
+    copied = people.copy()
+    moved = replace(person, location=Location(q=2, r=2))
+    copied.update_one(moved)
+    copied.create_one(FakePerson().entity)
+
+    assert len(people) == 1
+    assert list(people.read_many(q=1, r=1)) == [person]
+    assert list(copied.read_many(q=2, r=2)) == [moved]
+    assert list(copied.read_many(q=1, r=1)) == []
+
+
+def test_should_keep_occupancy_in_sync(people: PeopleRepository) -> None:
+    person = people.create_one(FakePerson(location=Location(q=1, r=1)).entity)
+    others = people.create_many(
+        [FakePerson(location=Location(q=3, r=r)).entity for r in range(2)]
+    )
+
+    people.update_one(replace(person, location=Location(q=1, r=2)))
+    people.update_many([replace(others[0], location=Location(q=4, r=0))])
+    people.delete_many([others[1].id])
+
+    assert not people.is_occupied(Location(q=1, r=1))
+    assert people.is_occupied(Location(q=1, r=2))
+    assert people.is_occupied(Location(q=4, r=0))
+    assert not people.is_occupied(Location(q=3, r=1))
+    assert np.flatnonzero(people.read_occupied(grid_size=5)).tolist() == [7, 20]
+
+
+def test_should_keep_occupancy_of_copy_independent(people: PeopleRepository) -> None:
+    person = people.create_one(FakePerson(location=Location(q=1, r=1)).entity)
+
+    copied = people.copy()
+    copied.update_one(replace(person, location=Location(q=2, r=2)))
+
+    assert people.is_occupied(Location(q=1, r=1))
+    assert not copied.is_occupied(Location(q=1, r=1))
+    assert copied.is_occupied(Location(q=2, r=2))
+
+
+def test_should_keep_occupancy_per_role(people: PeopleRepository) -> None:
+    killer = people.create_one(
+        FakePerson(location=Location(q=1, r=1), role=PersonRole.killer).entity
+    )
+    people.create_one(
+        FakePerson(location=Location(q=2, r=2), role=PersonRole.citizen).entity
+    )
+
+    people.update_one(replace(killer, role=PersonRole.police))
+
+    assert not people.is_occupied(Location(q=1, r=1), PersonRole.killer)
+    assert people.is_occupied(Location(q=1, r=1), PersonRole.police)
+    assert people.is_occupied(Location(q=2, r=2), PersonRole.citizen)
+    assert not people.is_occupied(Location(q=2, r=2), PersonRole.police)
+    assert np.flatnonzero(
+        people.read_occupied(grid_size=5, role=PersonRole.police)
+    ).tolist() == [6]
+    assert [person.id for person in people.read_many(role=PersonRole.police)] == [
+        killer.id
+    ]
+
+
+def test_should_read_expiring_living_people(people: PeopleRepository) -> None:
+    soon, later, killed, deleted = people.create_many(
+        [FakePerson(lifespan=lifespan).entity for lifespan in [2, 5, 1, 1]]
+    )
+    people.create_one(FakePerson(is_dead=True, lifespan=1).entity)
+
+    people.update_one(replace(killed, is_dead=True))
+    people.delete_one(deleted.id)
+
+    assert list(people.read_expiring(tick=2)) == [soon]
+
+    people.update_columns([later.id], death_tick=np.array([2], dtype=np.int32))
+
+    assert {person.id for person in people.read_expiring(tick=2)} == {
+        soon.id,
+        later.id,
+    }
+    assert list(people.copy().read_expiring(tick=1)) == []
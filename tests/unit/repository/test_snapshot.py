@@ -54,3 +54,16 @@ def test_should_load(
     assert people == [person]
 
     snapshot.snapshot_file.unlink()
+
+
+def test_should_keep_remaining_lifespan(
+    snapshot: PeopleSnapshotFileRepository,
+) -> None:
+    person = FakePerson(lifespan=50).entity
+    snapshot.save([person], tick=20)
+
+    people = snapshot.load(tick=5)
+
+    assert people[0].death_tick == 35
+
+    snapshot.snapshot_file.unlink()
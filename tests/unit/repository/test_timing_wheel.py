@@ -0,0 +1,31 @@
+from app.repositories.timing_wheel import TimingWheel
+
+
+def test_should_only_return_keys_due_by_tick() -> None:
+    wheel = TimingWheel()
+    wheel.schedule_many(["a", "b", "c", "d"], [3, 1, 5, None])
+
+    assert wheel.due(0) == []
+    assert wheel.due(3) == ["b", "a"]
+
+
+def test_should_move_rescheduled_keys() -> None:
+    wheel = TimingWheel()
+    wheel.schedule_many(["a", "b"], [2, 2])
+
+    wheel.reschedule("a", 2, 4)
+    wheel.reschedule("b", 2, None)
+
+    assert wheel.due(2) == []
+    assert wheel.due(4) == ["a"]
+
+
+def test_should_copy_independently() -> None:
+    wheel = TimingWheel()
+    wheel.schedule("a", 1)
+
+    copied = wheel.copy()
+    copied.cancel("a", 1)
+
+    assert wheel.due(1) == ["a"]
+    assert copied.due(1) == []
@@ -5,8 +5,10 @@ from tests.fake import FakePerson
 from app.models.location import Location
 from app.models.person import PersonRole
 from app.repositories.in_memory.people import PeopleInMemoryRepository
-from app.services.actions import ActionsService
+from app.services.actions import ActionsService, VectorizedActionsService
+from app.services.actions.strategies import RoleStrategies
 from app.services.people import PeopleService
+from app.services.topology import Topology
 
 
 @pytest.fixture
@@ -14,9 +16,15 @@ def people_service() -> PeopleService:
     return PeopleService(people=PeopleInMemoryRepository())
 
 
-@pytest.fixture
-def actions_service(people_service: PeopleService) -> ActionsService:
-    return ActionsService(people=people_service)
+@pytest.fixture(params=[ActionsService, VectorizedActionsService])
+def actions_service(
+    request: pytest.FixtureRequest, people_service: PeopleService
+) -> ActionsService:
+    actions_service_class: type[ActionsService] = request.param
+
+    return actions_service_class(
+        people=people_service, topology=Topology(grid_size=100)
+    )
 
 
 def test_killer_should_not_kill_killer(
@@ -89,3 +97,72 @@ def test_dead_person_should_not_kill(
     victim = people_service.read_one(citizen.id)
 
     assert not victim.is_dead
+
+
+def test_police_should_kill_killer_that_kills(
+    actions_service: ActionsService, people_service: PeopleService
+) -> None:
+    police = FakePerson(location=Location(q=0, r=0), role=PersonRole.police).entity
+    people_service.create_one(police)
+    killer = FakePerson(location=Location(q=0, r=1), role=PersonRole.killer).entity
+    people_service.create_one(killer)
+    citizen = FakePerson(location=Location(q=1, r=1), role=PersonRole.citizen).entity
+    people_service.create_one(citizen)
+    actions_service.kill()
+
+    assert people_service.read_one(killer.id).is_dead
+    assert people_service.read_one(citizen.id).is_dead
+    assert not people_service.read_one(police.id).is_dead
+
+
+def test_vectorized_should_kill_same_people_as_sequential() -> None:
+    people = [
+        FakePerson(
+            location=Location(q=q, r=r), role=list(PersonRole)[(q * 5 + r) % 3]
+        ).entity
+        for q in range(12)
+        for r in range(12)
+        if (q * 7 + r * 3) % 4
+    ]
+    sequential_people = PeopleService(people=PeopleInMemoryRepository())
+    vectorized_people = PeopleService(people=PeopleInMemoryRepository())
+    for person in people:
+        sequential_people.create_one(person)
+        vectorized_people.create_one(person)
+
+    ActionsService(people=sequential_people, topology=Topology(grid_size=12)).kill()
+    VectorizedActionsService(
+        people=vectorized_people, topology=Topology(grid_size=12)
+    ).kill()
+
+    sequential_dead = {
+        person.id for person in sequential_people.read_many(is_dead=True)
+    }
+    vectorized_dead = {
+        person.id for person in vectorized_people.read_many(is_dead=True)
+    }
+
+    assert sequential_dead
+    assert sequential_dead == vectorized_dead
+
+
+def test_should_only_act_with_roles_that_have_targets() -> None:
+    strategies = RoleStrategies()
+
+    assert not strategies.get_strategy_for(PersonRole.citizen).can_act
+    assert set(strategies.acting()) == {PersonRole.killer, PersonRole.police}
+
+
+def test_should_only_step_through_acting_people(people_service: PeopleService) -> None:
+    people_service.create_many(
+        FakePerson(location=Location(q=q, r=0), role=role).entity
+        for q, role in enumerate(
+            [PersonRole.citizen, PersonRole.citizen, PersonRole.killer]
+        )
+    )
+    actions_service = ActionsService(
+        people=people_service, topology=Topology(grid_size=10)
+    )
+
+    assert len(list(actions_service.kill_in_steps())) == 1
+    assert len(people_service.read_many(is_dead=True)) == 1
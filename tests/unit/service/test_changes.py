@@ -0,0 +1,68 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from tests.fake import FakePerson
+
+from app.models.location import Location
+from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.services.frames import delta_of, json_of, keyframe_of
+from app.services.people import PeopleService
+
+
+@pytest.fixture(params=["in_memory", "columnar"])
+def people_service(request: pytest.FixtureRequest) -> PeopleService:
+    if request.param == "columnar":
+        return PeopleService(people=PeopleColumnarRepository(grid_size=10))
+
+    return PeopleService(people=PeopleInMemoryRepository())
+
+
+def test_should_record_changes_by_kind(people_service: PeopleService) -> None:
+    walker, victim, removed = people_service.create_many(
+        FakePerson(location=Location(q=q, r=0), lifespan=5).entity for q in range(3)
+    )
+    people_service.drain_changes()
+
+    people_service.update_one(replace(walker, location=Location(q=0, r=1)))
+    people_service.update_columns([victim.id], is_dead=np.array([True]))
+    people_service.delete_one(removed.id)
+    created = people_service.create_one(FakePerson(location=Location(q=5, r=5)).entity)
+
+    delta = json_of(
+        delta_of(people_service, people_service.drain_changes()), people_service
+    )
+    keyframe = json_of(keyframe_of(people_service), people_service)
+
+    assert delta["created"] == [keyframe["people"][-1]]
+    assert delta["created"][0]["id"] == created.id
+    assert delta["moved"] == [{"id": walker.id, "location": {"q": 0, "r": 1}}]
+    assert delta["died"] == [victim.id]
+    assert delta["deleted"] == [removed.id]
+    assert not people_service.drain_changes()
+
+
+def test_should_keep_changes_of_staged_and_concurrent_writes(
+    people_service: PeopleService,
+) -> None:
+    person = people_service.create_one(FakePerson(location=Location(q=1, r=1)).entity)
+    people_service.drain_changes()
+
+    with people_service.next_generation() as staged:
+        staged.update_one(replace(person, location=Location(q=2, r=1)))
+        people_service.delete_one(person.id)
+        created = people_service.create_one(
+            FakePerson(location=Location(q=3, r=3), lifespan=1).entity
+        )
+        staged.expire()
+
+    delta = json_of(
+        delta_of(people_service, people_service.drain_changes()), people_service
+    )
+
+    assert delta["tick"] == 1
+    assert [record["id"] for record in delta["created"]] == [created.id]
+    assert delta["moved"] == []
+    assert delta["deleted"] == [person.id]
@@ -0,0 +1,211 @@
+from dataclasses import replace
+from typing import Any
+
+import numpy as np
+import pytest
+
+from tests.fake import FakePerson
+
+from app.models.location import Location
+from app.models.person import PersonRole
+from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.services.frames import (
+    BINARY_HEADER,
+    BINARY_MAX_GRID_SIZE,
+    FrameFormat,
+    WireIds,
+    check_grid_size,
+    delta_of,
+    encode,
+    json_of,
+    keyframe_of,
+    view_delta_of,
+)
+from app.services.people import PeopleService
+from app.services.subscriptions import Subscription
+
+
+@pytest.fixture(params=["in_memory", "columnar"])
+def people_service(request: pytest.FixtureRequest) -> PeopleService:
+    if request.param == "columnar":
+        return PeopleService(people=PeopleColumnarRepository(grid_size=10))
+
+    return PeopleService(people=PeopleInMemoryRepository())
+
+
+def test_should_send_people_entering_and_leaving_a_view_as_created_and_deleted(
+    people_service: PeopleService,
+) -> None:
+    walker, leaver, victim, entering = people_service.create_many(
+        FakePerson(location=Location(q=q, r=q), lifespan=5).entity for q in [1, 2, 3, 8]
+    )
+    subscription = Subscription(q_max=4, r_max=4)
+    seen = dict.fromkeys(
+        person.id for person in keyframe_of(people_service, subscription).created
+    )
+    people_service.drain_changes()
+
+    people_service.update_many(
+        [
+            replace(walker, location=Location(q=1, r=2)),
+            replace(leaver, location=Location(q=6, r=6)),
+            replace(entering, location=Location(q=4, r=4)),
+        ]
+    )
+    people_service.update_columns([victim.id], is_dead=np.array([True]))
+
+    view = keyframe_of(people_service, subscription)
+    delta = json_of(
+        view_delta_of(view, people_service.drain_changes(), seen), people_service
+    )
+
+    assert [record["id"] for record in delta["created"]] == [entering.id]
+    assert delta["moved"] == [{"id": walker.id, "location": {"q": 1, "r": 2}}]
+    assert delta["died"] == [victim.id]
+    assert delta["deleted"] == [leaver.id]
+
+
+def _decode(data: str | bytes) -> dict[str, Any]:
+    assert isinstance(data, bytes)
+    frame_type, tick, *counts = BINARY_HEADER.unpack_from(data)
+    mapped, created, moved, died, deleted = counts
+    offset = BINARY_HEADER.size
+
+    def take(dtype: str, length: int) -> list[int]:
+        nonlocal offset
+        column = np.frombuffer(data, dtype=dtype, count=length, offset=offset)
+        offset += column.nbytes
+        return list(column.tolist())
+
+    wire_ids = take("<u4", mapped)
+    created_ids, lifespans = take("<u4", created), take("<u4", created)
+    moved_ids, died_ids, deleted_ids = (
+        take("<u4", moved),
+        take("<u4", died),
+        take("<u4", deleted),
+    )
+    created_q, created_r = take("<u2", created), take("<u2", created)
+    moved_q, moved_r = take("<u2", moved), take("<u2", moved)
+    lengths = take("<u2", mapped)
+    roles, flags = take("u1", created), take("u1", created)
+
+    names = []
+    for length in lengths:
+        names.append(data[offset : offset + length].decode())
+        offset += length
+
+    assert offset == len(data)
+    return {
+        "type": frame_type,
+        "tick": tick,
+        "mapping": dict(zip(wire_ids, names)),
+        "created": list(
+            zip(created_ids, created_q, created_r, roles, flags, lifespans)
+        ),
+        "moved": list(zip(moved_ids, moved_q, moved_r)),
+        "died": died_ids,
+        "deleted": deleted_ids,
+    }
+
+
+def test_should_encode_binary_keyframe_with_whole_mapping(
+    people_service: PeopleService,
+) -> None:
+    citizen, killer = people_service.create_many(
+        [
+            FakePerson(location=Location(q=1, r=2), lifespan=7).entity,
+            FakePerson(
+                location=Location(q=3, r=4), role=PersonRole.killer, is_dead=True
+            ).entity,
+        ]
+    )
+    wire_ids = WireIds()
+
+    keyframe = _decode(
+        encode(
+            keyframe_of(people_service), people_service, FrameFormat.binary, wire_ids
+        )
+    )
+
+    assert keyframe["type"] == 0
+    assert keyframe["mapping"] == {0: citizen.id, 1: killer.id}
+    assert keyframe["created"] == [
+        (0, 1, 2, 0, 0, 7),
+        (1, 3, 4, 1, 1, people_service.lifespan_of(killer)),
+    ]
+
+    again = _decode(
+        encode(
+            keyframe_of(people_service), people_service, FrameFormat.binary, wire_ids
+        )
+    )
+
+    assert again["mapping"] == keyframe["mapping"]
+
+
+def test_should_only_map_new_ids_in_binary_deltas(
+    people_service: PeopleService,
+) -> None:
+    walker, victim, removed = people_service.create_many(
+        FakePerson(location=Location(q=q, r=0)).entity for q in range(3)
+    )
+    wire_ids = WireIds()
+    encode(keyframe_of(people_service), people_service, FrameFormat.binary, wire_ids)
+    people_service.drain_changes()
+
+    people_service.update_one(replace(walker, location=Location(q=0, r=1)))
+    people_service.update_columns([victim.id], is_dead=np.array([True]))
+    people_service.delete_one(removed.id)
+    created = people_service.create_one(FakePerson(location=Location(q=5, r=5)).entity)
+
+    delta = _decode(
+        encode(
+            delta_of(people_service, people_service.drain_changes()),
+            people_service,
+            FrameFormat.binary,
+            wire_ids,
+        )
+    )
+
+    assert delta["type"] == 1
+    assert delta["mapping"] == {3: created.id}
+    assert [row[:3] for row in delta["created"]] == [(3, 5, 5)]
+    assert delta["moved"] == [(0, 0, 1)]
+    assert delta["died"] == [1]
+    assert delta["deleted"] == [2]
+
+
+def test_should_encode_binary_frames_smaller_than_json(
+    people_service: PeopleService,
+) -> None:
+    people = people_service.create_many(
+        FakePerson(location=Location(q=q % 10, r=q // 10)).entity for q in range(50)
+    )
+    wire_ids = WireIds()
+    encode(keyframe_of(people_service), people_service, FrameFormat.binary, wire_ids)
+    people_service.drain_changes()
+
+    people_service.update_many(
+        [
+            replace(
+                person, location=Location(q=9 - person.location.q, r=person.location.r)
+            )
+            for person in people
+        ]
+    )
+    delta = delta_of(people_service, people_service.drain_changes())
+
+    binary = encode(delta, people_service, FrameFormat.binary, wire_ids)
+    text = encode(delta, people_service, FrameFormat.json, wire_ids)
+
+    assert len(text) >= 5 * len(binary)
+
+
+def test_should_only_allow_grids_binary_frames_can_locate() -> None:
+    check_grid_size(BINARY_MAX_GRID_SIZE)
+
+    with pytest.raises(
+        ValueError, match="Grid size <65537> does not fit binary frames"
+    ):
+        check_grid_size(BINARY_MAX_GRID_SIZE + 1)
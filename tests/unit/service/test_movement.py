@@ -8,8 +8,9 @@ from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
 from app.repositories.in_memory.people import PeopleInMemoryRepository
 from app.services.actions import ActionsService
 from app.services.buildings import BuildingsService
-from app.services.movement import MovementService
+from app.services.movement import MovementService, VectorizedMovementService
 from app.services.people import PeopleService
+from app.services.topology import Layout, Topology
 
 
 @pytest.fixture
@@ -34,7 +35,7 @@ def people_service(person: Person) -> PeopleService:
 
 @pytest.fixture
 def actions_service(people_service: PeopleService) -> ActionsService:
-    return ActionsService(people=people_service)
+    return ActionsService(people=people_service, topology=Topology(grid_size=100))
 
 
 @pytest.fixture
@@ -44,7 +45,9 @@ def movement_service(
     actions_service: ActionsService,
 ) -> MovementService:
     return MovementService(
-        grid_size=100, buildings=buildings_service, people=people_service
+        topology=Topology(grid_size=100),
+        buildings=buildings_service,
+        people=people_service,
     )
 
 
@@ -53,7 +56,9 @@ def test_should_move_to_adjacent_location(
     movement_service: MovementService,
 ) -> None:
     generated_location = movement_service._generate_random_adjacent_location_for(
-        person=person
+        person=person,
+        preferences=range(6),
+        occupied=movement_service._occupied(),
     )
 
     assert (
@@ -71,7 +76,9 @@ def test_should_not_move_on_other_person(
     people_service.create_one(FakePerson(location=Location(q=1, r=0)).entity)
 
     generated_location = movement_service._generate_random_adjacent_location_for(
-        person=person
+        person=person,
+        preferences=range(6),
+        occupied=movement_service._occupied(),
     )
 
     assert generated_location == person.location
@@ -86,7 +93,9 @@ def test_should_not_move_on_building(
     buildings_service.create_one(FakeBuilding(location=Location(q=1, r=0)).entity)
 
     generated_location = movement_service._generate_random_adjacent_location_for(
-        person=person
+        person=person,
+        preferences=range(6),
+        occupied=movement_service._occupied(),
     )
 
     assert generated_location == person.location
@@ -105,7 +114,7 @@ def test_should_stay_in_place_when_dead(
     assert moved_person_location == person.location
 
 
-def test_should_die_when_lifespan_empties(
+def test_should_not_age_when_moving(
     people_service: PeopleService, movement_service: MovementService
 ) -> None:
     person = FakePerson(location=Location(q=0, r=1), is_dead=False, lifespan=1).entity
@@ -114,4 +123,164 @@ def test_should_die_when_lifespan_empties(
 
     moved_person = people_service.read_one(person.id)
 
-    assert moved_person.is_dead
+    assert not moved_person.is_dead
+    assert moved_person.death_tick == person.death_tick
+
+
+def test_should_move_into_location_left_earlier_in_tick(
+    people_service: PeopleService,
+    buildings_service: BuildingsService,
+    movement_service: MovementService,
+) -> None:
+    topology = movement_service.topology
+    first = FakePerson(location=Location(q=50, r=50), is_dead=False).entity
+    neighbors = topology.neighbors_of(first.location)
+    way_out = neighbors[0]
+    second = FakePerson(location=neighbors[3], is_dead=False).entity
+    walls = {
+        *topology.neighbors_of(first.location),
+        *topology.neighbors_of(second.location),
+    } - {first.location, second.location, way_out}
+    for wall in walls:
+        buildings_service.create_one(FakeBuilding(location=wall).entity)
+    people_service.create_one(first)
+    people_service.create_one(second)
+
+    movement_service.move_people_to_random_adjacent_location()
+
+    assert people_service.read_one(first.id).location == way_out
+    assert people_service.read_one(second.id).location == first.location
+
+
+@pytest.fixture
+def vectorized_movement_service(
+    buildings_service: BuildingsService, people_service: PeopleService
+) -> VectorizedMovementService:
+    return VectorizedMovementService(
+        topology=Topology(grid_size=100),
+        buildings=buildings_service,
+        people=people_service,
+    )
+
+
+def test_vectorized_should_move_to_adjacent_location(
+    person: Person,
+    people_service: PeopleService,
+    vectorized_movement_service: VectorizedMovementService,
+) -> None:
+    vectorized_movement_service.move_people_to_random_adjacent_location()
+
+    moved_person = people_service.read_one(person.id)
+
+    assert moved_person.location in person.location.neighbors()
+    assert moved_person.death_tick == person.death_tick
+
+
+def test_vectorized_should_not_move_on_other_person_or_building(
+    person: Person,
+    people_service: PeopleService,
+    buildings_service: BuildingsService,
+    vectorized_movement_service: VectorizedMovementService,
+) -> None:
+    people_service.create_one(
+        FakePerson(location=Location(q=0, r=1), is_dead=True).entity
+    )
+    buildings_service.create_one(FakeBuilding(location=Location(q=1, r=0)).entity)
+
+    vectorized_movement_service.move_people_to_random_adjacent_location()
+
+    assert people_service.read_one(person.id).location == person.location
+
+
+def test_vectorized_should_not_move_people_onto_same_location(
+    people_service: PeopleService,
+    vectorized_movement_service: VectorizedMovementService,
+) -> None:
+    for q in range(10):
+        for r in range(10):
+            if (q + r) % 2:
+                people_service.create_one(
+                    FakePerson(
+                        location=Location(q=q, r=r), is_dead=False, lifespan=10
+                    ).entity
+                )
+
+    vectorized_movement_service.move_people_to_random_adjacent_location()
+
+    locations = [person.location for person in people_service.read_many()]
+
+    assert len(locations) == len(set(locations))
+
+
+def test_vectorized_should_only_record_people_who_moved(
+    people_service: PeopleService,
+    buildings_service: BuildingsService,
+    vectorized_movement_service: VectorizedMovementService,
+) -> None:
+    blocked = people_service.create_one(
+        FakePerson(location=Location(q=99, r=99), is_dead=False).entity
+    )
+    walker = people_service.create_one(
+        FakePerson(location=Location(q=50, r=50), is_dead=False).entity
+    )
+    for location in [Location(q=99, r=98), Location(q=98, r=99)]:
+        buildings_service.create_one(FakeBuilding(location=location).entity)
+    before = {person.id: person.location for person in people_service.read_many()}
+    people_service.drain_changes()
+
+    vectorized_movement_service.move_people_to_random_adjacent_location()
+
+    moved = people_service.drain_changes().moved
+    assert walker.id in moved
+    assert blocked.id not in moved
+    assert set(moved) == {
+        person.id
+        for person in people_service.read_many()
+        if person.location != before[person.id]
+    }
+
+
+def test_vectorized_should_stay_in_place_when_dead(
+    people_service: PeopleService,
+    vectorized_movement_service: VectorizedMovementService,
+) -> None:
+    person = FakePerson(location=Location(q=5, r=5), is_dead=True).entity
+    people_service.create_one(person)
+    vectorized_movement_service.move_people_to_random_adjacent_location()
+
+    assert people_service.read_one(person.id) == person
+
+
+def test_vectorized_should_not_age_when_moving(
+    people_service: PeopleService,
+    vectorized_movement_service: VectorizedMovementService,
+) -> None:
+    person = FakePerson(location=Location(q=5, r=5), is_dead=False, lifespan=1).entity
+    people_service.create_one(person)
+    vectorized_movement_service.move_people_to_random_adjacent_location()
+
+    moved_person = people_service.read_one(person.id)
+
+    assert not moved_person.is_dead
+    assert moved_person.death_tick == person.death_tick
+
+
+@pytest.mark.parametrize(
+    "movement_service_class", [MovementService, VectorizedMovementService]
+)
+def test_should_wrap_around_edges_on_torus(
+    movement_service_class: type[MovementService],
+    person: Person,
+    people_service: PeopleService,
+    buildings_service: BuildingsService,
+) -> None:
+    topology = Topology(grid_size=3, layout=Layout.torus)
+    for location in topology.neighbors_of(person.location):
+        if location != Location(q=2, r=0):
+            buildings_service.create_one(FakeBuilding(location=location).entity)
+
+    movement_service_class(
+        topology=topology, buildings=buildings_service, people=people_service
+    ).move_people_to_random_adjacent_location()
+
+    assert people_service.read_one(person.id).location == Location(q=2, r=0)
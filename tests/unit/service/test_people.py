@@ -0,0 +1,82 @@
+from dataclasses import replace
+
+import pytest
+
+from tests.fake import FakePerson
+
+from app.models.location import Location
+from app.models.person import Person
+from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.services.people import PeopleService
+
+
+@pytest.fixture
+def person() -> Person:
+    return FakePerson(location=Location(q=1, r=1)).entity
+
+
+@pytest.fixture
+def people_service(person: Person) -> PeopleService:
+    people_service = PeopleService(people=PeopleInMemoryRepository())
+    people_service.create_one(person)
+
+    return people_service
+
+
+def test_should_read_previous_generation_until_committed(
+    person: Person, people_service: PeopleService
+) -> None:
+    moved = replace(person, location=Location(q=2, r=1))
+
+    with people_service.next_generation() as staged:
+        staged.update_one(moved)
+
+        assert people_service.read_one(person.id) == person
+        assert staged.read_one(person.id) == moved
+
+    assert people_service.read_one(person.id) == moved
+
+
+def test_should_keep_writes_made_while_staging(
+    person: Person, people_service: PeopleService
+) -> None:
+    created = FakePerson().entity
+    killed = replace(person, is_dead=True)
+
+    with people_service.next_generation() as staged:
+        staged.update_one(replace(person, location=Location(q=2, r=1)))
+        people_service.create_one(created)
+        people_service.update_one(killed)
+
+        assert people_service.read_one(created.id) == created
+
+    assert people_service.read_many() == [killed, created]
+
+
+def test_should_discard_generation_on_error(
+    person: Person, people_service: PeopleService
+) -> None:
+    with pytest.raises(RuntimeError):
+        with people_service.next_generation() as staged:
+            staged.update_one(replace(person, is_dead=True))
+            raise RuntimeError
+
+    people_service.create_one(FakePerson().entity)
+
+    assert people_service.read_one(person.id) == person
+    assert len(people_service.read_many()) == 2
+
+
+def test_should_expire_people_due_by_next_generation(
+    person: Person, people_service: PeopleService
+) -> None:
+    mortal = people_service.create_one(FakePerson(lifespan=1).entity)
+
+    with people_service.next_generation() as staged:
+        staged.expire()
+
+    assert people_service.tick == 1
+    assert people_service.read_one(mortal.id).is_dead
+    assert not people_service.read_one(person.id).is_dead
+    assert people_service.lifespan_of(person) == person.death_tick - 1
+    assert people_service.death_tick_of(10) == 11
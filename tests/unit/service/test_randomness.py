@@ -0,0 +1,89 @@
+import numpy as np
+
+from app.models.person import Person
+from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
+from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.services.actions import ActionsService, VectorizedActionsService
+from app.services.buildings import BuildingsService
+from app.services.movement import MovementService, VectorizedMovementService
+from app.services.people import PeopleService
+from app.services.randomness import Phase, RandomService
+from app.services.simulation import SimulationService
+from app.services.topology import Topology
+from app.services.websocket import WebSocketService
+from app.services.world_entities import WorldEntities
+
+
+def test_should_draw_same_stream_for_same_seed_and_key() -> None:
+    first = RandomService(seed=42).stream(Phase.movement, shard=1).random(8)
+    second = RandomService(seed=42).stream(Phase.movement, shard=1).random(8)
+
+    assert np.array_equal(first, second)
+
+
+def test_should_draw_independent_streams_per_tick_phase_and_shard() -> None:
+    streams = RandomService(seed=42)
+    draws = [
+        streams.stream(Phase.movement).random(8),
+        streams.stream(Phase.world).random(8),
+        streams.stream(Phase.movement, shard=1).random(8),
+    ]
+    streams.advance()
+    draws.append(streams.stream(Phase.movement).random(8))
+
+    assert len({draw.tobytes() for draw in draws}) == len(draws)
+
+
+def _simulate(
+    seed: int, vectorized: bool, ticks: int = 3
+) -> tuple[list[Person], list[Person]]:
+    streams = RandomService(seed=seed)
+    topology = Topology(grid_size=30)
+    people = PeopleService(
+        people=(
+            PeopleColumnarRepository(grid_size=30)
+            if vectorized
+            else PeopleInMemoryRepository()
+        )
+    )
+    buildings = BuildingsService(buildings=BuildingsInMemoryRepository())
+    WorldEntities(
+        snapshot_service=None,
+        topology=topology,
+        people_amount=200,
+        building_amount=50,
+        killer_probability=0.1,
+        police_probability=0.1,
+        people_service=people,
+        buildings_service=buildings,
+        streams=streams,
+    ).initialize()
+    generated = people.read_many()
+
+    movement_service = VectorizedMovementService if vectorized else MovementService
+    actions_service = VectorizedActionsService if vectorized else ActionsService
+    simulation = SimulationService(
+        websocket_manager=WebSocketService(),
+        people=people,
+        movement=movement_service(
+            topology=topology, buildings=buildings, people=people, streams=streams
+        ),
+        actions=actions_service(people=people, topology=topology),
+    )
+    for _ in range(ticks):
+        simulation.tick()
+
+    return generated, people.read_many()
+
+
+def test_should_reproduce_sequential_run_with_same_seed() -> None:
+    assert _simulate(seed=7, vectorized=False) == _simulate(seed=7, vectorized=False)
+
+
+def test_should_reproduce_vectorized_run_with_same_seed() -> None:
+    assert _simulate(seed=7, vectorized=True) == _simulate(seed=7, vectorized=True)
+
+
+def test_should_diverge_with_different_seed() -> None:
+    assert _simulate(seed=7, vectorized=True) != _simulate(seed=8, vectorized=True)
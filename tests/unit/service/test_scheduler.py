@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from tests.fake import FakeClock
+
+from app.services.scheduler import OverrunPolicy, TickScheduler, TickStats
+
+
+class _Stop(Exception):
+    pass
+
+
+def run_ticks(
+    scheduler: TickScheduler, clock: FakeClock, durations: list[float]
+) -> list[float]:
+    remaining = list(durations)
+    starts: list[float] = []
+
+    async def tick() -> None:
+        if not remaining:
+            raise _Stop
+        starts.append(clock.now)
+        clock.now += remaining.pop(0)
+
+    with pytest.raises(_Stop):
+        asyncio.run(scheduler.run(tick))
+
+    return starts
+
+
+def make_scheduler(clock: FakeClock, policy: OverrunPolicy) -> TickScheduler:
+    return TickScheduler(
+        tick_hz=2, policy=policy, max_catch_up=2, clock=clock, sleep=clock.sleep
+    )
+
+
+def test_should_tick_on_fixed_schedule_without_drift() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, OverrunPolicy.skip)
+
+    starts = run_ticks(scheduler, clock, [0.1, 0.3, 0.2])
+
+    assert starts == pytest.approx([0.0, 0.5, 1.0])
+    assert scheduler.stats.ticks == 3
+    assert scheduler.stats.late_ticks == 0
+
+
+def test_should_skip_missed_ticks() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, OverrunPolicy.skip)
+
+    starts = run_ticks(scheduler, clock, [1.2, 0.1])
+
+    assert starts == pytest.approx([0.0, 1.5])
+    assert scheduler.stats.late_ticks == 1
+    assert scheduler.stats.skipped_ticks == 2
+
+
+def test_should_catch_up_missed_ticks() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, OverrunPolicy.catch_up)
+
+    starts = run_ticks(scheduler, clock, [1.2, 0.1, 0.1, 0.1])
+
+    assert starts == pytest.approx([0.0, 1.2, 1.3, 1.5])
+    assert scheduler.stats.late_ticks == 2
+    assert scheduler.stats.skipped_ticks == 0
+
+
+def test_should_limit_catch_up() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, OverrunPolicy.catch_up)
+
+    starts = run_ticks(scheduler, clock, [2.2, 0.1, 0.1, 0.1])
+
+    assert starts == pytest.approx([0.0, 2.2, 2.3, 2.5])
+    assert scheduler.stats.skipped_ticks == 2
+
+
+def test_should_slow_down_when_late() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, OverrunPolicy.slow_down)
+
+    starts = run_ticks(scheduler, clock, [0.7, 0.1, 0.1])
+
+    assert starts == pytest.approx([0.0, 0.7, 1.2])
+    assert scheduler.stats.skipped_ticks == 0
+
+
+def test_should_not_schedule_without_positive_rate() -> None:
+    with pytest.raises(ValueError, match="Tick rate must be positive, got <0>"):
+        TickScheduler(tick_hz=0)
+
+
+def test_should_report_duration_percentiles() -> None:
+    stats = TickStats(window=100)
+    for duration in range(1, 201):
+        stats.record(duration / 1000)
+
+    assert stats.ticks == 200
+    assert stats.percentile(50) == pytest.approx(0.150)
+    assert stats.percentile(99) == pytest.approx(0.199)
+    assert TickStats().percentile(95) == 0.0
+
+
+def test_should_report_nearest_rank_percentile_of_odd_window() -> None:
+    stats = TickStats(window=5)
+    for duration in (5, 1, 4, 2, 3):
+        stats.record(duration)
+
+    assert stats.percentile(50) == 3
+    assert stats.percentile(10) == 1
+    assert stats.percentile(90) == 5
@@ -0,0 +1,164 @@
+from typing import Iterator
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from tests.fake import FakePerson
+
+from app.models.location import Location
+from app.models.person import PersonRole
+from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.services.actions import ActionsService
+from app.services.buildings import BuildingsService
+from app.services.people import PeopleService
+from app.services.randomness import RandomService
+from app.services.sharding import (
+    ShardedActionsService,
+    ShardedMovementService,
+    ShardPool,
+    SharedArray,
+    StripePool,
+    ThreadShardPool,
+    _attached,
+    _view,
+)
+from app.services.topology import Layout, Topology
+
+
+@pytest.fixture(scope="module")
+def process_pool() -> ShardPool:
+    return ShardPool(topology=Topology(grid_size=12), shards=3)
+
+
+@pytest.fixture(scope="module")
+def thread_pool() -> Iterator[ThreadShardPool]:
+    with patch("app.services.sharding.gil_enabled", return_value=False):
+        yield ThreadShardPool(topology=Topology(grid_size=12), shards=3)
+
+
+@pytest.fixture(params=["process", "thread"])
+def shard_pool(
+    request: pytest.FixtureRequest,
+    process_pool: ShardPool,
+    thread_pool: ThreadShardPool,
+) -> StripePool:
+    return process_pool if request.param == "process" else thread_pool
+
+
+@pytest.fixture
+def people_service() -> PeopleService:
+    return PeopleService(people=PeopleColumnarRepository(grid_size=12))
+
+
+def test_should_split_grid_into_stripes_of_two_rows_or_more() -> None:
+    assert ShardPool(topology=Topology(grid_size=12), shards=3).stripes() == [
+        (0, 4),
+        (4, 8),
+        (8, 12),
+    ]
+    assert ShardPool(topology=Topology(grid_size=5), shards=8).stripes() == [
+        (0, 2),
+        (2, 5),
+    ]
+
+
+def test_sharded_should_kill_same_people_as_sequential(
+    shard_pool: StripePool, people_service: PeopleService
+) -> None:
+    sequential_people = PeopleService(people=PeopleColumnarRepository(grid_size=12))
+    for q in range(12):
+        for r in range(12):
+            if (q * 7 + r * 3) % 4:
+                person = FakePerson(
+                    location=Location(q=q, r=r), role=list(PersonRole)[(q * 5 + r) % 3]
+                ).entity
+                people_service.create_one(person)
+                sequential_people.create_one(person)
+
+    ShardedActionsService(
+        people=people_service, topology=Topology(grid_size=12), pool=shard_pool
+    ).kill()
+    ActionsService(people=sequential_people, topology=Topology(grid_size=12)).kill()
+
+    assert {person.id for person in people_service.read_many(is_dead=True)} == {
+        person.id for person in sequential_people.read_many(is_dead=True)
+    }
+
+
+def test_sharded_should_move_across_stripe_borders_without_collisions(
+    shard_pool: StripePool, people_service: PeopleService
+) -> None:
+    people = people_service.create_many(
+        FakePerson(location=Location(q=q, r=r), lifespan=50).entity
+        for q in range(12)
+        for r in range(12)
+        if (q + r) % 2
+    )
+    ShardedMovementService(
+        topology=Topology(grid_size=12),
+        buildings=BuildingsService(buildings=BuildingsInMemoryRepository()),
+        people=people_service,
+        streams=RandomService(seed=7),
+        pool=shard_pool,
+    ).move_people_to_random_adjacent_location()
+
+    moved = {person.id: person for person in people_service.read_many()}
+    locations = [person.location for person in moved.values()]
+
+    assert len(locations) == len(set(locations))
+    assert all(
+        moved[person.id].location in person.location.neighbors()
+        or moved[person.id].location == person.location
+        for person in people
+    )
+    assert any(
+        moved[person.id].location.q // 4 != person.location.q // 4 for person in people
+    )
+
+
+def test_threads_should_fall_back_to_one_with_gil() -> None:
+    with patch("app.services.sharding.gil_enabled", return_value=True):
+        pool = ThreadShardPool(topology=Topology(grid_size=12), shards=3)
+
+        assert pool.stripes() == [(0, 12)]
+
+
+def test_threads_should_move_same_as_processes(
+    process_pool: ShardPool, thread_pool: ThreadShardPool
+) -> None:
+    cells = np.arange(0, 144, 3, dtype=np.int64)
+    occupied = np.zeros(144, dtype=np.bool_)
+    occupied[cells] = True
+
+    by_processes = process_pool.move(cells, occupied, RandomService(seed=3), 4)
+    by_threads = thread_pool.move(cells, occupied, RandomService(seed=3), 4)
+
+    assert np.array_equal(by_processes, by_threads)
+
+
+def test_should_keep_stripe_count_even_on_torus() -> None:
+    topology = Topology(grid_size=12, layout=Layout.torus)
+
+    assert ShardPool(topology=topology, shards=3).stripes() == [(0, 6), (6, 12)]
+
+
+def test_should_close_replaced_block_of_slot() -> None:
+    old, new = (
+        SharedArray("cells", (4,), np.int64),
+        SharedArray("cells", (8,), np.int64),
+    )
+    old.array[...] = 1
+    new.array[...] = 2
+    try:
+        assert _view(old.spec).tolist() == [1] * 4
+        replaced = _attached["cells"]
+
+        assert _view(new.spec).tolist() == [2] * 8
+        assert replaced.buf is None
+        assert _attached["cells"].name == new.memory.name
+    finally:
+        _attached.pop("cells").close()
+        old.release()
+        new.release()
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import pytest
+
+from tests.fake import FakeClock, FakePerson
+
+from app.models.location import Location
+from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
+from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.services.actions import ActionsService, VectorizedActionsService
+from app.services.buildings import BuildingsService
+from app.services.frames import json_of, keyframe_of
+from app.services.movement import MovementService, VectorizedMovementService
+from app.services.people import PeopleService
+from app.services.scheduler import LoopLagMonitor, TickScheduler
+from app.services.simulation import SimulationService, TickExecution
+from app.services.topology import Topology
+from app.services.websocket import WebSocketService
+
+
+def test_should_commit_tick_as_next_generation() -> None:
+    people_service = PeopleService(people=PeopleInMemoryRepository())
+    person = people_service.create_one(
+        FakePerson(location=Location(q=5, r=5), lifespan=10).entity
+    )
+    front = people_service.people
+    simulation_service = SimulationService(
+        websocket_manager=WebSocketService(),
+        people=people_service,
+        movement=MovementService(
+            topology=Topology(grid_size=10),
+            buildings=BuildingsService(buildings=BuildingsInMemoryRepository()),
+            people=people_service,
+        ),
+        actions=ActionsService(people=people_service, topology=Topology(grid_size=10)),
+    )
+
+    simulation_service.tick()
+
+    moved = people_service.read_one(person.id)
+
+    assert front.read_one(person.id) == person
+    assert moved.location in person.location.neighbors()
+    assert people_service.lifespan_of(moved) == 9
+
+
+class _Stop(Exception):
+    pass
+
+
+async def stop_after_tick(seconds: float) -> None:
+    raise _Stop
+
+
+@dataclass
+class GatedMovementService(MovementService):
+    # NOTE: Holds the tick thread until the event loop lets it go
+    gate: threading.Event = field(default_factory=threading.Event, kw_only=True)
+    clock: FakeClock = field(default_factory=FakeClock, kw_only=True)
+    beats: list[float] = field(default_factory=list, kw_only=True)
+    beats_while_held: list[float] = field(default_factory=list, kw_only=True)
+
+    def move_people_to_random_adjacent_location(self) -> None:
+        assert self.gate.wait(timeout=5)
+        self.beats_while_held.extend(self.beats)
+        self.clock.now += 0.3
+
+
+def test_should_keep_event_loop_responsive_during_tick() -> None:
+    people_service = PeopleService(people=PeopleInMemoryRepository())
+    tick_clock, lag_clock = FakeClock(), FakeClock()
+    movement = GatedMovementService(
+        topology=Topology(grid_size=10),
+        buildings=BuildingsService(buildings=BuildingsInMemoryRepository()),
+        people=people_service,
+        clock=tick_clock,
+    )
+
+    async def beat(seconds: float) -> None:
+        await lag_clock.sleep(seconds)
+        await asyncio.sleep(0)
+        movement.beats.append(lag_clock.now)
+        if len(movement.beats) == 3:
+            movement.gate.set()
+
+    simulation_service = SimulationService(
+        websocket_manager=WebSocketService(),
+        people=people_service,
+        movement=movement,
+        actions=ActionsService(people=people_service, topology=Topology(grid_size=10)),
+        scheduler=TickScheduler(tick_hz=10, clock=tick_clock, sleep=stop_after_tick),
+        loop_lag=LoopLagMonitor(interval=0.01, clock=lag_clock, sleep=beat),
+    )
+
+    with pytest.raises(_Stop):
+        asyncio.run(simulation_service.run())
+
+    assert simulation_service.scheduler.stats.ticks == 1
+    assert simulation_service.scheduler.stats.percentile(50) == pytest.approx(0.3)
+    assert movement.beats_while_held[:3] == pytest.approx([0.01, 0.02, 0.03])
+
+
+@dataclass
+class SteppedMovementService(MovementService):
+    clock: FakeClock = field(default_factory=FakeClock, kw_only=True)
+    beats: list[float] = field(default_factory=list, kw_only=True)
+    beats_at_step: list[int] = field(default_factory=list, kw_only=True)
+
+    def move_in_steps(self) -> Iterator[None]:
+        for _ in range(20):
+            self.beats_at_step.append(len(self.beats))
+            self.clock.now += 0.02
+            yield
+
+
+def test_should_yield_to_event_loop_between_slices() -> None:
+    people_service = PeopleService(people=PeopleInMemoryRepository())
+    clock = FakeClock()
+    movement = SteppedMovementService(
+        topology=Topology(grid_size=10),
+        buildings=BuildingsService(buildings=BuildingsInMemoryRepository()),
+        people=people_service,
+        clock=clock,
+    )
+
+    async def beat(seconds: float) -> None:
+        movement.beats.append(clock.now)
+        await clock.sleep(seconds)
+        await asyncio.sleep(0)
+
+    simulation_service = SimulationService(
+        websocket_manager=WebSocketService(),
+        people=people_service,
+        movement=movement,
+        actions=ActionsService(people=people_service, topology=Topology(grid_size=10)),
+        scheduler=TickScheduler(tick_hz=10, clock=clock, sleep=stop_after_tick),
+        loop_lag=LoopLagMonitor(interval=0.01, clock=clock, sleep=beat),
+        execution=TickExecution.sliced,
+        slice_budget=0.01,
+        clock=clock,
+    )
+
+    with pytest.raises(_Stop):
+        asyncio.run(simulation_service.run())
+
+    # NOTE: Every step outlasts the budget, the loop runs between each of them
+    # and is never held for longer than one step
+    steps = movement.beats_at_step
+    assert all(later > earlier for earlier, later in zip(steps, steps[1:]))
+    assert simulation_service.scheduler.stats.percentile(50) >= 0.4
+    assert simulation_service.loop_lag.max_lag == pytest.approx(0.02)
+
+
+def test_should_commit_sliced_tick_as_next_generation() -> None:
+    people_service = PeopleService(people=PeopleInMemoryRepository())
+    person = people_service.create_one(
+        FakePerson(location=Location(q=5, r=5), lifespan=10).entity
+    )
+    simulation_service = SimulationService(
+        websocket_manager=WebSocketService(),
+        people=people_service,
+        movement=MovementService(
+            topology=Topology(grid_size=10),
+            buildings=BuildingsService(buildings=BuildingsInMemoryRepository()),
+            people=people_service,
+        ),
+        actions=ActionsService(people=people_service, topology=Topology(grid_size=10)),
+        slice_budget=0.0,
+    )
+
+    asyncio.run(simulation_service.tick_in_slices())
+
+    moved = people_service.read_one(person.id)
+
+    assert moved.location in person.location.neighbors()
+    assert people_service.lifespan_of(moved) == 9
+
+
+def test_should_die_once_lifespan_runs_out() -> None:
+    people_service = PeopleService(people=PeopleColumnarRepository(grid_size=10))
+    person = people_service.create_one(
+        FakePerson(location=Location(q=5, r=5), lifespan=2).entity
+    )
+    simulation_service = SimulationService(
+        websocket_manager=WebSocketService(),
+        people=people_service,
+        movement=VectorizedMovementService(
+            topology=Topology(grid_size=10),
+            buildings=BuildingsService(buildings=BuildingsInMemoryRepository()),
+            people=people_service,
+        ),
+        actions=VectorizedActionsService(
+            people=people_service, topology=Topology(grid_size=10)
+        ),
+    )
+
+    simulation_service.tick()
+
+    assert not people_service.read_one(person.id).is_dead
+    assert (
+        json_of(keyframe_of(people_service), people_service)["people"][0]["lifespan"]
+        == 1
+    )
+
+    simulation_service.tick()
+
+    assert people_service.read_one(person.id).is_dead
@@ -0,0 +1,33 @@
+import pytest
+
+from tests.fake import FakePerson
+
+from app.models.location import Location
+from app.repositories.in_memory.people import PeopleInMemoryRepository
+from app.repositories.in_memory.people_columnar import PeopleColumnarRepository
+from app.services.people import PeopleService
+from app.services.subscriptions import Subscription
+
+
+@pytest.fixture(params=["in_memory", "columnar"])
+def people_service(request: pytest.FixtureRequest) -> PeopleService:
+    if request.param == "columnar":
+        return PeopleService(people=PeopleColumnarRepository(grid_size=10))
+
+    return PeopleService(people=PeopleInMemoryRepository())
+
+
+def test_should_only_read_followed_people_matching_filters(
+    people_service: PeopleService,
+) -> None:
+    alive, dead, _ = people_service.create_many(
+        [
+            FakePerson(location=Location(q=1, r=1), is_dead=False).entity,
+            FakePerson(location=Location(q=2, r=2), is_dead=True).entity,
+            FakePerson(location=Location(q=3, r=3), is_dead=False).entity,
+        ]
+    )
+
+    subscription = Subscription(people_ids=(alive.id, dead.id, "gone"), is_dead=False)
+
+    assert subscription.read(people_service) == [alive]
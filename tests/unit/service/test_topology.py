@@ -0,0 +1,68 @@
+import numpy as np
+
+from app.models.location import Location
+from app.services.topology import NO_CELL, Layout, Topology
+
+
+def test_rectangle_should_drop_neighbors_off_the_grid() -> None:
+    topology = Topology(grid_size=5)
+
+    assert set(topology.neighbors_of(Location(q=0, r=0))) == {
+        Location(q=1, r=0),
+        Location(q=0, r=1),
+    }
+    assert len(topology.neighbors_of(Location(q=2, r=2))) == 6
+
+
+def test_torus_should_wrap_neighbors_around_edges() -> None:
+    topology = Topology(grid_size=5, layout=Layout.torus)
+
+    assert set(topology.neighbors_of(Location(q=0, r=0))) == {
+        Location(q=1, r=0),
+        Location(q=1, r=4),
+        Location(q=0, r=4),
+        Location(q=4, r=0),
+        Location(q=4, r=1),
+        Location(q=0, r=1),
+    }
+    assert not (topology.neighbors == NO_CELL).any()
+
+
+def test_hexagon_should_keep_cells_within_radius_of_center() -> None:
+    topology = Topology(grid_size=5, layout=Layout.hexagon)
+    center = Location(q=2, r=2)
+
+    assert int(topology.in_map.sum()) == 19
+    assert not topology.contains(Location(q=0, r=0))
+    assert all(
+        topology.contains(location) == (location.distance_to(center) <= 2)
+        for location in (Location(q=q, r=r) for q in range(5) for r in range(5))
+    )
+    assert Location(q=0, r=1) not in topology.neighbors_of(Location(q=1, r=1))
+    assert (topology.neighbors[~topology.in_map] == NO_CELL).all()
+
+
+def test_should_convert_between_cells_and_coordinates() -> None:
+    topology = Topology(grid_size=7)
+    q = np.array([0, 3, 6], dtype=np.int32)
+    r = np.array([6, 2, 0], dtype=np.int32)
+
+    cells = topology.cells_of(q, r)
+    new_q, new_r = topology.coordinates_of(cells)
+
+    assert cells.tolist() == [6, 23, 42]
+    assert topology.location_of(23) == Location(q=3, r=2)
+    assert np.array_equal(new_q, q) and np.array_equal(new_r, r)
+
+
+def test_should_find_free_neighbors_of_all_cells_at_once() -> None:
+    topology = Topology(grid_size=3)
+    occupied = np.zeros(topology.cells, dtype=np.bool_)
+    occupied[[topology.cell_of(Location(q=1, r=0)), 4]] = True
+
+    free = topology.free_neighbors(np.array([0, 8], dtype=np.int64), occupied)
+
+    assert free.tolist() == [
+        [False, False, False, False, False, True],
+        [False, False, True, True, False, False],
+    ]
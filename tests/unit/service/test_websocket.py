@@ -0,0 +1,163 @@
+import asyncio
+from typing import cast
+
+from starlette.websockets import WebSocket
+
+from app.services.frames import Frames
+from app.services.subscriptions import EVERYONE
+from app.services.websocket import (
+    SLOW_CLIENT_CLOSE_CODE,
+    FrameHistory,
+    SlowClientPolicy,
+    WebSocketClient,
+    WebSocketService,
+)
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.close_code: int | None = None
+        self.ready = asyncio.Event()
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        # NOTE: A slow client, sends stall until the test lets them through
+        await self.ready.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int) -> None:
+        self.close_code = code
+
+
+async def _broadcast_to_slow_client(
+    websocket_manager: WebSocketService, frames: list[Frames], since: int | None = None
+) -> tuple[FakeConnection, WebSocketClient]:
+    connection = FakeConnection()
+    await websocket_manager.connect(cast(WebSocket, connection), since=since)
+    client = websocket_manager.clients[id(connection)]
+
+    for frame in frames:
+        websocket_manager.broadcast(frame)
+        await asyncio.sleep(0)
+
+    connection.ready.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    return connection, client
+
+
+def test_should_only_send_deltas_after_a_keyframe() -> None:
+    frames = [
+        Frames(tick=0, delta="delta-0"),
+        Frames(tick=1, delta="delta-1", keyframe="keyframe-1"),
+        Frames(tick=2, delta="delta-2", keyframe="keyframe-2"),
+    ]
+
+    connection, client = asyncio.run(
+        _broadcast_to_slow_client(WebSocketService(), frames)
+    )
+
+    assert connection.sent == ["keyframe-1", "delta-2"]
+    assert client.sent_frames == 2
+    assert client.sent_tick == 2
+
+
+def test_should_drop_oldest_frames_of_slow_client_until_next_keyframe() -> None:
+    frames = [
+        Frames(tick=0, delta="delta-0", keyframe="keyframe-0"),
+        Frames(tick=1, delta="delta-1"),
+        Frames(tick=2, delta="delta-2"),
+        Frames(tick=3, delta="delta-3"),
+        Frames(tick=4, delta="delta-4", keyframe="keyframe-4"),
+    ]
+
+    connection, client = asyncio.run(
+        _broadcast_to_slow_client(WebSocketService(queue_size=2), frames)
+    )
+
+    assert connection.sent == ["keyframe-0", "delta-2", "keyframe-4"]
+    assert client.dropped_frames == 1
+    assert not client.awaiting_keyframe
+
+
+def test_should_disconnect_slow_client() -> None:
+    websocket_manager = WebSocketService(
+        queue_size=1, policy=SlowClientPolicy.disconnect
+    )
+    frames = [
+        Frames(tick=tick, delta=f"delta-{tick}", keyframe="k") for tick in range(3)
+    ]
+
+    connection, client = asyncio.run(
+        _broadcast_to_slow_client(websocket_manager, frames)
+    )
+
+    assert client.closed
+    assert connection.close_code == SLOW_CLIENT_CLOSE_CODE
+
+    websocket_manager.broadcast(frames[0])
+
+    assert not websocket_manager.has_active_connections
+
+
+def test_should_only_buffer_deltas_of_consecutive_ticks() -> None:
+    history = FrameHistory(size=3)
+    for tick in [1, 2, 3, 4, 5]:
+        history.record(tick, f"delta-{tick}")
+
+    assert history.since(2) == [(3, "delta-3"), (4, "delta-4"), (5, "delta-5")]
+    assert history.since(5) == []
+    assert history.since(1) is None
+    assert history.since(6) is None
+
+    history.record(7, "delta-7")
+
+    assert history.since(4) is None
+    assert history.since(6) == [(7, "delta-7")]
+
+
+def test_should_resume_from_buffered_deltas() -> None:
+    websocket_manager = WebSocketService(history_size=3)
+    for tick in range(2, 5):
+        websocket_manager.broadcast(Frames(tick=tick, delta=f"delta-{tick}"))
+
+    connection, client = asyncio.run(
+        _broadcast_to_slow_client(
+            websocket_manager, [Frames(tick=5, delta="delta-5")], since=2
+        )
+    )
+
+    assert connection.sent == ["delta-3", "delta-4", "delta-5"]
+    assert not client.awaiting_keyframe
+
+
+def test_should_send_keyframe_when_missed_deltas_are_gone() -> None:
+    websocket_manager = WebSocketService(history_size=3)
+    for tick in range(2, 5):
+        websocket_manager.broadcast(Frames(tick=tick, delta=f"delta-{tick}"))
+
+    connection, _ = asyncio.run(
+        _broadcast_to_slow_client(
+            websocket_manager,
+            [Frames(tick=5, delta="delta-5", keyframe="keyframe-5")],
+            since=0,
+        )
+    )
+
+    assert connection.sent == ["keyframe-5"]
+
+
+def test_should_keep_whole_world_feed_for_history_size_ticks() -> None:
+    websocket_manager = WebSocketService(history_size=2)
+    for tick in range(2):
+        websocket_manager.broadcast(Frames(tick=tick, delta=f"delta-{tick}"))
+
+    assert list(websocket_manager.feeds) == [EVERYONE]
+
+    websocket_manager.broadcast(Frames(tick=2, delta="delta-2"))
+
+    assert websocket_manager.feeds == {}
@@ -4,6 +4,7 @@ from app.repositories.in_memory.buildings import BuildingsInMemoryRepository
 from app.repositories.in_memory.people import PeopleInMemoryRepository
 from app.services.buildings import BuildingsService
 from app.services.people import PeopleService
+from app.services.topology import Topology
 from app.services.world_entities import WorldEntities
 
 
@@ -31,7 +32,7 @@ def test_should_not_initialize_when_too_many_entities(
         building_amount=1,
         killer_probability=1,
         police_probability=1,
-        grid_size=1,
+        topology=Topology(grid_size=1),
         snapshot_service=None,
     )
 
@@ -49,7 +50,7 @@ def test_should_initialize(
         building_amount=1,
         killer_probability=1,
         police_probability=1,
-        grid_size=100,
+        topology=Topology(grid_size=100),
         snapshot_service=None,
     )
     world_entities.initialize()